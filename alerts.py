@@ -0,0 +1,206 @@
+import os
+import json
+import math
+import time
+import tomllib
+import argparse
+import threading
+
+from tenants import TENANTS
+
+# Rules live next to config.toml; fired and resolved alerts are appended to a JSON lines log
+ALERTS_PATH = os.getenv("HR_ALERTS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "alerts.toml"))
+ALERT_LOG_PATH = os.getenv("HR_ALERT_LOG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "alerts.jsonl"))
+
+DIMENSIONS = ['Department', 'JobRole']
+METRICS = ['attrition_rate', 'avg_performance']
+
+# Read and check the [[rules]] entries; no file means no rules
+def load_rules(path=ALERTS_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path, "rb") as rules_file:
+        rules = tomllib.load(rules_file).get("rules", [])
+    for rule in rules:
+        if rule.get('dimension') not in DIMENSIONS:
+            raise ValueError(f"Alert rule {rule.get('name')}: dimension must be one of {DIMENSIONS}")
+        if rule.get('metric') not in METRICS:
+            raise ValueError(f"Alert rule {rule.get('name')}: metric must be one of {METRICS}")
+        if 'above' not in rule and 'below' not in rule:
+            raise ValueError(f"Alert rule {rule.get('name')}: needs an 'above' or 'below' threshold")
+        rule.setdefault('min_employees', 10)
+    return rules
+
+# Serialize appends from the listener thread and the CLI
+_log_lock = threading.Lock()
+
+def write_alerts(records, path=None):
+    with _log_lock:
+        with open(path or ALERT_LOG_PATH, "a", encoding="utf-8") as log_file:
+            for record in records:
+                log_file.write(json.dumps(record, default=str) + "\n")
+
+# Rule evaluation over per-group counters that are kept up to date incrementally. For
+# each tenant the engine remembers every employee's contribution (attrition flag,
+# performance rating, NaN when unrated, and group values), so a batch of changed rows
+# is applied by subtracting their old contributions and adding the new ones, and only
+# the groups those rows touch are re-evaluated: O(changed rows) per batch. A full
+# reload rebuilds the counters once. Used as a ChangeListener observer or from the CLI below.
+class AlertEngine:
+    def __init__(self, rules, log_path=None):
+        self.rules = rules
+        self.log_path = log_path
+        self.dimensions = sorted({rule['dimension'] for rule in rules})
+        self.alerts_fired = 0
+        self._tenants = {}
+        self._firing = {}
+        # Re-entrant so changed() can hold it across a first-change reload
+        self._lock = threading.RLock()
+
+    # (attrition flag, performance, group values) per employee id
+    def _contributions(self, df):
+        groups = zip(*(df[dimension].astype(object) for dimension in self.dimensions))
+        performance = df['PerformanceRating'].astype(float).tolist()
+        return zip(df['EmployeeID'].tolist(), zip(df['Attrition'].eq('Yes').tolist(), performance, groups))
+
+    # Add (sign=1) or remove (sign=-1) one employee from the counters
+    # [employees, leavers, rated employees, sum of their ratings]
+    def _count(self, state, contribution, sign, touched):
+        left, performance, values = contribution
+        rated = not math.isnan(performance)
+        for dimension, value in zip(self.dimensions, values):
+            counters = state['counters'][dimension]
+            counter = counters.setdefault(value, [0, 0, 0, 0.0])
+            counter[0] += sign
+            counter[1] += sign * left
+            if rated:
+                counter[2] += sign
+                counter[3] += sign * performance
+            if counter[0] <= 0:
+                del counters[value]
+            touched[dimension].add(value)
+
+    # None when nobody in the group has a rating yet
+    def _metric(self, rule, counter):
+        employees, leavers, rated, performance_sum = counter
+        if rule['metric'] == 'attrition_rate':
+            return round(leavers / employees * 100, 1)
+        return round(performance_sum / rated, 2) if rated else None
+
+    # Evaluate the tenant's rules for the touched groups (every group when None) and
+    # log transitions into and out of breach
+    def _evaluate(self, tenant, state, touched=None):
+        firing = self._firing.setdefault(tenant, set())
+        records = []
+        for rule in self.rules:
+            if tenant not in rule.get('tenants', [tenant]):
+                continue
+            counters = state['counters'][rule['dimension']]
+            if touched is None:
+                values = set(counters) | {value for name, value in firing if name == rule['name']}
+            else:
+                values = touched[rule['dimension']]
+            for value in values:
+                counter = counters.get(value)
+                metric = None
+                if counter is not None and counter[0] >= rule['min_employees']:
+                    metric = self._metric(rule, counter)
+                breached = metric is not None and (
+                    ('above' in rule and metric > rule['above']) or ('below' in rule and metric < rule['below'])
+                )
+                key = (rule['name'], value)
+                if breached == (key in firing):
+                    continue
+                if breached:
+                    firing.add(key)
+                else:
+                    firing.discard(key)
+                records.append({
+                    'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                    'status': 'fired' if breached else 'resolved',
+                    'tenant': tenant,
+                    'rule': rule['name'],
+                    'dimension': rule['dimension'],
+                    'group': value,
+                    'metric': rule['metric'],
+                    'value': metric,
+                    'above': rule.get('above'),
+                    'below': rule.get('below'),
+                    'employees': counter[0] if counter else 0
+                })
+        if records:
+            write_alerts(records, self.log_path)
+            self.alerts_fired += sum(record['status'] == 'fired' for record in records)
+        return records
+
+    # Rebuild a tenant's counters from its full frame; returns the logged records
+    def reload(self, tenant, df):
+        with self._lock:
+            state = {'rows': {}, 'counters': {dimension: {} for dimension in self.dimensions}}
+            touched = {dimension: set() for dimension in self.dimensions}
+            for employee_id, contribution in self._contributions(df):
+                state['rows'][employee_id] = contribution
+                self._count(state, contribution, 1, touched)
+            self._tenants[tenant] = state
+            return self._evaluate(tenant, state)
+
+    # Apply changed ids with their current rows (deleted ids are absent from `rows`). The
+    # lock is held from the state check through the update, so a reload or invalidate
+    # can't slip in between
+    def changed(self, tenant, ids, rows):
+        with self._lock:
+            state = self._tenants.get(tenant)
+            if state is None:
+                # First change seen for this tenant: start from the full data, which already includes it
+                from hr_data import load_employees
+                return self.reload(tenant, load_employees("postgres", tenant=tenant))
+
+            touched = {dimension: set() for dimension in self.dimensions}
+            for employee_id in ids:
+                previous = state['rows'].pop(employee_id, None)
+                if previous is not None:
+                    self._count(state, previous, -1, touched)
+            for employee_id, contribution in self._contributions(rows):
+                state['rows'][employee_id] = contribution
+                self._count(state, contribution, 1, touched)
+            return self._evaluate(tenant, state, touched)
+
+    # Forget a tenant's counters (e.g. after missed notifications); the next change
+    # rebuilds them. Which alerts are firing is kept, so nothing fires twice.
+    def invalidate(self, tenant):
+        with self._lock:
+            self._tenants.pop(tenant, None)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate the alert rules against employee data")
+    parser.add_argument("command", choices=["check", "watch"],
+                        help="check: evaluate once; watch: keep evaluating as Postgres data changes")
+    parser.add_argument("--source", help="data source for check (default: HR_DATA_SOURCE)")
+    parser.add_argument("--rules", default=ALERTS_PATH)
+    parser.add_argument("--log", default=ALERT_LOG_PATH)
+    args = parser.parse_args()
+
+    rules = load_rules(args.rules)
+    if not rules:
+        raise SystemExit(f"No alert rules in {args.rules}")
+    engine = AlertEngine(rules, args.log)
+
+    if args.command == "check":
+        from hr_data import load_employees
+        for tenant in TENANTS:
+            for record in engine.reload(tenant, load_employees(args.source, tenant=tenant)):
+                print(f"[{tenant}] {record['status']}: {record['rule']} {record['group']} = {record['value']}")
+        print(f"{engine.alerts_fired} alerts fired, logged to {args.log}")
+    else:
+        from live_updates import ChangeListener
+        from hr_data import load_employees
+        for tenant in TENANTS:
+            engine.reload(tenant, load_employees("postgres", tenant=tenant))
+        # No dashboard cache to update here, only the alert counters
+        listener = ChangeListener(lambda tenant: (None, None), observers=[engine])
+        listener.start()
+        print(f"Watching {len(TENANTS)} tenant(s) with {len(rules)} rules; alerts go to {args.log}")
+        try:
+            listener.join()
+        except KeyboardInterrupt:
+            listener.stop()
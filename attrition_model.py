@@ -0,0 +1,102 @@
+import numpy as np
+
+# Attrition model used to generate the sample data
+BASE_PROBABILITY = 0.15
+SATISFACTION_WEIGHT = 0.05  # per point below 5
+LOW_SALARY_THRESHOLD = 50000
+LOW_SALARY_PENALTY = 0.1
+NEW_HIRE_YEARS = 2
+NEW_HIRE_PENALTY = 0.1
+MIN_PROBABILITY = 0.05
+MAX_PROBABILITY = 0.8
+
+# Job satisfaction is recorded on a 1-4 scale
+SATISFACTION_RANGE = (1, 4)
+
+# Largest number of (draw, employee) cells simulated at once; bounds memory per chunk
+MAX_CELLS_PER_CHUNK = 4_000_000
+
+# Probability of leaving for scalars or whole arrays of employees at once
+def attrition_probability(satisfaction, salary, years_at_company):
+    probability = (
+        BASE_PROBABILITY
+        + (5 - np.asarray(satisfaction)) * SATISFACTION_WEIGHT
+        + np.where(np.asarray(salary) < LOW_SALARY_THRESHOLD, LOW_SALARY_PENALTY, 0.0)
+        + np.where(np.asarray(years_at_company) < NEW_HIRE_YEARS, NEW_HIRE_PENALTY, 0.0)
+    )
+    return np.clip(probability, MIN_PROBABILITY, MAX_PROBABILITY)
+
+# Score every employee in one pass
+def score_workforce(df):
+    return attrition_probability(
+        df['JobSatisfaction'].to_numpy(),
+        df['Salary'].to_numpy(),
+        df['YearsAtCompany'].to_numpy()
+    )
+
+# Apply a what-if scenario and return the adjusted (satisfaction, salary) arrays.
+# Scenario keys (all optional):
+#   departments         - only employees in these departments are affected
+#   salary_below        - only salaries under this amount are raised
+#   salary_raise        - amount added to affected salaries
+#   satisfaction_delta  - points added to affected satisfaction scores
+def apply_scenario(df, scenario):
+    satisfaction = df['JobSatisfaction'].to_numpy()
+    salary = df['Salary'].to_numpy()
+
+    affected = np.ones(len(df), dtype=bool)
+    if scenario.get('departments'):
+        affected &= df['Department'].isin(scenario['departments']).to_numpy()
+
+    if scenario.get('salary_raise'):
+        raised = affected & (salary < scenario.get('salary_below', np.inf))
+        salary = np.where(raised, salary + scenario['salary_raise'], salary)
+
+    if scenario.get('satisfaction_delta'):
+        satisfaction = np.where(
+            affected,
+            np.clip(satisfaction + scenario['satisfaction_delta'], *SATISFACTION_RANGE),
+            satisfaction
+        )
+
+    return satisfaction, salary
+
+# Monte Carlo leaver counts for a baseline and a scenario. Both use the same uniform
+# draws, so their difference has far less noise than two independent simulations.
+def simulate_leavers(baseline, scenario, n_draws=2000, seed=0, max_cells=MAX_CELLS_PER_CHUNK):
+    rng = np.random.default_rng(seed)
+    baseline = baseline.astype(np.float32)
+    scenario = scenario.astype(np.float32)
+    chunk_draws = max(1, max_cells // max(len(baseline), 1))
+
+    baseline_counts = np.empty(n_draws, dtype=np.int64)
+    scenario_counts = np.empty(n_draws, dtype=np.int64)
+    for start in range(0, n_draws, chunk_draws):
+        stop = min(start + chunk_draws, n_draws)
+        uniforms = rng.random((stop - start, len(baseline)), dtype=np.float32)
+        baseline_counts[start:stop] = (uniforms < baseline).sum(axis=1)
+        scenario_counts[start:stop] = (uniforms < scenario).sum(axis=1)
+
+    return baseline_counts, scenario_counts
+
+# Expected impact of a scenario on a set of employees
+def what_if(df, scenario, n_draws=2000, seed=0):
+    baseline = score_workforce(df)
+    satisfaction, salary = apply_scenario(df, scenario)
+    adjusted = attrition_probability(satisfaction, salary, df['YearsAtCompany'].to_numpy())
+
+    baseline_counts, scenario_counts = simulate_leavers(baseline, adjusted, n_draws, seed)
+    prevented = baseline_counts - scenario_counts
+    headcount = max(len(df), 1)
+
+    return {
+        'employees': len(df),
+        'baseline_expected': float(baseline.sum()),
+        'scenario_expected': float(adjusted.sum()),
+        'baseline_rate': float(baseline.sum() / headcount * 100),
+        'scenario_rate': float(adjusted.sum() / headcount * 100),
+        'prevented_mean': float(prevented.mean()),
+        'prevented_interval': tuple(float(value) for value in np.percentile(prevented, [5, 95])),
+        'scenario_interval': tuple(float(value) for value in np.percentile(scenario_counts, [5, 95])),
+        'affected': int((adjusted != baseline).sum())
+    }
@@ -0,0 +1,393 @@
+import os
+import tomllib
+import threading
+
+import pandas as pd
+
+import hr_data
+from dimensions import HIGH_CARDINALITY_COLUMNS, with_other
+
+# Analytics backends answer the sidebar filter and the per-tab aggregations:
+#   pandas   - the loaded frame, filtered and grouped in this process
+#   postgres - SQL pushed down to the employees table through database.py
+#   duckdb   - vectorized SQL over an in-memory Arrow table or a Parquet snapshot
+BACKENDS = ("pandas", "postgres", "duckdb")
+
+# Optional Parquet snapshot the DuckDB backend queries instead of the loaded frame
+DUCKDB_PARQUET_PATH = os.getenv("HR_DUCKDB_PARQUET")
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.toml")
+
+# HR_BACKEND wins over `[hr] backend` in config.toml; pandas is the default
+def configured_backend(config_path=CONFIG_PATH):
+    name = os.getenv("HR_BACKEND")
+    if not name and os.path.exists(config_path):
+        with open(config_path, "rb") as config_file:
+            name = tomllib.load(config_file).get("hr", {}).get("backend")
+    name = name or "pandas"
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend: {name}")
+    return name
+
+BACKEND = configured_backend()
+
+# Tenure bands, age groups and rating labels shared with the pandas aggregations
+AGE_BINS = [20, 30, 40, 50, 60, 70]
+AGE_LABELS = ['20-29', '30-39', '40-49', '50-59', '60+']
+SERVICE_BINS = [0, 2, 5, 10, 15, 30]
+SERVICE_LABELS = ['0-2', '3-5', '6-10', '11-15', '16+']
+PERFORMANCE_LABELS = {1: "Poor", 2: "Below Average", 3: "Average", 4: "Good", 5: "Excellent"}
+
+# In-process backend: the same functions the dashboard has always used
+class PandasBackend:
+    name = "pandas"
+
+    def __init__(self, df):
+        self.df = df
+
+    def filter_options(self):
+        return hr_data.filter_options(self.df)
+
+    def filtered(self, filters):
+        return hr_data.apply_filters(self.df, filters)
+
+    def kpis(self, filters):
+        return hr_data.compute_kpis(self.filtered(filters))
+
+    def salary_summary(self, filters):
+        filtered_df = self.filtered(filters)
+        return hr_data.compute_salary_summary(filtered_df) if len(filtered_df) else None
+
+    def aggregates(self, filters):
+        return hr_data.compute_all_aggregates(self.filtered(filters))
+
+    # The frame is shared with the tenant cache, so it isn't counted twice
+    def __sizeof__(self):
+        return object.__sizeof__(self)
+
+# Shared SQL for the pushdown backends. Subclasses name the SQL expression of each
+# dashboard column, how a list parameter is matched and how queries are run;
+# results come back in the same shapes as the pandas aggregations.
+class SqlBackend:
+    columns = {}
+    table = "employees"
+
+    def _in_list(self, expression):
+        raise NotImplementedError
+
+    def _quantile(self, expression, fraction):
+        raise NotImplementedError
+
+    # Stable pseudo-random sort key, so a sample is the same on every rerun
+    def _shuffled(self, expression):
+        raise NotImplementedError
+
+    # Condition selecting everyone under a list of managers (one list parameter)
+    def _org_condition(self):
+        raise NotImplementedError
+
+    def _query(self, sql, params=()):
+        raise NotImplementedError
+
+    # Matching rows as a dashboard frame
+    def _rows(self, sql, params):
+        raise NotImplementedError
+
+    def _where(self, filters):
+        conditions = []
+        params = []
+        for column, values in (filters or {}).items():
+            if column == hr_data.ORG_FILTER:
+                conditions.append(self._org_condition())
+            else:
+                conditions.append(self._in_list(self.columns[column]))
+            params.append([value.item() if hasattr(value, 'item') else value for value in values])
+        return (" AND ".join(conditions) or "TRUE"), params
+
+    def _grouped(self, filters, column, select):
+        where, params = self._where(filters)
+        expression = self.columns[column]
+        return self._query(
+            f"SELECT {expression} AS \"{column}\", {select} FROM {self.table} WHERE {where} "
+            f"GROUP BY {expression} ORDER BY {expression}",
+            params
+        )
+
+    def _band(self, column, bins, labels):
+        expression = self.columns[column]
+        cases = " ".join(
+            f"WHEN {expression} >= {low} AND {expression} < {high} THEN '{label}'"
+            for low, high, label in zip(bins[:-1], bins[1:], labels)
+        )
+        return f"CASE {cases} END"
+
+    def filter_options(self):
+        return {
+            column: self._query(
+                f"SELECT DISTINCT {self.columns[column]} AS value FROM {self.table} ORDER BY 1"
+            )['value'].tolist()
+            for column in hr_data.FILTER_COLUMNS
+        }
+
+    def filtered(self, filters):
+        where, params = self._where(filters)
+        return self._rows(f"SELECT * FROM {self.table} WHERE {where}", params)
+
+    def kpis(self, filters):
+        where, params = self._where(filters)
+        row = self._query(f'''
+            SELECT COUNT(*) AS total,
+                   COALESCE(SUM(CASE WHEN {self.columns['Attrition']} = 'Yes' THEN 1 ELSE 0 END), 0) AS leavers,
+                   AVG({self.columns['PerformanceRating']}) AS performance,
+                   AVG({self.columns['JobSatisfaction']}) AS satisfaction
+            FROM {self.table} WHERE {where}
+        ''', params).iloc[0]
+        total, leavers = int(row['total']), int(row['leavers'])
+        return {
+            'total_employees': total,
+            'active_employees': total - leavers,
+            'attrition_count': leavers,
+            'attrition_rate': round((leavers / total) * 100, 1) if total > 0 else 0,
+            'avg_performance': round(float(row['performance']), 1) if total else float('nan'),
+            'avg_satisfaction': round(float(row['satisfaction']), 1) if total else float('nan')
+        }
+
+    def salary_summary(self, filters):
+        where, params = self._where(filters)
+        salary = self.columns['Salary']
+        row = self._query(f'''
+            SELECT COUNT(*) AS total, AVG({salary}) AS avg_salary, {self._quantile(salary, 0.5)} AS median_salary,
+                   MIN({salary}) AS min_salary, MAX({salary}) AS max_salary
+            FROM {self.table} WHERE {where}
+        ''', params).iloc[0]
+        if not row['total']:
+            return None
+        return {name: int(row[name]) for name in ('avg_salary', 'median_salary', 'min_salary', 'max_salary')}
+
+    def count_by(self, filters, column, count_name='Count'):
+        counts = self._grouped(filters, column, f"COUNT(*) AS \"{count_name}\"")
+        return counts.sort_values(count_name, ascending=False)
+
+    def mean_by(self, filters, group_column, value_column):
+        means = self._grouped(filters, group_column, f"AVG({self.columns[value_column]}) AS \"{value_column}\"")
+        return means.sort_values(value_column, ascending=False)
+
+    def attrition_by(self, filters, column):
+        leaving = f"CASE WHEN {self.columns['Attrition']} = 'Yes' THEN 1 ELSE 0 END"
+        attrition = self._grouped(
+            filters, column, f"SUM(1 - {leaving}) AS \"No\", SUM({leaving}) AS \"Yes\", COUNT(*) AS \"Total\""
+        )
+        if attrition.empty or attrition['Yes'].sum() == 0:
+            return None
+        attrition['AttritionRate'] = attrition['Yes'] / attrition['Total'] * 100
+        return attrition
+
+    # Small grouped counts come back from SQL; pandas only fills in the empty combinations
+    def _pair_counts(self, filters, first, second):
+        where, params = self._where(filters)
+        return self._query(
+            f"SELECT {first} AS row_key, {second} AS column_key, COUNT(*) AS count FROM {self.table} "
+            f"WHERE {where} GROUP BY 1, 2",
+            params
+        ).pivot(index='row_key', columns='column_key', values='count')
+
+    def age_gender_counts(self, filters):
+        counts = self._pair_counts(filters, self._band('Age', AGE_BINS, AGE_LABELS), self.columns['Gender'])
+        counts = counts.reindex(AGE_LABELS).fillna(0)
+        counts.index.name = 'AgeGroup'
+        return counts.reset_index().melt(id_vars='AgeGroup', value_vars=counts.columns,
+                                         var_name='Gender', value_name='Count')
+
+    def service_counts(self, filters):
+        where, params = self._where(filters)
+        counts = self._query(
+            f"SELECT {self._band('YearsAtCompany', SERVICE_BINS, SERVICE_LABELS)} AS band, COUNT(*) AS count "
+            f"FROM {self.table} WHERE {where} GROUP BY 1",
+            params
+        ).set_index('band')['count'].reindex(SERVICE_LABELS, fill_value=0)
+        return pd.DataFrame({
+            'Years of Service': pd.Categorical(SERVICE_LABELS, categories=SERVICE_LABELS, ordered=True),
+            'Count': counts.to_numpy()
+        })
+
+    def role_department_counts(self, filters):
+        counts = self._pair_counts(filters, self.columns['Department'], self.columns['JobRole']).fillna(0)
+        counts.index.name = 'Department'
+        return counts.reset_index().melt(id_vars='Department', value_vars=counts.columns,
+                                         var_name='JobRole', value_name='Count')
+
+    def performance_counts(self, filters):
+        counts = self.count_by(filters, 'PerformanceRating').rename(columns={'PerformanceRating': 'Rating'})
+        counts['Label'] = counts['Rating'].map(PERFORMANCE_LABELS)
+        return counts.sort_values('Rating')
+
+    def gender_department_salary(self, filters):
+        where, params = self._where(filters)
+        return self._query(
+            f"SELECT {self.columns['Department']} AS \"Department\", {self.columns['Gender']} AS \"Gender\", "
+            f"AVG({self.columns['Salary']}) AS \"Salary\" FROM {self.table} WHERE {where} "
+            f"GROUP BY 1, 2 ORDER BY 1, 2",
+            params
+        )
+
+    def quantiles_by(self, filters, group_column, value_column):
+        value = self.columns[value_column]
+        return self._grouped(filters, group_column, (
+            f"MIN({value}) AS \"min\", {self._quantile(value, 0.25)} AS q1, "
+            f"{self._quantile(value, 0.5)} AS median, {self._quantile(value, 0.75)} AS q3, MAX({value}) AS \"max\""
+        ))
+
+    # Only the top n groups leave the database; the window total sizes the "Other" bucket
+    def top_counts(self, filters, column, n):
+        where, params = self._where(filters)
+        expression = self.columns[column]
+        counts = self._query(
+            f"SELECT {expression} AS \"{column}\", COUNT(*) AS \"Count\", SUM(COUNT(*)) OVER () AS total "
+            f"FROM {self.table} WHERE {where} AND {expression} IS NOT NULL "
+            f"GROUP BY {expression} ORDER BY 2 DESC, 1 LIMIT {int(n)}",
+            params
+        )
+        total = int(counts['total'].iloc[0]) if len(counts) else 0
+        return with_other(counts[[column, 'Count']], column, total)
+
+    def sample_rows(self, filters, n=hr_data.SCATTER_POINTS):
+        where, params = self._where(filters)
+        select = ", ".join(f"{self.columns[column]} AS \"{column}\"" for column in hr_data.SCATTER_COLUMNS)
+        return self._query(
+            f"SELECT {select} FROM {self.table} WHERE {where} "
+            f"ORDER BY {self._shuffled(self.columns['EmployeeID'])} LIMIT {int(n)}",
+            params
+        )
+
+    # Same keys as hr_data.compute_all_aggregates
+    def aggregates(self, filters):
+        return {
+            'kpis': self.kpis(filters),
+            'salary_summary': self.salary_summary(filters),
+            'dept_counts': self.count_by(filters, 'Department'),
+            'gender_counts': self.count_by(filters, 'Gender'),
+            'perf_by_dept': self.mean_by(filters, 'Department', 'PerformanceRating'),
+            'age_gender': self.age_gender_counts(filters),
+            'service_counts': self.service_counts(filters),
+            'role_dept': self.role_department_counts(filters),
+            'perf_counts': self.performance_counts(filters),
+            'perf_by_role': self.mean_by(filters, 'JobRole', 'PerformanceRating'),
+            'dept_attrition': self.attrition_by(filters, 'Department'),
+            'role_attrition': self.attrition_by(filters, 'JobRole'),
+            'att_by_sat': self.attrition_by(filters, 'JobSatisfaction'),
+            'att_by_perf': self.attrition_by(filters, 'PerformanceRating'),
+            'dept_salary': self.mean_by(filters, 'Department', 'Salary'),
+            'role_salary': self.mean_by(filters, 'JobRole', 'Salary'),
+            'gender_dept_salary': self.gender_department_salary(filters),
+            'dept_salary_quantiles': self.quantiles_by(filters, 'Department', 'Salary'),
+            'perf_salary_quantiles': self.quantiles_by(filters, 'PerformanceRating', 'Salary'),
+            'top_locations': self.top_counts(filters, 'Location', hr_data.TOP_LOCATIONS),
+            'top_education': self.top_counts(filters, 'Education', hr_data.TOP_EDUCATION_LEVELS),
+            'scatter_sample': self.sample_rows(filters)
+        }
+
+# SQL pushdown to the employees table; reads go through database.run_cached_query,
+# so they share its result cache and tenant routing
+class PostgresBackend(SqlBackend):
+    name = "postgres"
+    columns = {
+        'EmployeeID': 'id',
+        'Age': 'age',
+        'Gender': 'gender',
+        'Department': 'department',
+        'JobRole': 'job_role',
+        'Salary': 'salary',
+        'YearsAtCompany': 'years_service',
+        'PerformanceRating': 'performance',
+        'JobSatisfaction': 'job_satisfaction',
+        'WorkLifeBalance': 'work_life_balance',
+        'Attrition': "CASE WHEN attrition THEN 'Yes' ELSE 'No' END",
+        'ManagerID': 'manager_id',
+        'OrgUnit': 'org_unit',
+        'Education': 'education',
+        'Location': 'location'
+    }
+
+    def _in_list(self, expression):
+        return f"{expression} = ANY(%s)"
+
+    def _quantile(self, expression, fraction):
+        return f"percentile_cont({fraction}) WITHIN GROUP (ORDER BY {expression})"
+
+    def _shuffled(self, expression):
+        return f"md5({expression}::text)"
+
+    # One indexed join against the closure table
+    def _org_condition(self):
+        return "id IN (SELECT employee_id FROM org_closure WHERE ancestor_id = ANY(%s))"
+
+    def _query(self, sql, params=()):
+        from database import run_cached_query
+        column_names, rows = run_cached_query(sql, list(params))
+        return pd.DataFrame(rows, columns=column_names)
+
+    def _rows(self, sql, params):
+        from database import COLUMN_MAPPING
+        return hr_data.from_database_frame(self._query(sql, params).rename(columns=COLUMN_MAPPING))
+
+# Embedded DuckDB over the dashboard frame (as an Arrow table) or a Parquet snapshot
+class DuckDBBackend(SqlBackend):
+    name = "duckdb"
+    columns = {column: f'"{column}"' for column in PostgresBackend.columns}
+
+    # Dictionary-encoded columns arrive as Arrow dictionaries; compare them as text
+    columns.update({column: f'CAST("{column}" AS VARCHAR)' for column in HIGH_CARDINALITY_COLUMNS})
+
+    def __init__(self, df=None, parquet_path=None):
+        import duckdb
+        import pyarrow as pa
+
+        # One connection per backend; DuckDB connections aren't shared across threads
+        self._connection = duckdb.connect()
+        self._lock = threading.Lock()
+        self._arrow_bytes = 0
+        if parquet_path:
+            self._connection.execute(
+                f"CREATE VIEW employees AS SELECT * FROM read_parquet('{parquet_path}')"
+            )
+        else:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            self._arrow_bytes = table.nbytes
+            self._connection.register("employees", table)
+
+    def _in_list(self, expression):
+        return f"list_contains(?, {expression})"
+
+    def _quantile(self, expression, fraction):
+        return f"quantile_cont({expression}, {fraction})"
+
+    def _shuffled(self, expression):
+        return f"hash({expression})"
+
+    # Nested-set range of the loaded frame's org index
+    def _org_condition(self):
+        return (
+            'EXISTS (SELECT 1 FROM employees manager WHERE list_contains(?, manager."EmployeeID") '
+            'AND employees."OrgLeft" >= manager."OrgLeft" AND employees."OrgLeft" < manager."OrgRight")'
+        )
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._connection.execute(sql, list(params)).df()
+
+    def _rows(self, sql, params):
+        return self._query(sql, params)
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + self._arrow_bytes
+
+# Build the configured backend for a loaded frame
+def make_backend(name=None, df=None):
+    name = name or BACKEND
+    if name == "pandas":
+        return PandasBackend(df)
+    if name == "postgres":
+        return PostgresBackend()
+    if name == "duckdb":
+        return DuckDBBackend(df, DUCKDB_PARQUET_PATH)
+    raise ValueError(f"Unknown backend: {name}")
@@ -0,0 +1,321 @@
+import os
+import sys
+import time
+import argparse
+import subprocess
+import statistics
+
+# Directory holding the dashboard, so benchmarks run the same files regardless of cwd
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DASHBOARD = os.path.join(ROOT, "simple_hr_dashboard.py")
+
+# Modules the dashboard pulls in at startup, measured individually
+STARTUP_MODULES = ["streamlit", "pandas", "numpy", "plotly.express", "database"]
+
+# Parse `-X importtime` output into {module: (self_us, cumulative_us)}
+def parse_importtime(stderr):
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+# Run a command under `python -X importtime`; returns its import timings, or None if it failed
+def run_importtime(args):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        return None
+    return parse_importtime(result.stderr)
+
+# Cumulative import cost of each startup module in a fresh interpreter
+def bench_importtime(repeat):
+    print(f"{'module':<20} {'median ms':>10} {'min ms':>10}")
+    for module in STARTUP_MODULES:
+        samples = []
+        for _ in range(repeat):
+            timings = run_importtime(["-c", f"import {module}"])
+            if timings and module in timings:
+                samples.append(timings[module][1] / 1000)
+        if samples:
+            print(f"{module:<20} {statistics.median(samples):>10.1f} {min(samples):>10.1f}")
+        else:
+            print(f"{module:<20} {'import failed':>21}")
+
+# Time a full bare-mode run of the dashboard script plus the imports it triggered
+def bench_startup(repeat, top):
+    wall_times = []
+    timings = {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        timings = run_importtime([DASHBOARD])
+        if timings is None:
+            sys.exit("Dashboard script failed to run; check that its dependencies are installed")
+        wall_times.append((time.perf_counter() - start) * 1000)
+
+    print(f"Dashboard script run: median {statistics.median(wall_times):.0f} ms, "
+          f"min {min(wall_times):.0f} ms over {repeat} runs")
+
+    # Top-level packages only, so the list shows what the script itself asked for
+    top_level = {name: cumulative for name, (_, cumulative) in timings.items() if "." not in name}
+    print(f"\n{'top-level import':<30} {'cumulative ms':>14}")
+    for name, cumulative in sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"{name:<30} {cumulative / 1000:>14.1f}")
+    print(f"\nplotly imported during run: {'plotly' in timings}")
+
+# Empty the employees table between benchmark sizes
+def reset_employees(database):
+    conn = database.get_connection()
+    cursor = conn.cursor()
+    cursor.execute("TRUNCATE employees RESTART IDENTITY")
+    database.bump_table_version(cursor, 'employees')
+    conn.commit()
+    cursor.close()
+    conn.close()
+    database.query_cache.invalidate()
+
+# Rows per second for row-at-a-time inserts, the bulk loader and full-table reads
+def bench_database_sizes(database, sizes):
+    import hr_data
+    
+    print(f"{'rows':>8} {'insert rows/s':>14} {'bulk rows/s':>12} {'cold read rows/s':>17} {'warm read rows/s':>17}")
+    for size in sizes:
+        sample = hr_data.create_sample_data(size)
+        rows = database.employee_rows(sample)
+        
+        reset_employees(database)
+        conn = database.get_connection()
+        cursor = conn.cursor()
+        insert = f"INSERT INTO employees ({', '.join(database.INSERT_COLUMNS)}) VALUES ({', '.join(['%s'] * len(database.INSERT_COLUMNS))})"
+        start = time.perf_counter()
+        for row in rows:
+            cursor.execute(insert, row)
+        conn.commit()
+        insert_seconds = time.perf_counter() - start
+        cursor.close()
+        conn.close()
+        
+        reset_employees(database)
+        start = time.perf_counter()
+        database.populate_sample_data(sample)
+        bulk_seconds = time.perf_counter() - start
+        
+        database.query_cache.invalidate()
+        start = time.perf_counter()
+        database.get_all_employees()
+        cold_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        database.get_all_employees()
+        warm_seconds = time.perf_counter() - start
+        
+        print(f"{size:>8} {size / insert_seconds:>14,.0f} {size / bulk_seconds:>12,.0f} "
+              f"{size / cold_seconds:>17,.0f} {size / warm_seconds:>17,.0f}")
+
+# Start a throwaway local Postgres and benchmark database.py against it (correctness
+# is covered by tests/test_database.py)
+def bench_database(sizes, port):
+    from pg_temp import TemporaryPostgres
+    
+    with TemporaryPostgres(port=port) as server:
+        server.export_environment()
+        import database
+        
+        database.init_database()
+        bench_database_sizes(database, sizes)
+
+# Median seconds for one full refresh (filtered rows plus every aggregation) of a filter state
+def time_backend(backend, filters, repeat, before_each=None):
+    samples = []
+    for _ in range(repeat):
+        if before_each:
+            before_each()
+        start = time.perf_counter()
+        backend.filtered(filters)
+        backend.aggregates(filters)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+# Compare the pandas, DuckDB and Postgres backends at several dataset sizes.
+# Postgres runs on a temporary local server and is skipped when none can be started.
+def bench_backends(sizes, repeat, port):
+    import hr_data
+    from backends import BACKENDS, make_backend
+    from pg_temp import TemporaryPostgres
+
+    server = None
+    try:
+        server = TemporaryPostgres(port=port).start()
+        server.export_environment()
+        import database
+        database.init_database()
+    except Exception as error:
+        print(f"Postgres backend skipped: {error}\n")
+        server = None
+
+    try:
+        print(f"{'rows':>8} {'filter':<12}" + "".join(f" {name + ' ms':>12}" for name in BACKENDS))
+        for size in sizes:
+            sample = hr_data.create_sample_data(size)
+            if server:
+                reset_employees(database)
+                database.populate_sample_data(sample)
+
+            all_selected = {column: list(values) for column, values in hr_data.filter_options(sample).items()}
+            one_department = {**all_selected, 'Department': [hr_data.DEPARTMENTS[0]]}
+            for label, filters in [("everything", all_selected), ("one dept", one_department)]:
+                cells = []
+                for name in BACKENDS:
+                    if name == "postgres" and not server:
+                        cells.append(f" {'-':>12}")
+                        continue
+                    backend = make_backend(name, sample)
+                    # Postgres reads are cached, so every timed run starts cold
+                    before_each = database.query_cache.invalidate if name == "postgres" else None
+                    seconds = time_backend(backend, filters, repeat, before_each)
+                    cells.append(f" {seconds * 1000:>12.1f}")
+                print(f"{size:>8} {label:<12}" + "".join(cells))
+    finally:
+        if server:
+            server.stop()
+
+# Full-table load through row tuples (get_all_employees) against COPY bulk reads
+def bench_copy(sizes, repeat, port):
+    import pandas as pd
+    import hr_data
+    from pg_temp import TemporaryPostgres
+
+    with TemporaryPostgres(port=port) as server:
+        server.export_environment()
+        import database
+        database.init_database()
+
+        print(f"{'rows':>8} {'tuples ms':>10} {'copy ms':>10} {'copy arrow ms':>14} {'speedup':>8}")
+        for size in sizes:
+            reset_employees(database)
+            database.populate_sample_data(hr_data.create_sample_data(size))
+
+            def timed(load):
+                samples = []
+                for _ in range(repeat):
+                    database.query_cache.invalidate()
+                    start = time.perf_counter()
+                    result = load()
+                    samples.append(time.perf_counter() - start)
+                return statistics.median(samples), result
+
+            tuples_seconds, expected = timed(database.get_all_employees)
+            copy_seconds, copied = timed(database.copy_employees)
+            arrow_seconds, _ = timed(lambda: database.copy_employees(as_arrow=True))
+
+            # Both paths must return the same employees
+            pd.testing.assert_frame_equal(
+                expected.sort_values('ID').reset_index(drop=True),
+                copied[expected.columns].sort_values('ID').reset_index(drop=True),
+                check_dtype=False
+            )
+            print(f"{size:>8} {tuples_seconds * 1000:>10.1f} {copy_seconds * 1000:>10.1f} "
+                  f"{arrow_seconds * 1000:>14.1f} {tuples_seconds / copy_seconds:>7.1f}x")
+
+# Live-update latency on a temporary Postgres: change rows with plain SQL and time how
+# long the listener takes to patch the cached frame and pay cells (correctness is
+# covered by tests/test_live_updates.py)
+def bench_live(employees, port):
+    import hr_data
+    from pg_temp import TemporaryPostgres
+
+    with TemporaryPostgres(port=port) as server:
+        server.export_environment()
+        import database
+        from pay_equity import build_pay_cells
+        from tenant_cache import tenant_cache
+        from tenants import current_tenant
+        from live_updates import ChangeListener
+
+        database.init_database(hr_data.create_sample_data(employees))
+        tenant = current_tenant()
+        keys = (('employees', 'postgres', employees), ('pay_cells', 'postgres', employees))
+        df = hr_data.load_employees('postgres', employees, tenant)
+        tenant_cache.put(tenant, keys[0], df)
+        tenant_cache.put(tenant, keys[1], build_pay_cells(df))
+
+        listener = ChangeListener(lambda name: keys, wait_seconds=0.1)
+        listener.start()
+        listener.watch('sales', tenant, {'Department': ['Sales']})
+
+        target = int(df.loc[df['Department'] == 'Sales', 'EmployeeID'].iloc[0])
+        conn = database.get_connection()
+        cursor = conn.cursor()
+        for label, statement in [
+            ("update", f"UPDATE employees SET salary = salary + 1000 WHERE id = {target}"),
+            ("bulk update", "UPDATE employees SET salary = salary + 1 WHERE id % 10 = 0"),
+            ("delete", f"DELETE FROM employees WHERE id = {target}")
+        ]:
+            batches = listener.batches_applied
+            start = time.perf_counter()
+            cursor.execute(statement)
+            conn.commit()
+            while listener.batches_applied == batches and time.perf_counter() - start < 10:
+                time.sleep(0.01)
+            print(f"{label}: applied {(time.perf_counter() - start) * 1000:.1f} ms after commit "
+                  f"(apply took {(listener.last_latency or 0) * 1000:.1f} ms)")
+        cursor.close()
+        conn.close()
+        listener.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HR dashboard benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    importtime_parser = subparsers.add_parser("importtime", help="import cost of startup modules")
+    importtime_parser.add_argument("--repeat", type=int, default=5)
+
+    startup_parser = subparsers.add_parser("startup", help="time a bare-mode dashboard run")
+    startup_parser.add_argument("--repeat", type=int, default=3)
+    startup_parser.add_argument("--top", type=int, default=15)
+
+    db_parser = subparsers.add_parser("db", help="benchmark database.py on a temporary Postgres")
+    db_parser.add_argument("--sizes", default="1000,10000,50000",
+                           help="comma-separated employee counts to benchmark")
+    db_parser.add_argument("--port", type=int, default=54329,
+                           help="port number for the server's unix socket name")
+
+    backends_parser = subparsers.add_parser("backends", help="compare the pandas, DuckDB and Postgres backends")
+    backends_parser.add_argument("--sizes", default="10000,100000",
+                                 help="comma-separated employee counts to benchmark")
+    backends_parser.add_argument("--repeat", type=int, default=5)
+    backends_parser.add_argument("--port", type=int, default=54329,
+                                 help="port number for the temporary server's unix socket name")
+
+    copy_parser = subparsers.add_parser("copy", help="compare tuple reads with COPY bulk reads")
+    copy_parser.add_argument("--sizes", default="10000,100000,500000",
+                             help="comma-separated employee counts to benchmark")
+    copy_parser.add_argument("--repeat", type=int, default=3)
+    copy_parser.add_argument("--port", type=int, default=54329,
+                             help="port number for the temporary server's unix socket name")
+
+    live_parser = subparsers.add_parser("live", help="time LISTEN/NOTIFY live updates on a temporary Postgres")
+    live_parser.add_argument("--employees", type=int, default=1000)
+    live_parser.add_argument("--port", type=int, default=54329,
+                             help="port number for the temporary server's unix socket name")
+
+    args = parser.parse_args()
+
+    if args.command == "importtime":
+        bench_importtime(args.repeat)
+    elif args.command == "startup":
+        bench_startup(args.repeat, args.top)
+    elif args.command == "db":
+        bench_database([int(size) for size in args.sizes.split(",")], args.port)
+    elif args.command == "backends":
+        bench_backends([int(size) for size in args.sizes.split(",")], args.repeat, args.port)
+    elif args.command == "copy":
+        bench_copy([int(size) for size in args.sizes.split(",")], args.repeat, args.port)
+    elif args.command == "live":
+        bench_live(args.employees, args.port)
@@ -0,0 +1,117 @@
+import re
+import time
+import hashlib
+import pickle
+import sqlite3
+import threading
+from collections import OrderedDict
+
+# Collapse whitespace and trailing semicolons so equivalent SQL shares a cache key
+def normalize_sql(query):
+    return re.sub(r"\s+", " ", query).strip().rstrip(";").strip()
+
+# Two-tier result cache: in-process LRU plus an optional SQLite store that survives
+# restarts. Both tiers are bounded; the disk tier evicts its least recently used rows on
+# write, which also clears out generations orphaned by table-version bumps.
+class QueryCache:
+    def __init__(self, max_entries=256, disk_path=None, max_disk_entries=4096):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.disk_path = disk_path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        
+        if disk_path:
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            columns = [row[1] for row in self._disk.execute("PRAGMA table_info(query_cache)")]
+            if columns and 'last_used' not in columns:
+                # Cache file from before eviction: it only holds cached results, so start over
+                self._disk.execute("DROP TABLE query_cache")
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS query_cache (key TEXT PRIMARY KEY, value BLOB, last_used REAL NOT NULL)"
+            )
+            self._disk.execute("CREATE INDEX IF NOT EXISTS query_cache_last_used ON query_cache (last_used)")
+            self._disk.commit()
+    
+    # Key on normalized SQL, parameters and the versions of the tables it reads
+    def make_key(self, query, params, versions):
+        payload = repr((normalize_sql(query), tuple(params or ()), tuple(sorted(versions.items()))))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    # Look a key up in memory first, then on disk; returns (found, value)
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return True, self._entries[key]
+            
+            if self._disk is not None:
+                row = self._disk.execute(
+                    "SELECT value FROM query_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value = pickle.loads(row[0])
+                    self._disk.execute("UPDATE query_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+                    self._disk.commit()
+                    self._remember(key, value)
+                    self.disk_hits += 1
+                    return True, value
+            
+            self.misses += 1
+            return False, None
+    
+    # Store a value in both tiers
+    def put(self, key, value):
+        with self._lock:
+            self._remember(key, value)
+            if self._disk is not None:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO query_cache (key, value, last_used) VALUES (?, ?, ?)",
+                    (key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), time.time())
+                )
+                self._evict_disk()
+                self._disk.commit()
+    
+    # Keep the disk tier within max_disk_entries, dropping the least recently used rows
+    def _evict_disk(self):
+        count = self._disk.execute("SELECT COUNT(*) FROM query_cache").fetchone()[0]
+        if count > self.max_disk_entries:
+            self._disk.execute(
+                "DELETE FROM query_cache WHERE key IN (SELECT key FROM query_cache ORDER BY last_used LIMIT ?)",
+                (count - self.max_disk_entries,)
+            )
+    
+    def _remember(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    # Drop every cached result (used when this process writes to the database)
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            if self._disk is not None:
+                self._disk.execute("DELETE FROM query_cache")
+                self._disk.commit()
+            self.invalidations += 1
+    
+    # Hit/miss counters for tuning the cache size
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'disk_entries': self._disk.execute("SELECT COUNT(*) FROM query_cache").fetchone()[0] if self._disk is not None else 0,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_rate': round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0.0
+            }
@@ -0,0 +1,632 @@
+import sys
+import importlib.util
+
+from theme import (
+    PRIMARY_COLOR, HIGHLIGHT_COLOR, TEXT_COLOR,
+    DEPARTMENT_COLORS, PERFORMANCE_COLORS, GENDER_COLORS
+)
+from hr_data import TOP_LOCATIONS
+
+# Import a module on first attribute access so chart code doesn't delay the first paint
+def lazy_import(name):
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+# Plotly is only loaded once the first chart is built
+px = lazy_import("plotly.express")
+go = lazy_import("plotly.graph_objects")
+
+# Transparent background and theme font shared by every chart
+BASE_LAYOUT = dict(
+    plot_bgcolor='rgba(0,0,0,0)',
+    paper_bgcolor='rgba(0,0,0,0)',
+    font=dict(color=TEXT_COLOR)
+)
+
+# Overview: employees per department
+def department_distribution(dept_counts):
+    fig = px.bar(
+        dept_counts,
+        x='Count',
+        y='Department',
+        orientation='h',
+        title='Employees by Department',
+        text='Count',
+        color='Department',
+        color_discrete_map=DEPARTMENT_COLORS
+    )
+
+    fig.update_layout(
+        **BASE_LAYOUT,
+        yaxis_title='',
+        xaxis_title='Number of Employees',
+        showlegend=False,
+        height=400
+    )
+    return fig
+
+# Overview: gender donut
+def gender_distribution(gender_counts):
+    fig = px.pie(
+        gender_counts,
+        values='Count',
+        names='Gender',
+        title='Gender Breakdown',
+        hole=0.6,
+        color='Gender',
+        color_discrete_map=GENDER_COLORS
+    )
+
+    fig.update_layout(
+        **BASE_LAYOUT,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=-0.1,
+            xanchor="center",
+            x=0.5
+        ),
+        height=400
+    )
+
+    fig.update_traces(textinfo='percent+label')
+    return fig
+
+# Overview: average performance per department
+def performance_by_department(perf_by_dept):
+    fig = px.bar(
+        perf_by_dept,
+        x='Department',
+        y='PerformanceRating',
+        title='Average Performance Rating by Department',
+        color='PerformanceRating',
+        text=perf_by_dept['PerformanceRating'].round(1)
+    )
+
+    fig.update_layout(
+        **BASE_LAYOUT,
+        xaxis_title='',
+        yaxis_title='Average Performance Rating (1-5)',
+        coloraxis_showscale=False
+    )
+    return fig
+
+# Box per group drawn from precomputed quartiles; the whiskers span min to max
+def _quantile_boxes(quantiles, column, colors=None):
+    fig = go.Figure()
+    for _, row in quantiles.iterrows():
+        fig.add_trace(go.Box(
+            x=[row[column]],
+            q1=[row['q1']],
+            median=[row['median']],
+            q3=[row['q3']],
+            lowerfence=[row['min']],
+            upperfence=[row['max']],
+            name=str(row[column]),
+            marker_color=(colors or {}).get(row[column])
+        ))
+    return fig
+
+# Overview: salary boxplot per department
+def salary_distribution(dept_salary_quantiles):
+    fig = _quantile_boxes(dept_salary_quantiles, 'Department', DEPARTMENT_COLORS)
+
+    fig.update_layout(
+        **BASE_LAYOUT,
+        title='Salary Distribution by Department',
+        xaxis_title='',
+        yaxis_title='Salary ($)',
+        showlegend=False
+    )
+    return fig
+
+# Overview: job satisfaction vs performance scatter
+def satisfaction_vs_performance(scatter_sample):
+    fig = px.scatter(
+        scatter_sample,
+        x='JobSatisfaction',
+        y='PerformanceRating',
+        color='Department',
+        size='YearsAtCompany',
+        hover_data=['JobRole', 'Gender', 'Salary'],
+        color_discrete_map=DEPARTMENT_COLORS,
+        title='Relationship Between Job Satisfaction and Performance'
+    )
+
+    fig.update_layout(
+        **BASE_LAYOUT,
+        xaxis_title='Job Satisfaction (1-4)',
+        yaxis_title='Performance Rating (1-5)',
+        legend=dict(
+            title='Department',
+            yanchor="top",
+            y=0.99,
+            xanchor="left",
+            x=0.01
+        )
+    )
+    return fig
+
+# Demographics: age groups by gender
+def age_distribution(age_gender):
+    fig = px.bar(
+        age_gender,
+        x='AgeGroup',
+        y='Count',
+        color='Gender',
+        title='Age Distribution by Gender',
+        barmode='group',
+        color_discrete_map=GENDER_COLORS
+    )
+
+    fig.update_layout(
+        **BASE_LAYOUT,
+        xaxis_title='Age Group',
+        yaxis_title='Number of Employees'
+    )
+    return fig
+
+# Demographics: tenure bands
+def tenure_distribution(service_counts):
+    fig = px.bar(
+        service_counts,
+        x='Years of Service',
+        y='Count',
+        title='Employee Tenure Distribution',
+        text='Count',
+        color_discrete_sequence=[PRIMARY_COLOR]
+    )
+
+    fig.update_layout(
+        **BASE_LAYOUT,
+        xaxis_title='',
+        yaxis_title='Number of Employees'
+    )
+    return fig
+
+# Demographics: busiest locations plus "Other", so the chart stays the same size
+# however many locations there are
+def location_distribution(top_locations):
+    fig = px.bar(
+        top_locations,
+        x='Count',
+        y='Location',
+        orientation='h',
+        title=f'Top {TOP_LOCATIONS} Locations',
+        text='Count',
+        color_discrete_sequence=[PRIMARY_COLOR]
+    )
+
+    fig.update_layout(
+        **BASE_LAYOUT,
+        yaxis=dict(title='', autorange='reversed'),
+        xaxis_title='Number of Employees',
+        height=500
+    )
+    return fig
+
+# Demographics: highest education level
+def education_distribution(top_education):
+    fig = px.bar(
+        top_education,
+        x='Education',
+        y='Count',
+        title='Education Levels',
+        text='Count',
+        color_discrete_sequence=[HIGHLIGHT_COLOR]
+    )
+
+    fig.update_layout(
+        **BASE_LAYOUT,
+        xaxis_title='',
+        yaxis_title='Number of Employees'
+    )
+    return fig
+
+# Demographics: job roles stacked per department
+def roles_by_department(role_dept):
+    fig = px.bar(
+        role_dept,
+        x='Department',
+        y='Count',
+        color='JobRole',
+        title='Job Roles Distribution by Department',
+        color_discrete_sequence=px.colors.qualitative.Bold
+    )
+
+    fig.update_layout(
+        **BASE_LAYOUT,
+        xaxis_title='',
+        yaxis_title='Number of Employees',
+        legend=dict(title='Job Role')
+    )
+    return fig
+
+# Performance: rating distribution with labels
+def performance_distribution(perf_counts):
+    fig = px.bar(
+        perf_counts,
+        x='Rating',
+        y='Count',
+        title='Performance Rating Distribution',
+        text='Count',
+        labels={'Rating': 'Performance Rating', 'Count': 'Number of Employees'}
+    )
+
+    # Update bar colors
+    fig.update_traces(marker_color=[PERFORMANCE_COLORS[rating] for rating in perf_counts['Rating']])
+
+    # Add annotations for labels
+    for _, row in perf_counts.iterrows():
+        fig.add_annotation(
+            x=row['Rating'],
+            y=row['Count'],
+            text=row['Label'],
+            showarrow=False,
+            yshift=10,
+            font=dict(color='white', size=10)
+        )
+
+    fig.update_layout(
+        **BASE_LAYOUT,
+        xaxis_title='Performance Rating',
+        yaxis_title='Number of Employees'
+    )
+    return fig
+
+# Performance: average rating per job role
+def performance_by_role(perf_by_role):
+    fig = px.bar(
+        perf_by_role,
+        y='JobRole',
+        x='PerformanceRating',
+        orientation='h',
+        title='Average Performance Rating by Job Role',
+        text=perf_by_role['PerformanceRating'].round(1),
+        color='PerformanceRating'
+    )
+
+    fig.update_layout(
+        **BASE_LAYOUT,
+        xaxis_title='Average Performance Rating (1-5)',
+        yaxis_title='',
+        coloraxis_showscale=False
+    )
+    return fig
+
+# Performance: satisfaction vs tenure scatter
+def satisfaction_vs_tenure(scatter_sample):
+    fig = px.scatter(
+        scatter_sample,
+        x='YearsAtCompany',
+        y='JobSatisfaction',
+        color='PerformanceRating',
+        size='Salary',
+        hover_data=['Department', 'JobRole', 'Gender'],
+        title='Job Satisfaction vs Years at Company'
+    )
+
+    fig.update_layout(
+        **BASE_LAYOUT,
+        xaxis_title='Years at Company',
+        yaxis_title='Job Satisfaction (1-4)',
+        coloraxis=dict(colorbar=dict(title='Performance Rating'))
+    )
+    return fig
+
+# Attrition: rate per department
+def attrition_by_department(dept_attrition):
+    dept_attrition = dept_attrition.sort_values('AttritionRate', ascending=False)
+
+    fig = px.bar(
+        dept_attrition,
+        x='Department',
+        y='AttritionRate',
+        title='Attrition Rate by Department (%)',
+        text=dept_attrition['AttritionRate'].round(1).astype(str) + '%',
+        color='Department',
+        color_discrete_map=DEPARTMENT_COLORS
+    )
+
+    fig.update_layout(
+        **BASE_LAYOUT,
+        xaxis_title='',
+        yaxis_title='Attrition Rate (%)',
+        showlegend=False
+    )
+    return fig
+
+# Attrition: rate per job role
+def attrition_by_role(role_attrition):
+    role_attrition = role_attrition.sort_values('AttritionRate', ascending=False)
+
+    fig = px.bar(
+        role_attrition,
+        x='JobRole',
+        y='AttritionRate',
+        title='Attrition Rate by Job Role (%)',
+        text=role_attrition['AttritionRate'].round(1).astype(str) + '%',
+        color_discrete_sequence=[PRIMARY_COLOR]
+    )
+
+    fig.update_layout(
+        **BASE_LAYOUT,
+        xaxis_title='',
+        yaxis_title='Attrition Rate (%)'
+    )
+    return fig
+
+# Attrition rate line over a 1-N score column, with value labels
+def _attrition_line(attrition, column, title, axis_title):
+    fig = px.line(
+        attrition,
+        x=column,
+        y='AttritionRate',
+        title=title,
+        markers=True,
+        color_discrete_sequence=[HIGHLIGHT_COLOR]
+    )
+
+    # Add annotations
+    for _, row in attrition.iterrows():
+        fig.add_annotation(
+            x=row[column],
+            y=row['AttritionRate'],
+            text=f"{row['AttritionRate']:.1f}%",
+            showarrow=False,
+            yshift=10,
+            font=dict(color=TEXT_COLOR)
+        )
+
+    fig.update_layout(
+        **BASE_LAYOUT,
+        xaxis_title=axis_title,
+        yaxis_title='Attrition Rate (%)'
+    )
+    return fig
+
+# Attrition: rate by job satisfaction
+def attrition_by_satisfaction(att_by_sat):
+    return _attrition_line(att_by_sat, 'JobSatisfaction', 'Attrition Rate by Job Satisfaction',
+                           'Job Satisfaction (1-4)')
+
+# Attrition: rate by performance rating
+def attrition_by_performance(att_by_perf):
+    return _attrition_line(att_by_perf, 'PerformanceRating', 'Attrition Rate by Performance Rating',
+                           'Performance Rating (1-5)')
+
+# Compensation: average salary per department
+def salary_by_department(dept_salary):
+    fig = px.bar(
+        dept_salary,
+        x='Department',
+        y='Salary',
+        title='Average Salary by Department',
+        text=dept_salary['Salary'].apply(lambda x: f"${int(x):,}"),
+        color='Department',
+        color_discrete_map=DEPARTMENT_COLORS
+    )
+
+    fig.update_layout(
+        **BASE_LAYOUT,
+        xaxis_title='',
+        yaxis_title='Average Salary ($)',
+        showlegend=False
+    )
+    return fig
+
+# Compensation: average salary per job role
+def salary_by_role(role_salary):
+    fig = px.bar(
+        role_salary,
+        x='JobRole',
+        y='Salary',
+        title='Average Salary by Job Role',
+        text=role_salary['Salary'].apply(lambda x: f"${int(x):,}"),
+        color_discrete_sequence=[PRIMARY_COLOR]
+    )
+
+    fig.update_layout(
+        **BASE_LAYOUT,
+        xaxis_title='',
+        yaxis_title='Average Salary ($)'
+    )
+    return fig
+
+# Compensation: salary vs tenure scatter
+def salary_vs_tenure(scatter_sample):
+    fig = px.scatter(
+        scatter_sample,
+        x='YearsAtCompany',
+        y='Salary',
+        color='Department',
+        size='PerformanceRating',
+        hover_data=['JobRole', 'Gender', 'Age'],
+        title='Salary vs Years at Company',
+        color_discrete_map=DEPARTMENT_COLORS
+    )
+
+    fig.update_layout(
+        **BASE_LAYOUT,
+        xaxis_title='Years at Company',
+        yaxis_title='Salary ($)'
+    )
+    return fig
+
+# Compensation: salary boxplot per performance rating
+def salary_by_performance(perf_salary_quantiles):
+    fig = _quantile_boxes(perf_salary_quantiles, 'PerformanceRating')
+
+    fig.update_layout(
+        **BASE_LAYOUT,
+        title='Salary Distribution by Performance Rating',
+        xaxis_title='Performance Rating',
+        yaxis_title='Salary ($)',
+        showlegend=False
+    )
+    return fig
+
+# Compensation: average salary per department and gender
+def gender_pay(gender_dept_salary):
+    fig = px.bar(
+        gender_dept_salary,
+        x='Department',
+        y='Salary',
+        color='Gender',
+        barmode='group',
+        title='Average Salary by Department and Gender',
+        color_discrete_map=GENDER_COLORS
+    )
+
+    fig.update_layout(
+        **BASE_LAYOUT,
+        xaxis_title='',
+        yaxis_title='Average Salary ($)'
+    )
+    return fig
+
+# Compensation: adjusted gender pay gap with 95% intervals, from pay_equity.pay_gap_table
+def adjusted_pay_gap(gap_table):
+    fig = px.bar(
+        gap_table,
+        x='Department',
+        y='adjusted_gap',
+        error_y=gap_table['ci_high'] - gap_table['adjusted_gap'],
+        title='Adjusted Gender Pay Gap (Female - Male)',
+        text=gap_table['adjusted_gap'].apply(lambda x: f"${x:,.0f}"),
+        color_discrete_sequence=[HIGHLIGHT_COLOR]
+    )
+
+    fig.update_layout(
+        **BASE_LAYOUT,
+        xaxis_title='',
+        yaxis_title='Salary Difference ($)'
+    )
+    return fig
+
+# Compare: one metric per dimension value, segments side by side
+def segment_comparison(table, dimension, metric, metric_label):
+    fig = px.bar(
+        table,
+        x=dimension,
+        y=metric,
+        color='Segment',
+        barmode='group',
+        title=f"{metric_label} by {dimension}",
+        color_discrete_sequence=[PRIMARY_COLOR, HIGHLIGHT_COLOR, '#4CC9F0', '#F77F00']
+    )
+
+    fig.update_layout(
+        **BASE_LAYOUT,
+        xaxis_title='',
+        yaxis_title=metric_label
+    )
+    return fig
+
+# Trends: stacked headcount per department from the monthly rollups
+def headcount_trend(rollups):
+    fig = px.area(
+        rollups,
+        x='Month',
+        y='Headcount',
+        color='Department',
+        title='Monthly Headcount by Department',
+        color_discrete_map=DEPARTMENT_COLORS
+    )
+
+    fig.update_layout(
+        **BASE_LAYOUT,
+        xaxis_title='',
+        yaxis_title='Number of Employees'
+    )
+    return fig
+
+# Trends: company-wide monthly attrition rate
+def attrition_trend(monthly):
+    fig = px.line(
+        monthly,
+        x='Month',
+        y='AttritionRate',
+        title='Monthly Attrition Rate (%)',
+        markers=True,
+        color_discrete_sequence=[HIGHLIGHT_COLOR]
+    )
+
+    fig.update_layout(
+        **BASE_LAYOUT,
+        xaxis_title='',
+        yaxis_title='Attrition Rate (%)'
+    )
+    return fig
+
+# Trends: hires and leavers per month
+def hires_vs_leavers(monthly):
+    flows = monthly.melt(id_vars='Month', value_vars=['Hires', 'Leavers'],
+                         var_name='Flow', value_name='Count')
+
+    fig = px.bar(
+        flows,
+        x='Month',
+        y='Count',
+        color='Flow',
+        barmode='group',
+        title='Monthly Hires and Leavers',
+        color_discrete_map={'Hires': PRIMARY_COLOR, 'Leavers': HIGHLIGHT_COLOR}
+    )
+
+    fig.update_layout(
+        **BASE_LAYOUT,
+        xaxis_title='',
+        yaxis_title='Number of Employees'
+    )
+    return fig
+
+# Every chart with the aggregate it is drawn from (a key of backend.aggregates), by
+# tab order; shared with pre-rendering and reports
+FIGURE_BUILDERS = {
+    'department_distribution': ('dept_counts', department_distribution),
+    'gender_distribution': ('gender_counts', gender_distribution),
+    'performance_by_department': ('perf_by_dept', performance_by_department),
+    'salary_distribution': ('dept_salary_quantiles', salary_distribution),
+    'satisfaction_vs_performance': ('scatter_sample', satisfaction_vs_performance),
+    'age_distribution': ('age_gender', age_distribution),
+    'tenure_distribution': ('service_counts', tenure_distribution),
+    'roles_by_department': ('role_dept', roles_by_department),
+    'location_distribution': ('top_locations', location_distribution),
+    'education_distribution': ('top_education', education_distribution),
+    'performance_distribution': ('perf_counts', performance_distribution),
+    'performance_by_role': ('perf_by_role', performance_by_role),
+    'satisfaction_vs_tenure': ('scatter_sample', satisfaction_vs_tenure),
+    'attrition_by_department': ('dept_attrition', attrition_by_department),
+    'attrition_by_role': ('role_attrition', attrition_by_role),
+    'attrition_by_satisfaction': ('att_by_sat', attrition_by_satisfaction),
+    'attrition_by_performance': ('att_by_perf', attrition_by_performance),
+    'salary_by_department': ('dept_salary', salary_by_department),
+    'salary_by_role': ('role_salary', salary_by_role),
+    'salary_vs_tenure': ('scatter_sample', salary_vs_tenure),
+    'salary_by_performance': ('perf_salary_quantiles', salary_by_performance),
+    'gender_pay': ('gender_dept_salary', gender_pay)
+}
+
+# One chart from a filter state's aggregates; None when its aggregate is missing (e.g.
+# nobody in the selection left, or the data has no location column)
+def build_figure(name, aggregates):
+    key, builder = FIGURE_BUILDERS[name]
+    table = aggregates.get(key)
+    return None if table is None else builder(table)
+
+# Build every registered chart for one filter state (charts without data are skipped)
+def build_all_figures(aggregates):
+    figures = {}
+    for name in FIGURE_BUILDERS:
+        fig = build_figure(name, aggregates)
+        if fig is not None:
+            figures[name] = fig
+    return figures
@@ -1,8 +1,15 @@
+import io
 import os
+import time
+import argparse
+from datetime import date
 import pandas as pd
 import psycopg2
 from psycopg2.extras import execute_values
 from dotenv import load_dotenv
+from cache import QueryCache
+from tenants import TENANTS, current_tenant, tenant_settings, use_tenant
+from hr_data import ORG_FILTER
 
 # Load environment variables
 load_dotenv()
@@ -14,16 +21,129 @@ DB_USER = os.getenv("PGUSER")
 DB_PASSWORD = os.getenv("PGPASSWORD")
 DB_PORT = os.getenv("PGPORT")
 
-# Create a connection to the database
-def get_connection():
+# Rename database columns to match our application
+COLUMN_MAPPING = {
+    'id': 'ID',
+    'age': 'Age',
+    'gender': 'Gender',
+    'department': 'Department',
+    'education': 'Education',
+    'location': 'Location',
+    'salary': 'Salary',
+    'performance': 'Performance',
+    'years_service': 'YearsService',
+    'job_role': 'JobRole',
+    'job_satisfaction': 'JobSatisfaction',
+    'work_life_balance': 'WorkLifeBalance',
+    'attrition': 'Attrition',
+    'manager_id': 'ManagerID',
+    'org_unit': 'OrgUnit'
+}
+
+# Application column names (either naming convention) to employees columns
+APPLICATION_COLUMNS = {
+    **{name: column for column, name in COLUMN_MAPPING.items()},
+    'EmployeeID': 'id',
+    'PerformanceRating': 'performance',
+    'YearsAtCompany': 'years_service'
+}
+
+# Columns the drill-down table may sort on; each has a (column, id) index for keyset paging
+SORTABLE_COLUMNS = ['id', 'salary', 'age', 'years_service', 'performance']
+
+# Dataframe columns accepted for each employees column on insert, in order of preference
+INSERT_COLUMNS = {
+    'age': ['Age'],
+    'gender': ['Gender'],
+    'department': ['Department'],
+    'education': ['Education'],
+    'location': ['Location'],
+    'salary': ['Salary'],
+    'performance': ['Performance', 'PerformanceRating'],
+    'years_service': ['YearsService', 'YearsAtCompany'],
+    'job_role': ['JobRole'],
+    'job_satisfaction': ['JobSatisfaction'],
+    'work_life_balance': ['WorkLifeBalance'],
+    'attrition': ['Attrition'],
+    'manager_id': ['ManagerID'],
+    'org_unit': ['OrgUnit']
+}
+
+# Connections opened by this process (read by the load test)
+connection_stats = {'opened': 0}
+
+# Optional query instrumentation, enabled by pointing HR_QUERY_LOG at a log file
+QUERY_LOG_ENABLED = bool(os.getenv("HR_QUERY_LOG"))
+
+# Create a connection to the database; a tenant's own database or schema takes
+# precedence (the current session's tenant by default)
+def get_connection(tenant=None):
+    settings = tenant_settings(tenant)
+    options = {}
+    if settings.get('schema'):
+        options['options'] = f"-c search_path={settings['schema']},public"
+    if QUERY_LOG_ENABLED:
+        from query_log import InstrumentedCursor
+        options['cursor_factory'] = InstrumentedCursor
+    
+    connection_stats['opened'] += 1
     return psycopg2.connect(
         host=DB_HOST,
-        database=DB_NAME,
+        database=settings.get('database', DB_NAME),
         user=DB_USER,
         password=DB_PASSWORD,
-        port=DB_PORT
+        port=DB_PORT,
+        **options
     )
 
+# Shared result cache for this process (the disk tier is off unless a path is given)
+query_cache = QueryCache(
+    max_entries=int(os.getenv("HR_QUERY_CACHE_SIZE", "256")),
+    disk_path=os.getenv("HR_QUERY_CACHE_PATH"),
+    max_disk_entries=int(os.getenv("HR_QUERY_CACHE_DISK_SIZE", "4096"))
+)
+
+# Read the current version of each table (a missing row counts as version 0)
+def get_table_versions(cursor, tables):
+    cursor.execute(
+        "SELECT table_name, version FROM table_versions WHERE table_name = ANY(%s)",
+        (list(tables),)
+    )
+    versions = {table: 0 for table in tables}
+    versions.update(dict(cursor.fetchall()))
+    return versions
+
+# Bump a table's version so cached results in every process stop matching
+def bump_table_version(cursor, table):
+    cursor.execute('''
+    INSERT INTO table_versions (table_name, version) VALUES (%s, 1)
+    ON CONFLICT (table_name) DO UPDATE SET version = table_versions.version + 1
+    ''', (table,))
+
+# Run a read-only query through the result cache; returns (column_names, rows)
+def run_cached_query(query, params=None, tables=("employees",)):
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    try:
+        # Tenants share the cache, so the tenant is part of every key
+        versions = get_table_versions(cursor, tables)
+        versions['tenant'] = current_tenant()
+        key = query_cache.make_key(query, params, versions)
+        
+        found, result = query_cache.get(key)
+        if not found:
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            column_names = [desc[0] for desc in cursor.description]
+            result = (column_names, rows)
+            query_cache.put(key, result)
+    finally:
+        cursor.close()
+        conn.close()
+    
+    return result
+
 # Create the necessary tables if they don't exist
 def create_tables():
     conn = get_connection()
@@ -44,12 +164,158 @@ def create_tables():
     )
     ''')
     
+    # Columns the dashboard needs that the original schema lacked
+    cursor.execute('''
+    ALTER TABLE employees
+        ADD COLUMN IF NOT EXISTS job_role VARCHAR(50),
+        ADD COLUMN IF NOT EXISTS job_satisfaction INTEGER,
+        ADD COLUMN IF NOT EXISTS work_life_balance INTEGER,
+        ADD COLUMN IF NOT EXISTS attrition BOOLEAN,
+        ADD COLUMN IF NOT EXISTS manager_id INTEGER,
+        ADD COLUMN IF NOT EXISTS org_unit VARCHAR(100)
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_employees_manager_id ON employees (manager_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_employees_location ON employees (location)")
+    
+    # Every (ancestor, descendant) pair of the reporting tree, including each employee
+    # with itself at depth 0, so a subtree is one indexed lookup on ancestor_id
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS org_closure (
+        ancestor_id INTEGER NOT NULL,
+        employee_id INTEGER NOT NULL,
+        depth INTEGER NOT NULL,
+        PRIMARY KEY (ancestor_id, employee_id)
+    )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_org_closure_employee ON org_closure (employee_id)")
+    
+    # Composite indexes backing keyset pagination on each sortable column
+    for column in SORTABLE_COLUMNS[1:]:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_employees_{column}_id ON employees ({column}, id)")
+    
+    # Version counters used to invalidate cached query results
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS table_versions (
+        table_name VARCHAR(100) PRIMARY KEY,
+        version BIGINT NOT NULL DEFAULT 0
+    )
+    ''')
+    
     conn.commit()
     cursor.close()
     conn.close()
     
     print("Tables created successfully")
 
+# Convert a dataframe to insert tuples, filling columns the frame doesn't have with NULL
+def employee_rows(df):
+    columns = []
+    for names in INSERT_COLUMNS.values():
+        name = next((name for name in names if name in df.columns), None)
+        if name is None:
+            columns.append([None] * len(df))
+        elif name == 'Attrition':
+            columns.append((df[name] == 'Yes').tolist() if df[name].dtype == object else df[name].astype(bool).tolist())
+        else:
+            columns.append(df[name].astype(object).where(df[name].notna(), None).tolist())
+    return list(zip(*columns))
+
+# Recompute the closure table from employees.manager_id in one recursive pass, so
+# queries never walk the tree themselves. The depth guard stops reporting cycles.
+def rebuild_org_closure(cursor):
+    cursor.execute("TRUNCATE org_closure")
+    cursor.execute('''
+    INSERT INTO org_closure (ancestor_id, employee_id, depth)
+    WITH RECURSIVE tree (ancestor_id, employee_id, depth) AS (
+        SELECT id, id, 0 FROM employees
+        UNION ALL
+        SELECT tree.ancestor_id, e.id, tree.depth + 1
+        FROM tree JOIN employees e ON e.manager_id = tree.employee_id
+        WHERE e.id <> tree.ancestor_id AND tree.depth < 64
+    )
+    SELECT ancestor_id, employee_id, MIN(depth) FROM tree GROUP BY ancestor_id, employee_id
+    ''')
+    bump_table_version(cursor, 'org_closure')
+
+# Statement-level triggers that keep org_closure current as employees change: only the
+# subtrees under inserted, deleted or re-managed employees are deleted and recomputed,
+# by walking up from each affected employee, in the same transaction as the change.
+# Bulk loads set hr.skip_org_closure and call rebuild_org_closure once instead.
+def create_org_closure_triggers():
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    cursor.execute('''
+    CREATE OR REPLACE FUNCTION sync_org_closure() RETURNS trigger AS $$
+    DECLARE
+        changed INTEGER[];
+        affected INTEGER[];
+    BEGIN
+        IF coalesce(current_setting('hr.skip_org_closure', true), '') = 'on' THEN
+            RETURN NULL;
+        END IF;
+        
+        IF TG_OP = 'TRUNCATE' THEN
+            DELETE FROM org_closure;
+        ELSE
+            IF TG_OP = 'INSERT' THEN
+                SELECT array_agg(id) INTO changed FROM new_rows;
+            ELSIF TG_OP = 'DELETE' THEN
+                SELECT array_agg(id) INTO changed FROM old_rows;
+            ELSE
+                SELECT array_agg(new_rows.id) INTO changed
+                FROM new_rows JOIN old_rows ON old_rows.id = new_rows.id
+                WHERE new_rows.manager_id IS DISTINCT FROM old_rows.manager_id;
+            END IF;
+            IF changed IS NULL THEN
+                RETURN NULL;
+            END IF;
+            
+            -- The changed employees, everything under them, and the subtrees of anyone
+            -- reporting to a newly inserted id
+            SELECT array_agg(DISTINCT employee_id) INTO affected FROM (
+                SELECT unnest(changed) AS employee_id
+                UNION
+                SELECT closure.employee_id FROM org_closure closure
+                WHERE closure.ancestor_id = ANY(changed)
+                   OR closure.ancestor_id IN (SELECT id FROM employees WHERE manager_id = ANY(changed))
+            ) subtree;
+            
+            DELETE FROM org_closure WHERE employee_id = ANY(affected);
+            INSERT INTO org_closure (ancestor_id, employee_id, depth)
+            WITH RECURSIVE up (employee_id, ancestor_id, depth) AS (
+                SELECT id, id, 0 FROM employees WHERE id = ANY(affected)
+                UNION ALL
+                SELECT up.employee_id, manager.id, up.depth + 1
+                FROM up
+                JOIN employees e ON e.id = up.ancestor_id
+                JOIN employees manager ON manager.id = e.manager_id
+                WHERE manager.id <> up.employee_id AND up.depth < 64
+            )
+            SELECT ancestor_id, employee_id, MIN(depth) FROM up GROUP BY ancestor_id, employee_id;
+        END IF;
+        
+        INSERT INTO table_versions (table_name, version) VALUES ('org_closure', 1)
+        ON CONFLICT (table_name) DO UPDATE SET version = table_versions.version + 1;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    ''')
+    
+    triggers = {
+        'employees_org_closure_insert': "AFTER INSERT ON employees REFERENCING NEW TABLE AS new_rows",
+        'employees_org_closure_update': "AFTER UPDATE ON employees REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+        'employees_org_closure_delete': "AFTER DELETE ON employees REFERENCING OLD TABLE AS old_rows",
+        'employees_org_closure_truncate': "AFTER TRUNCATE ON employees"
+    }
+    for name, timing in triggers.items():
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name} ON employees")
+        cursor.execute(f"CREATE TRIGGER {name} {timing} FOR EACH STATEMENT EXECUTE FUNCTION sync_org_closure()")
+    
+    conn.commit()
+    cursor.close()
+    conn.close()
+
 # Function to populate the database with sample data
 def populate_sample_data(df):
     conn = get_connection()
@@ -61,34 +327,28 @@ def populate_sample_data(df):
     
     # Only insert if table is empty
     if count == 0:
+        # Restart ids at 1 so they line up with the frame's EmployeeID and ManagerID
+        cursor.execute("SELECT setval(pg_get_serial_sequence('employees', 'id'), 1, false)")
+        
         # Convert dataframe to list of tuples for bulk insert
-        data = [
-            (
-                row['Age'],
-                row['Gender'],
-                row['Department'],
-                row['Education'],
-                row['Location'],
-                row['Salary'],
-                row['Performance'],
-                row['YearsService']
-            )
-            for _, row in df.iterrows()
-        ]
+        data = employee_rows(df)
+        
+        # The closure is rebuilt once below rather than per inserted page
+        cursor.execute("SET LOCAL hr.skip_org_closure = 'on'")
         
         # Bulk insert data
         execute_values(
             cursor,
-            '''
-            INSERT INTO employees (
-                age, gender, department, education, location, 
-                salary, performance, years_service
-            ) VALUES %s
+            f'''
+            INSERT INTO employees ({", ".join(INSERT_COLUMNS)}) VALUES %s
             ''',
             data
         )
         
+        rebuild_org_closure(cursor)
+        bump_table_version(cursor, 'employees')
         conn.commit()
+        query_cache.invalidate()
         print(f"Inserted {len(data)} records into employees table")
     else:
         print(f"Data already exists in employees table ({count} records)")
@@ -98,49 +358,456 @@ def populate_sample_data(df):
 
 # Function to retrieve all employees from the database
 def get_all_employees():
+    column_names, rows = run_cached_query("SELECT * FROM employees")
+    
+    # Convert to DataFrame
+    df = pd.DataFrame(rows, columns=column_names)
+    
+    # Rename columns to match our application
+    df = df.rename(columns=COLUMN_MAPPING)
+    
+    return df
+
+# Build a WHERE clause from {application column: allowed values}
+def filter_clause(filters):
+    conditions = []
+    params = []
+    for name, values in (filters or {}).items():
+        if name == ORG_FILTER:
+            conditions.append("id IN (SELECT employee_id FROM org_closure WHERE ancestor_id = ANY(%s))")
+            params.append([int(value) for value in values])
+            continue
+        column = APPLICATION_COLUMNS[name]
+        if column == 'attrition':
+            values = [value == 'Yes' if isinstance(value, str) else bool(value) for value in values]
+        conditions.append(f"{column} = ANY(%s)")
+        params.append([value.item() if hasattr(value, 'item') else value for value in values])
+    return (" AND ".join(conditions) or "TRUE"), params
+
+# Count employees matching the filters (cached like other reads)
+def count_employees(filters=None):
+    where, params = filter_clause(filters)
+    _, rows = run_cached_query(f"SELECT COUNT(*) FROM employees WHERE {where}", params)
+    return rows[0][0]
+
+# Fetch one page of employees with keyset pagination on (sort column, id).
+# `after` is the (sort value, id) of the last row of the previous page; returns
+# the page and the key to pass for the next page (None on the last page).
+def get_employee_page(filters=None, sort_by='id', descending=False, after=None, page_size=50):
+    sort_column = APPLICATION_COLUMNS.get(sort_by, sort_by)
+    if sort_column not in SORTABLE_COLUMNS:
+        raise ValueError(f"Cannot sort on {sort_by}")
+    
+    where, params = filter_clause(filters)
+    direction = "DESC" if descending else "ASC"
+    comparison = "<" if descending else ">"
+    
+    if after is not None:
+        where += f" AND ({sort_column}, id) {comparison} (%s, %s)"
+        params.extend(after)
+    
+    query = f'''
+    SELECT * FROM employees
+    WHERE {where}
+    ORDER BY {sort_column} {direction}, id {direction}
+    LIMIT %s
+    '''
+    column_names, rows = run_cached_query(query, params + [page_size + 1])
+    
+    # One extra row tells us whether another page exists without a COUNT
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    df = pd.DataFrame(rows, columns=column_names).rename(columns=COLUMN_MAPPING)
+    
+    next_key = None
+    if has_more:
+        last = rows[-1]
+        next_key = (last[column_names.index(sort_column)], last[column_names.index('id')])
+    
+    return df, next_key
+
+# Stream employees matching the filters as DataFrames of up to chunk_rows rows,
+# using a server-side cursor so the full result never sits in this process
+def iter_employees(filters=None, chunk_rows=50000):
+    where, params = filter_clause(filters)
+    conn = get_connection()
+    cursor = conn.cursor(name="employees_export")
+    cursor.itersize = chunk_rows
+    
+    try:
+        cursor.execute(f"SELECT {', '.join(EMPLOYEE_COLUMN_TYPES)} FROM employees WHERE {where} ORDER BY id", params)
+        column_names = None
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if column_names is None:
+                column_names = [desc[0] for desc in cursor.description]
+            if not rows:
+                break
+            yield pd.DataFrame(rows, columns=column_names).rename(columns=COLUMN_MAPPING)
+    finally:
+        cursor.close()
+        conn.close()
+
+# Column types of the employees table, so bulk reads parse without type inference
+EMPLOYEE_COLUMN_TYPES = {
+    'id': 'int',
+    'age': 'int',
+    'gender': 'text',
+    'department': 'text',
+    'education': 'text',
+    'location': 'text',
+    'salary': 'int',
+    'performance': 'int',
+    'years_service': 'int',
+    'job_role': 'text',
+    'job_satisfaction': 'int',
+    'work_life_balance': 'int',
+    'attrition': 'bool',
+    'manager_id': 'int',
+    'org_unit': 'text'
+}
+
+# Bulk read: COPY the matching rows out as CSV and parse them column by column, so no
+# Python object is created per row or cell. Returns a dataframe like get_all_employees,
+# or a pyarrow Table with as_arrow. Parsing uses pyarrow's CSV reader when it is
+# installed and the pandas C parser otherwise.
+def copy_employees(filters=None, as_arrow=False):
+    where, params = filter_clause(filters)
+    columns = ", ".join(EMPLOYEE_COLUMN_TYPES)
     conn = get_connection()
     cursor = conn.cursor()
+    buffer = io.BytesIO()
     
-    cursor.execute("SELECT * FROM employees")
-    rows = cursor.fetchall()
+    try:
+        # COPY takes no bind parameters, so the filter values are inlined safely first
+        query = cursor.mogrify(f"SELECT {columns} FROM employees WHERE {where} ORDER BY id", params).decode()
+        cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER true)", buffer)
+    finally:
+        cursor.close()
+        conn.close()
     
-    # Get column names
-    column_names = [desc[0] for desc in cursor.description]
+    buffer.seek(0)
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        if as_arrow:
+            raise
+        df = pd.read_csv(
+            buffer,
+            engine='c',
+            dtype={name: str for name, kind in EMPLOYEE_COLUMN_TYPES.items() if kind == 'text'},
+            true_values=['t'],
+            false_values=['f']
+        )
+        return df.rename(columns=COLUMN_MAPPING)
     
+    arrow_types = {'int': pa.int32(), 'text': pa.string(), 'bool': pa.bool_()}
+    table = pa_csv.read_csv(buffer, convert_options=pa_csv.ConvertOptions(
+        column_types={name: arrow_types[kind] for name, kind in EMPLOYEE_COLUMN_TYPES.items()},
+        true_values=['t'],
+        false_values=['f'],
+        strings_can_be_null=True,
+        quoted_strings_can_be_null=False
+    ))
+    if as_arrow:
+        return table
+    return table.to_pandas().rename(columns=COLUMN_MAPPING)
+
+# Channel carrying change notifications for the employees table
+CHANGE_CHANNEL = "employees_changed"
+
+# Statements touching more rows than this notify a full reload instead of listing ids
+NOTIFY_MAX_IDS = 500
+
+# Statement-level triggers that NOTIFY listeners of the changed employee ids and bump
+# the table version, so caches stay correct whoever writes to the table
+def create_change_notifications():
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    # Transition tables hold every row a statement touched; one notification per statement
+    cursor.execute(f'''
+    CREATE OR REPLACE FUNCTION notify_employee_change() RETURNS trigger AS $$
+    DECLARE
+        ids INTEGER[];
+    BEGIN
+        INSERT INTO table_versions (table_name, version) VALUES ('employees', 1)
+        ON CONFLICT (table_name) DO UPDATE SET version = table_versions.version + 1;
+        
+        IF TG_OP = 'DELETE' THEN
+            SELECT array_agg(id) INTO ids FROM old_rows;
+        ELSIF TG_OP <> 'TRUNCATE' THEN
+            SELECT array_agg(id) INTO ids FROM new_rows;
+        END IF;
+        
+        IF TG_OP = 'TRUNCATE' OR coalesce(array_length(ids, 1), 0) > {NOTIFY_MAX_IDS} THEN
+            PERFORM pg_notify('{CHANGE_CHANNEL}', json_build_object(
+                'schema', TG_TABLE_SCHEMA, 'op', TG_OP, 'reload', true
+            )::text);
+        ELSIF ids IS NOT NULL THEN
+            PERFORM pg_notify('{CHANGE_CHANNEL}', json_build_object(
+                'schema', TG_TABLE_SCHEMA, 'op', TG_OP, 'ids', ids
+            )::text);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    ''')
+    
+    triggers = {
+        'employees_notify_insert': "AFTER INSERT ON employees REFERENCING NEW TABLE AS new_rows",
+        'employees_notify_update': "AFTER UPDATE ON employees REFERENCING NEW TABLE AS new_rows",
+        'employees_notify_delete': "AFTER DELETE ON employees REFERENCING OLD TABLE AS old_rows",
+        'employees_notify_truncate': "AFTER TRUNCATE ON employees"
+    }
+    for name, timing in triggers.items():
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name} ON employees")
+        cursor.execute(f"CREATE TRIGGER {name} {timing} FOR EACH STATEMENT EXECUTE FUNCTION notify_employee_change()")
+    
+    conn.commit()
     cursor.close()
     conn.close()
+
+# Current rows for a set of employee ids, read directly (never from the cache)
+def fetch_employees_by_id(ids):
+    conn = get_connection()
+    cursor = conn.cursor()
     
-    # Convert to DataFrame
-    df = pd.DataFrame(rows, columns=column_names)
+    try:
+        cursor.execute("SELECT * FROM employees WHERE id = ANY(%s)", (list(ids),))
+        column_names = [desc[0] for desc in cursor.description]
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
     
-    # Rename columns to match our application
-    column_mapping = {
-        'id': 'ID',
-        'age': 'Age',
-        'gender': 'Gender',
-        'department': 'Department',
-        'education': 'Education',
-        'location': 'Location',
-        'salary': 'Salary',
-        'performance': 'Performance',
-        'years_service': 'YearsService'
-    }
+    return pd.DataFrame(rows, columns=column_names).rename(columns=COLUMN_MAPPING)
+
+# Raised when a step of database initialization fails; carries the failing step,
+# how long it ran and the timings of the steps that completed before it
+class DatabaseInitError(Exception):
+    def __init__(self, step, elapsed, cause, completed=None):
+        self.step = step
+        self.elapsed = elapsed
+        self.cause = cause
+        self.completed = completed or {}
+        super().__init__(f"Database initialization failed at {step} after {elapsed:.3f}s: {cause}")
+
+# Initialize the database (create tables if needed); returns {step: seconds}
+def init_database(sample_data_df=None):
+    steps = [
+        ('create_tables', create_tables),
+        ('create_org_closure_triggers', create_org_closure_triggers),
+        ('create_change_notifications', create_change_notifications),
+        ('create_history_tables', create_history_tables)
+    ]
+    if sample_data_df is not None:
+        steps.append(('populate_sample_data', lambda: populate_sample_data(sample_data_df)))
+    
+    timings = {}
+    for step, run in steps:
+        start = time.perf_counter()
+        try:
+            run()
+        except Exception as e:
+            raise DatabaseInitError(step, time.perf_counter() - start, e, timings) from e
+        timings[step] = time.perf_counter() - start
+    
+    return timings
+
+# Month key (first day of the month) for a date or YYYY-MM string
+def month_start(value):
+    if isinstance(value, str):
+        year, month = value[:7].split("-")
+        return date(int(year), int(month), 1)
+    return date(value.year, value.month, 1)
+
+# Create the history tables: monthly snapshots partitioned by month plus rollups
+def create_history_tables():
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    # Parent table, one partition per month is attached on demand
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS employee_snapshots (
+        snapshot_month DATE NOT NULL,
+        employee_id INTEGER NOT NULL,
+        department VARCHAR(100),
+        job_role VARCHAR(50),
+        gender VARCHAR(10),
+        salary INTEGER,
+        performance INTEGER,
+        hired BOOLEAN NOT NULL DEFAULT FALSE,
+        left_company BOOLEAN NOT NULL DEFAULT FALSE
+    ) PARTITION BY RANGE (snapshot_month)
+    ''')
+    
+    # Rollups maintained per month so trend queries never touch the snapshots
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS headcount_rollups (
+        snapshot_month DATE NOT NULL,
+        department VARCHAR(100) NOT NULL,
+        headcount INTEGER NOT NULL,
+        hires INTEGER NOT NULL,
+        leavers INTEGER NOT NULL,
+        salary_sum BIGINT NOT NULL,
+        performance_sum BIGINT NOT NULL,
+        PRIMARY KEY (snapshot_month, department)
+    )
+    ''')
+    
+    conn.commit()
+    cursor.close()
+    conn.close()
     
-    df = df.rename(columns=column_mapping)
+    print("History tables created successfully")
+
+# Create the partition holding a single month if it doesn't exist yet
+def ensure_snapshot_partition(cursor, month):
+    start = month_start(month)
+    end = date(start.year + (start.month == 12), start.month % 12 + 1, 1)
+    cursor.execute(f'''
+    CREATE TABLE IF NOT EXISTS employee_snapshots_{start:%Y_%m}
+    PARTITION OF employee_snapshots
+    FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')
+    ''')
+
+# Store one month of snapshot rows and refresh that month's rollups
+def record_monthly_snapshot(df, month):
+    start = month_start(month)
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    ensure_snapshot_partition(cursor, start)
+    
+    # Re-recording a month replaces it, which keeps the job idempotent
+    cursor.execute("DELETE FROM employee_snapshots WHERE snapshot_month = %s", (start,))
+    
+    data = list(zip(
+        [start] * len(df),
+        df['EmployeeID'].astype(int).tolist(),
+        df['Department'].tolist(),
+        df['JobRole'].tolist(),
+        df['Gender'].tolist(),
+        df['Salary'].astype(int).tolist(),
+        df['PerformanceRating'].astype(int).tolist(),
+        df['Hired'].astype(bool).tolist(),
+        df['Left'].astype(bool).tolist()
+    ))
+    
+    execute_values(
+        cursor,
+        '''
+        INSERT INTO employee_snapshots (
+            snapshot_month, employee_id, department, job_role, gender,
+            salary, performance, hired, left_company
+        ) VALUES %s
+        ''',
+        data
+    )
+    
+    # Incremental rollup: only the month that was just written is recomputed
+    cursor.execute("DELETE FROM headcount_rollups WHERE snapshot_month = %s", (start,))
+    cursor.execute('''
+    INSERT INTO headcount_rollups (
+        snapshot_month, department, headcount, hires, leavers,
+        salary_sum, performance_sum
+    )
+    SELECT
+        snapshot_month,
+        department,
+        COUNT(*),
+        COUNT(*) FILTER (WHERE hired),
+        COUNT(*) FILTER (WHERE left_company),
+        COALESCE(SUM(salary), 0),
+        COALESCE(SUM(performance), 0)
+    FROM employee_snapshots
+    WHERE snapshot_month = %s
+    GROUP BY snapshot_month, department
+    ''', (start,))
+    
+    bump_table_version(cursor, 'headcount_rollups')
+    conn.commit()
+    query_cache.invalidate()
+    cursor.close()
+    conn.close()
+    
+    print(f"Recorded {len(data)} snapshot rows for {start:%Y-%m}")
+
+# One recorded month of snapshot rows, in dashboard column names (None if not recorded)
+def get_snapshot(month):
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute('''
+    SELECT employee_id, department, job_role, gender, salary, performance, hired, left_company
+    FROM employee_snapshots
+    WHERE snapshot_month = %s
+    ''', (month_start(month),))
+    rows = cursor.fetchall()
+    cursor.close()
+    conn.close()
+    
+    if not rows:
+        return None
+    return pd.DataFrame(rows, columns=[
+        'EmployeeID', 'Department', 'JobRole', 'Gender', 'Salary', 'PerformanceRating', 'Hired', 'Left'
+    ])
+
+# Latest recorded month before `month`, or None
+def previous_snapshot_month(month):
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT MAX(snapshot_month) FROM employee_snapshots WHERE snapshot_month < %s", (month_start(month),)
+    )
+    previous = cursor.fetchone()[0]
+    cursor.close()
+    conn.close()
+    return previous
+
+# Monthly job: snapshot the current employees for `month` (this month by default),
+# deriving hires and leavers from the previous recorded month, and refresh its rollups
+def take_monthly_snapshot(month=None):
+    from hr_data import from_database_frame, snapshot_rows
+    
+    start = month_start(month or date.today())
+    previous_month = previous_snapshot_month(start)
+    previous = get_snapshot(previous_month) if previous_month else None
+    current = from_database_frame(copy_employees())
+    record_monthly_snapshot(snapshot_rows(current, previous), start)
+
+# Function to retrieve the monthly rollups used by the Trends tab
+def get_trend_rollups(start_month=None, end_month=None):
+    query = '''
+    SELECT snapshot_month, department, headcount, hires, leavers,
+           salary_sum, performance_sum
+    FROM headcount_rollups
+    WHERE snapshot_month >= COALESCE(%s, '-infinity'::date)
+      AND snapshot_month <= COALESCE(%s, 'infinity'::date)
+    ORDER BY snapshot_month, department
+    '''
+    params = (
+        month_start(start_month) if start_month else None,
+        month_start(end_month) if end_month else None
+    )
+    _, rows = run_cached_query(query, params, tables=("headcount_rollups",))
+    
+    df = pd.DataFrame(rows, columns=[
+        'Month', 'Department', 'Headcount', 'Hires', 'Leavers',
+        'SalarySum', 'PerformanceSum'
+    ])
+    df['Month'] = pd.to_datetime(df['Month'])
     
     return df
 
-# Initialize the database (create tables if needed)
-def init_database(sample_data_df=None):
-    try:
-        # Create tables
-        create_tables()
-        
-        # Populate with sample data if provided
-        if sample_data_df is not None:
-            populate_sample_data(sample_data_df)
-            
-        return True
-    except Exception as e:
-        print(f"Database initialization error: {e}")
-        return False
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Database maintenance jobs")
+    parser.add_argument("command", choices=["snapshot"], help="snapshot: record this month's employee snapshot (run monthly)")
+    parser.add_argument("--month", help="YYYY-MM to record instead of the current month")
+    parser.add_argument("--tenant", action="append", help="only these tenants (default: all)")
+    args = parser.parse_args()
+    
+    for tenant in args.tenant or TENANTS:
+        with use_tenant(tenant):
+            take_monthly_snapshot(args.month)
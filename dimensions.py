@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+
+# High-cardinality dimensions, held as pandas Categoricals: each row stores a small
+# integer code and every distinct value is stored once, in sorted order
+HIGH_CARDINALITY_COLUMNS = ['Education', 'Location']
+
+# Label of the bucket that collects everything outside the top K
+OTHER_LABEL = "Other"
+
+# Dictionary-encode the high-cardinality columns with sorted categories, so codes
+# follow value order and prefix ranges map to code ranges
+def encode_dimensions(df):
+    encoded = {}
+    for column in HIGH_CARDINALITY_COLUMNS:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            values = df[column].astype(object)
+            encoded[column] = pd.Categorical(values, categories=sorted(values.dropna().unique()))
+    return df.assign(**encoded) if encoded else df
+
+# Case-insensitive prefix search over a dimension's distinct values: a sorted array of
+# folded keys answers each search with two binary searches instead of a scan
+class PrefixIndex:
+    def __init__(self, values):
+        values = np.asarray(sorted(set(values), key=str.casefold), dtype=object)
+        self.values = values
+        self.keys = np.asarray([value.casefold() for value in values], dtype=object)
+
+    def search(self, prefix, limit=50):
+        prefix = prefix.casefold()
+        if not prefix:
+            return list(self.values[:limit])
+        low = np.searchsorted(self.keys, prefix, side='left')
+        high = np.searchsorted(self.keys, prefix + "\U0010ffff", side='left')
+        return list(self.values[low:min(high, low + limit)])
+
+    def __len__(self):
+        return len(self.values)
+
+# Misra-Gries heavy-hitters summary with at most k counters. Every value occurring more
+# than total / (k + 1) times is kept, and each kept count is low by at most that much.
+# Summaries of separate chunks merge into a summary of their union with the same bound.
+class MisraGries:
+    def __init__(self, k, counters=None, total=0):
+        self.k = k
+        self.counters = dict(counters or {})
+        self.total = total
+
+    # Shrink to k counters by subtracting the (k+1)-th largest count from every counter
+    def _reduce(self):
+        if len(self.counters) <= self.k:
+            return
+        counts = np.fromiter(self.counters.values(), dtype=np.int64, count=len(self.counters))
+        threshold = np.partition(counts, -(self.k + 1))[-(self.k + 1)]
+        self.counters = {value: count - threshold for value, count in self.counters.items() if count > threshold}
+
+    # Add a batch of (value -> count) pairs, e.g. one chunk's exact counts
+    def update(self, counts):
+        for value, count in counts.items():
+            if count:
+                self.counters[value] = self.counters.get(value, 0) + int(count)
+                self.total += int(count)
+        self._reduce()
+        return self
+
+    def merge(self, other):
+        merged = MisraGries(max(self.k, other.k), self.counters, self.total)
+        for value, count in other.counters.items():
+            merged.counters[value] = merged.counters.get(value, 0) + count
+        merged.total += other.total
+        merged._reduce()
+        return merged
+
+    # Largest counters first
+    def top(self, n):
+        return sorted(self.counters.items(), key=lambda item: item[1], reverse=True)[:n]
+
+# Summarize a column chunk by chunk: each chunk is counted from its category codes with
+# one bincount, summarized, and merged into the running summary
+def sketch_column(series, k, chunk_rows=65536):
+    summary = MisraGries(k)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories
+        codes = series.cat.codes.to_numpy()
+        for start in range(0, len(codes), chunk_rows):
+            chunk = codes[start:start + chunk_rows]
+            counts = np.bincount(chunk[chunk >= 0], minlength=len(categories))
+            nonzero = np.flatnonzero(counts)
+            summary = summary.merge(MisraGries(k).update(dict(zip(categories[nonzero], counts[nonzero]))))
+    else:
+        for start in range(0, len(series), chunk_rows):
+            summary = summary.merge(MisraGries(k).update(series.iloc[start:start + chunk_rows].value_counts()))
+    return summary
+
+# Exact counts of a few candidate values, in one more pass over the column. Category codes
+# are mapped to candidate slots (everything else to a spare slot) and bincounted.
+def count_candidates(series, candidates):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        slots = np.full(len(series.cat.categories) + 1, len(candidates), dtype=np.int64)
+        slots[series.cat.categories.get_indexer(candidates)] = np.arange(len(candidates))
+        # Missing values have code -1, which lands on the spare slot at the end
+        counts = np.bincount(slots[series.cat.codes.to_numpy()], minlength=len(candidates) + 1)[:-1]
+        return dict(zip(candidates, counts.tolist()))
+    counts = series[series.isin(candidates)].value_counts()
+    return {value: int(counts.get(value, 0)) for value in candidates}
+
+# Top n values plus one "Other" row holding everything else, as [column, 'Count'].
+# The sketch keeps 4n counters to find the candidates; its counters are only lower
+# bounds, so the candidates are recounted exactly before ranking and sizing "Other".
+def top_k_with_other(series, column, n=15):
+    summary = sketch_column(series, 4 * n)
+    exact = count_candidates(series, [value for value, _ in summary.top(4 * n)])
+    top = sorted(exact.items(), key=lambda item: item[1], reverse=True)[:n]
+    return with_other(pd.DataFrame(top, columns=[column, 'Count']), column, summary.total)
+
+# Append an "Other" row holding whatever part of `total` the top rows don't cover
+def with_other(top, column, total):
+    other = total - int(top['Count'].sum())
+    if other > 0:
+        top = pd.concat([top, pd.DataFrame({column: [OTHER_LABEL], 'Count': [other]})], ignore_index=True)
+    return top
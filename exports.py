@@ -0,0 +1,222 @@
+import io
+import os
+import sys
+import zlib
+import argparse
+import zipfile
+import tempfile
+
+import hr_data
+
+# Rows per chunk pulled from the data source; bounds memory per export
+CHUNK_ROWS = int(os.getenv("HR_EXPORT_CHUNK_ROWS", "50000"))
+
+# Export formats: label -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'CSV (gzip)': ('csv.gz', 'application/gzip'),
+    'Parquet': ('parquet', 'application/octet-stream'),
+    'Excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+}
+
+# Chunks of the in-memory frame matching the filters; only one chunk is copied at a time
+def iter_frame_chunks(df, filters, chunk_rows=CHUNK_ROWS, columns=None):
+    positions = hr_data.filter_mask(df, filters).nonzero()[0]
+    for start in range(0, len(positions), chunk_rows):
+        chunk = df.take(positions[start:start + chunk_rows])
+        yield chunk[columns] if columns else chunk
+
+# Chunks from the configured data source, in the dashboard's column names
+def iter_source_chunks(df, filters, chunk_rows=CHUNK_ROWS):
+    if hr_data.DATA_SOURCE == "postgres":
+        from database import iter_employees
+        for chunk in iter_employees(filters, chunk_rows):
+            yield hr_data.from_database_frame(chunk)
+    else:
+        yield from iter_frame_chunks(df, filters, chunk_rows)
+
+# Empty frame with the export's columns and dtypes, fixed before the first chunk so an
+# empty selection still gets a header/schema and later chunks can't change the types
+def export_template(df):
+    if hr_data.DATA_SOURCE == "postgres":
+        import pandas as pd
+        from database import COLUMN_MAPPING, EMPLOYEE_COLUMN_TYPES
+        dtypes = {'int': 'Int64', 'text': 'object', 'bool': 'boolean'}
+        template = pd.DataFrame({
+            column: pd.Series(dtype=dtypes[column_type]) for column, column_type in EMPLOYEE_COLUMN_TYPES.items()
+        })
+        return hr_data.from_database_frame(template.rename(columns=COLUMN_MAPPING)).astype({'Attrition': 'object'})
+    return df.iloc[:0]
+
+# CSV writer yielding encoded (optionally gzip-compressed) pieces per chunk; the header
+# comes from the template when there are no rows
+def stream_csv(chunks, compress=False, template=None):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    header = True
+    for chunk in chunks:
+        if template is not None:
+            chunk = chunk[list(template.columns)]
+        data = chunk.to_csv(index=False, header=header).encode("utf-8")
+        header = False
+        if compressor is not None:
+            data = compressor.compress(data)
+        if data:
+            yield data
+    if header and template is not None:
+        data = template.to_csv(index=False).encode("utf-8")
+        yield compressor.compress(data) if compressor is not None else data
+    if compressor is not None:
+        yield compressor.flush()
+
+# File-like sink that hands back whatever has been written since the last drain
+class _DrainBuffer(io.RawIOBase):
+    def __init__(self):
+        self._buffer = io.BytesIO()
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._position += len(data)
+        return self._buffer.write(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+# Arrow schema of a template frame, from its dtypes rather than its (absent) values:
+# an empty object column would otherwise be inferred as Arrow's null type
+def export_schema(template):
+    import pyarrow as pa
+    import pandas as pd
+
+    fields = []
+    for column, dtype in template.dtypes.items():
+        if pd.api.types.is_bool_dtype(dtype):
+            arrow_type = pa.bool_()
+        elif pd.api.types.is_integer_dtype(dtype):
+            arrow_type = pa.int64()
+        elif pd.api.types.is_float_dtype(dtype):
+            arrow_type = pa.float64()
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(column, arrow_type))
+    return pa.schema(fields)
+
+# Parquet writer yielding each row group as soon as it is written. Every chunk is cast
+# to the template's schema, so an all-null or differently inferred column in a later
+# chunk can't break the file partway through; without a template the first chunk's
+# schema is used.
+def stream_parquet(chunks, compression="zstd", template=None):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = _DrainBuffer()
+    schema = export_schema(template) if template is not None else None
+    writer = pq.ParquetWriter(sink, schema, compression=compression) if schema is not None else None
+    for chunk in chunks:
+        if schema is not None:
+            table = pa.Table.from_pandas(chunk[schema.names], preserve_index=False).cast(schema)
+        else:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            schema = table.schema
+            writer = pq.ParquetWriter(sink, schema, compression=compression)
+        writer.write_table(table)
+        data = sink.drain()
+        if data:
+            yield data
+    if writer is not None:
+        writer.close()
+        yield sink.drain()
+
+# Excel writer: xlsxwriter's constant-memory mode flushes each row to disk as it goes,
+# then the finished workbook is read back in fixed-size pieces
+def stream_xlsx(chunks, read_size=1 << 20, template=None):
+    import xlsxwriter
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "export.xlsx")
+        workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+        sheet = workbook.add_worksheet("Employees")
+        row_number = 0
+        for chunk in chunks:
+            if row_number == 0:
+                sheet.write_row(0, 0, list(chunk.columns))
+                row_number = 1
+            for row in chunk.itertuples(index=False):
+                sheet.write_row(row_number, 0, [value.item() if hasattr(value, 'item') else value for value in row])
+                row_number += 1
+        if row_number == 0 and template is not None:
+            sheet.write_row(0, 0, list(template.columns))
+        workbook.close()
+
+        with open(path, "rb") as export_file:
+            while True:
+                data = export_file.read(read_size)
+                if not data:
+                    break
+                yield data
+
+# Pick the writer for an export format label
+def stream_export(chunks, export_format, template=None):
+    if export_format == 'CSV':
+        return stream_csv(chunks, template=template)
+    if export_format == 'CSV (gzip)':
+        return stream_csv(chunks, compress=True, template=template)
+    if export_format == 'Parquet':
+        return stream_parquet(chunks, template=template)
+    if export_format == 'Excel':
+        return stream_xlsx(chunks, template=template)
+    raise ValueError(f"Unknown export format: {export_format}")
+
+# Write a stream to a temporary file and return its path (the caller deletes it)
+def spool_to_file(pieces, suffix):
+    handle, path = tempfile.mkstemp(suffix="." + suffix)
+    with os.fdopen(handle, "wb") as output:
+        for piece in pieces:
+            output.write(piece)
+    return path
+
+# Zip of the aggregate table behind every chart (backend.aggregates), one CSV per chart
+def export_aggregates(aggregates):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, value in aggregates.items():
+            if hasattr(value, 'to_csv'):
+                archive.writestr(f"{name}.csv", value.to_csv(index=False))
+            elif value is not None:
+                archive.writestr(f"{name}.csv", "metric,value\n" + "".join(
+                    f"{metric},{metric_value}\n" for metric, metric_value in value.items()
+                ))
+    return buffer.getvalue()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream filtered employees to a file or stdout")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="CSV")
+    parser.add_argument("--output", default="-", help="output path, or - for stdout")
+    for column in hr_data.FILTER_COLUMNS:
+        parser.add_argument(f"--{column}", action="append", help=f"keep only these {column} values")
+    args = parser.parse_args()
+
+    df = hr_data.load_employees() if hr_data.DATA_SOURCE == "memory" else None
+    filters = {}
+    for column in hr_data.FILTER_COLUMNS:
+        values = getattr(args, column)
+        if values:
+            filters[column] = [int(value) for value in values] if column == 'PerformanceRating' else values
+
+    pieces = stream_export(iter_source_chunks(df, filters), args.format, export_template(df))
+    output = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        for piece in pieces:
+            output.write(piece)
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
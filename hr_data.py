@@ -0,0 +1,558 @@
+import os
+import numpy as np
+import pandas as pd
+
+from attrition_model import attrition_probability
+from tenants import current_tenant, tenant_settings, use_tenant
+from dimensions import encode_dimensions, top_k_with_other
+
+# Departments and job roles used by the sample data (order matters for the seeded generator)
+DEPARTMENTS = ["Sales", "IT", "R&D", "HR", "Finance", "Marketing", "Operations", "Customer Service"]
+JOB_ROLES = ['Manager', 'Senior', 'Junior', 'Intern']
+
+# Columns driven by the sidebar filters
+FILTER_COLUMNS = ['Department', 'JobRole', 'Gender', 'PerformanceRating']
+
+# Where the dashboard reads employees from: "memory" (sample data) or "postgres"
+DATA_SOURCE = os.getenv("HR_DATA_SOURCE", "memory")
+
+# Number of sample employees generated for the in-memory source
+SAMPLE_SIZE = int(os.getenv("HR_SAMPLE_SIZE", "200"))
+
+# Columns shown in the drill-down table and the ones it can sort on
+DRILL_DOWN_COLUMNS = [
+    'EmployeeID', 'Department', 'JobRole', 'Gender', 'Age', 'Salary',
+    'YearsAtCompany', 'PerformanceRating', 'JobSatisfaction', 'Attrition', 'OrgUnit'
+]
+SORT_COLUMNS = ['EmployeeID', 'Salary', 'Age', 'YearsAtCompany', 'PerformanceRating']
+
+# Filter key selecting everyone under the given managers ({ORG_FILTER: [manager ids]})
+ORG_FILTER = 'OrgUnder'
+
+# Columns derived from the reporting tree when data is loaded
+ORG_INDEX_COLUMNS = ['OrgLeft', 'OrgRight', 'OrgDepth']
+
+# Rename database columns to the names the dashboard uses
+DATABASE_TO_DASHBOARD = {
+    'ID': 'EmployeeID',
+    'Performance': 'PerformanceRating',
+    'YearsService': 'YearsAtCompany'
+}
+
+# Function to generate sample HR data
+def create_sample_data(n_employees=200):
+    np.random.seed(42)
+
+    # Define departments and job roles
+    departments = DEPARTMENTS
+    job_roles = JOB_ROLES
+
+    # Create employee data
+    data = []
+
+    for i in range(1, n_employees + 1):
+        # Basic employee information
+        employee = {
+            'EmployeeID': i,
+            'Age': np.random.randint(22, 60),
+            'Gender': np.random.choice(['Male', 'Female']),
+            'Department': np.random.choice(departments),
+            'JobRole': np.random.choice(job_roles),
+            'Salary': np.random.randint(30000, 120000),
+            'YearsAtCompany': np.random.randint(0, 20),
+            'JobSatisfaction': np.random.randint(1, 5),
+            'PerformanceRating': np.random.randint(1, 6),  # 1-5 scale
+            'WorkLifeBalance': np.random.randint(1, 5)
+        }
+
+        # Calculate attrition probability based on satisfaction, salary and tenure
+        attrition_prob = float(attrition_probability(
+            employee['JobSatisfaction'], employee['Salary'], employee['YearsAtCompany']
+        ))
+
+        # Determine if employee left based on probability
+        employee['Attrition'] = 'Yes' if np.random.random() < attrition_prob else 'No'
+
+        # Add to dataset
+        data.append(employee)
+
+    return add_org_index(assign_hierarchy(assign_profile(pd.DataFrame(data))))
+
+# Education levels and a long-tailed set of office locations for the sample data
+EDUCATION_LEVELS = ['High School', 'Associate', "Bachelor's", "Master's", 'PhD']
+LOCATION_PREFIXES = ['', 'North ', 'South ', 'East ', 'West ', 'New ', 'Port ', 'Lake ', 'Fort ', 'Mount ']
+LOCATION_STEMS = [
+    'Ash', 'Bright', 'Cedar', 'Clear', 'Elm', 'Fair', 'Glen', 'Green', 'Hazel', 'High',
+    'Iron', 'Kings', 'Maple', 'Mill', 'Oak', 'Pine', 'Red', 'River', 'Rock', 'Silver',
+    'Spring', 'Stone', 'Sun', 'Wood'
+]
+LOCATION_SUFFIXES = ['ton', 'ville', 'field', 'burg', 'ford', 'dale', 'wood', 'haven']
+
+# All generated location names (10 x 24 x 8 = 1,920), most common first
+def sample_locations():
+    return [
+        f"{prefix}{stem}{suffix}"
+        for suffix in LOCATION_SUFFIXES for stem in LOCATION_STEMS for prefix in LOCATION_PREFIXES
+    ]
+
+# Education and location for the sample employees. Locations follow a Zipf-like
+# distribution, so a few offices are large and most are tiny. Uses its own generator
+# so the seeded columns above are unchanged.
+def assign_profile(df, seed=11):
+    rng = np.random.default_rng(seed)
+    locations = sample_locations()
+    weights = 1.0 / np.arange(1, len(locations) + 1)
+    return df.assign(
+        Education=rng.choice(EDUCATION_LEVELS, size=len(df), p=[0.2, 0.1, 0.4, 0.25, 0.05]),
+        Location=np.asarray(locations, dtype=object)[rng.choice(len(locations), size=len(df), p=weights / weights.sum())]
+    )
+
+# Give the sample employees a reporting line. Each department's first employee heads it,
+# its other Managers report to the head and everyone else joins a Manager's team.
+# Uses its own generator so the seeded columns above are unchanged.
+def assign_hierarchy(df, seed=7):
+    rng = np.random.default_rng(seed)
+    manager_ids = np.zeros(len(df), dtype=np.int64)
+    org_units = np.empty(len(df), dtype=object)
+
+    for department, group in df.groupby('Department', sort=False):
+        positions = group.index.to_numpy()
+        ids = group['EmployeeID'].to_numpy()
+        is_manager = (group['JobRole'] == 'Manager').to_numpy()
+        is_manager[0] = False
+        leads = ids[is_manager] if is_manager.any() else ids[:1]
+
+        org_units[positions[0]] = department
+        manager_ids[positions[is_manager]] = ids[0]
+        org_units[positions[is_manager]] = [f"{department} / Team {lead}" for lead in ids[is_manager]]
+
+        members = np.flatnonzero(~is_manager)[1:]
+        assigned = rng.choice(leads, size=len(members))
+        manager_ids[positions[members]] = assigned
+        org_units[positions[members]] = [
+            department if lead == ids[0] else f"{department} / Team {lead}" for lead in assigned
+        ]
+
+    return df.assign(ManagerID=manager_ids, OrgUnit=org_units)
+
+# Nested-set index of the reporting tree: OrgLeft is each employee's preorder position,
+# OrgRight the end of their subtree and OrgDepth their level. Everyone under a manager is
+# then the rows with OrgLeft in [manager's OrgLeft, OrgRight), with no tree walk.
+# Rows without a known manager (or caught in a reporting cycle) start their own tree.
+def add_org_index(df):
+    if 'ManagerID' not in df.columns:
+        return df
+    employee_ids = df['EmployeeID'].to_numpy()
+    manager_ids = pd.to_numeric(df['ManagerID'], errors='coerce').fillna(0).to_numpy(dtype=np.int64)
+    position = {employee_id: index for index, employee_id in enumerate(employee_ids)}
+
+    children = [[] for _ in range(len(df))]
+    roots = []
+    for index, manager_id in enumerate(manager_ids):
+        parent = position.get(manager_id)
+        if parent is None or parent == index:
+            roots.append(index)
+        else:
+            children[parent].append(index)
+
+    left = np.full(len(df), -1, dtype=np.int64)
+    right = np.empty(len(df), dtype=np.int64)
+    depth = np.zeros(len(df), dtype=np.int64)
+    counter = 0
+    for root in roots + list(range(len(df))):
+        if left[root] >= 0:
+            continue
+        stack = [(root, 0, False)]
+        while stack:
+            node, level, finished = stack.pop()
+            if finished:
+                right[node] = counter
+                continue
+            if left[node] >= 0:
+                continue
+            left[node] = counter
+            depth[node] = level
+            counter += 1
+            stack.append((node, level, True))
+            stack.extend((child, level + 1, False) for child in reversed(children[node]))
+
+    return df.assign(OrgLeft=left, OrgRight=right, OrgDepth=depth)
+
+# Rows under any of the given managers (the managers included), by nested-set range.
+# The managers' own rows must be in the frame.
+def org_subtree_mask(df, manager_ids):
+    bounds = df.loc[df['EmployeeID'].isin(manager_ids), ['OrgLeft', 'OrgRight']].to_numpy()
+    left = df['OrgLeft'].to_numpy()
+    mask = np.zeros(len(df), dtype=bool)
+    for low, high in bounds:
+        mask |= (left >= low) & (left < high)
+    return mask
+
+# Employees who have reports, in tree order, for the org-tree filter
+def org_managers(df):
+    managers = df[df['OrgRight'] - df['OrgLeft'] > 1]
+    return managers.sort_values('OrgLeft')[['EmployeeID', 'JobRole', 'OrgUnit', 'OrgDepth', 'OrgLeft', 'OrgRight']]
+
+# Convert a frame from database.get_all_employees to the dashboard's column names
+def from_database_frame(df):
+    df = df.rename(columns=DATABASE_TO_DASHBOARD)
+    if 'Attrition' in df.columns:
+        df['Attrition'] = np.where(df['Attrition'].fillna(False).astype(bool), 'Yes', 'No')
+    return df
+
+# Load employees from the configured data source
+def load_employees(source=None, n_employees=None, tenant=None):
+    source = source or DATA_SOURCE
+    tenant = tenant or current_tenant()
+    n_employees = n_employees or tenant_settings(tenant).get('sample_size', SAMPLE_SIZE)
+    if source == "postgres":
+        from database import copy_employees
+        with use_tenant(tenant):
+            return encode_dimensions(add_org_index(from_database_frame(copy_employees())))
+    if source == "memory":
+        return encode_dimensions(create_sample_data(n_employees))
+    raise ValueError(f"Unknown data source: {source}")
+
+# Function to generate monthly hire/leave history for the sample employees
+def create_sample_history(df, n_months=36):
+    rng = np.random.default_rng(42)
+
+    # Month index 0 is the oldest month in the window, n_months - 1 the current one
+    hire_month = (n_months - 1) - df['YearsAtCompany'].to_numpy() * 12 - rng.integers(0, 12, len(df))
+
+    # Leavers drop out at some month after they joined (or after the window opened)
+    left = (df['Attrition'] == 'Yes').to_numpy()
+    first_month = np.clip(hire_month + 1, 1, n_months - 1)
+    leave_month = np.where(left, rng.integers(first_month, n_months), n_months)
+
+    return pd.DataFrame({
+        'EmployeeID': df['EmployeeID'],
+        'Department': df['Department'],
+        'Salary': df['Salary'],
+        'PerformanceRating': df['PerformanceRating'],
+        'HireMonth': hire_month,
+        'LeaveMonth': leave_month
+    })
+
+# Function to build monthly headcount rollups (same shape as the database rollups)
+def build_monthly_rollups(history, n_months=36):
+    months = pd.period_range(end=pd.Timestamp.today(), periods=n_months, freq='M').to_timestamp()
+    frames = []
+
+    for department, group in history.groupby('Department'):
+        # Anyone hired before the window counts as present from month 0
+        start = np.clip(group['HireMonth'].to_numpy(), 0, None)
+        leave = group['LeaveMonth'].to_numpy()
+        hired_in_window = group['HireMonth'].to_numpy() >= 0
+
+        hires = np.bincount(start[hired_in_window], minlength=n_months)[:n_months]
+        leavers = np.bincount(leave, minlength=n_months + 1)[:n_months]
+
+        # Headcount at month m = started by m minus left before m
+        started = np.cumsum(np.bincount(start, minlength=n_months)[:n_months])
+        departed = np.concatenate([[0], np.cumsum(leavers)[:-1]])
+        headcount = started - departed
+
+        # Salary and performance sums follow the same running-total pattern
+        sums = {}
+        for column in ['Salary', 'PerformanceRating']:
+            weights = group[column].to_numpy()
+            added = np.cumsum(np.bincount(start, weights=weights, minlength=n_months)[:n_months])
+            removed = np.cumsum(np.bincount(leave, weights=weights, minlength=n_months + 1)[:n_months])
+            sums[column] = added - np.concatenate([[0], removed[:-1]])
+
+        frames.append(pd.DataFrame({
+            'Month': months,
+            'Department': department,
+            'Headcount': headcount,
+            'Hires': hires,
+            'Leavers': leavers,
+            'SalarySum': sums['Salary'],
+            'PerformanceSum': sums['PerformanceRating']
+        }))
+
+    return pd.concat(frames, ignore_index=True)
+
+# Rows of a monthly snapshot with Hired/Left flags, derived by comparing the current
+# employees with the previous snapshot: everyone active this month plus anyone who was
+# active last month and has since left (Attrition flipped, or deleted, in which case
+# their previous row is carried over). The first snapshot starts the history, so it
+# holds the active employees only and nobody counts as hired.
+def snapshot_rows(current, previous=None):
+    left_now = (current['Attrition'] == 'Yes').to_numpy()
+    if previous is None or previous.empty:
+        return current[~left_now].assign(Hired=False, Left=False)
+
+    active_before = previous.loc[~previous['Left'].astype(bool), 'EmployeeID']
+    was_active = current['EmployeeID'].isin(active_before).to_numpy()
+    rows = current[~left_now | was_active].assign(
+        Hired=lambda rows: ~rows['EmployeeID'].isin(previous['EmployeeID']),
+        Left=lambda rows: (rows['Attrition'] == 'Yes') & rows['EmployeeID'].isin(active_before)
+    )
+    removed = previous[previous['EmployeeID'].isin(active_before) & ~previous['EmployeeID'].isin(current['EmployeeID'])]
+    return pd.concat([rows, removed.assign(Hired=False, Left=True)], ignore_index=True)
+
+# Overwrite changed employees in a copy of the frame, when the batch only updates
+# existing employees, keeps every manager and brings no new dimension value; returns
+# None otherwise. The cached frame other sessions are reading is never modified, and
+# neither the org index nor the dimension dictionaries are rebuilt.
+def patch_rows(df, ids, rows):
+    columns = [column for column in df.columns if column not in ORG_INDEX_COLUMNS]
+    if len(rows) != len(ids) or set(rows['EmployeeID']) != set(ids) or not set(columns) <= set(rows.columns):
+        return None
+    if not df['EmployeeID'].is_monotonic_increasing:
+        return None
+
+    # Frames are kept sorted by EmployeeID, so each row is found by binary search
+    rows = rows.sort_values('EmployeeID')
+    employee_ids = df['EmployeeID'].to_numpy()
+    positions = np.searchsorted(employee_ids, rows['EmployeeID'].to_numpy())
+    if (positions >= len(df)).any() or (employee_ids[positions] != rows['EmployeeID'].to_numpy()).any():
+        return None
+
+    if 'ManagerID' in columns:
+        before = pd.to_numeric(df['ManagerID'].iloc[positions], errors='coerce').fillna(0).to_numpy()
+        after = pd.to_numeric(rows['ManagerID'], errors='coerce').fillna(0).to_numpy()
+        if (before != after).any():
+            return None
+    for column in columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            if not rows[column].dropna().isin(df[column].cat.categories).all():
+                return None
+
+    patched = df.copy()
+    for column in columns:
+        patched.iloc[positions, patched.columns.get_loc(column)] = rows[column].to_numpy()
+    return patched
+
+# Replace changed employees in a frame: rows whose EmployeeID is in `ids` are dropped
+# and `rows` (their current versions; deleted ids are simply absent) appended. Batches
+# that only update fields are patched in place; otherwise the org index is rebuilt
+# since a change of manager moves a whole subtree, and the dimension dictionaries
+# since a row may bring a new value.
+def apply_changes(df, ids, rows):
+    patched = patch_rows(df, ids, rows)
+    if patched is not None:
+        return patched
+
+    columns = [column for column in df.columns if column not in ORG_INDEX_COLUMNS]
+    kept = df[~df['EmployeeID'].isin(ids)]
+    updated = pd.concat([kept[columns], rows[columns]], ignore_index=True)
+    return encode_dimensions(add_org_index(updated.sort_values('EmployeeID', ignore_index=True)))
+
+# Sorted distinct values for each sidebar filter
+def filter_options(df):
+    return {column: sorted(df[column].unique()) for column in FILTER_COLUMNS}
+
+# Boolean mask for the sidebar filters ({column: selected values})
+def filter_mask(df, filters):
+    mask = np.ones(len(df), dtype=bool)
+    for column, values in filters.items():
+        if column == ORG_FILTER:
+            mask &= org_subtree_mask(df, values)
+        else:
+            mask &= df[column].isin(values).to_numpy()
+    return mask
+
+# Apply the sidebar filters in one combined mask
+def apply_filters(df, filters):
+    return df[filter_mask(df, filters)]
+
+# Row positions of the whole frame ordered by (column, EmployeeID); computed once per sort key
+def sort_order(df, column):
+    return np.lexsort((df['EmployeeID'].to_numpy(), df[column].to_numpy()))
+
+# One page of the drill-down table; only the rows on the page are materialized
+def get_page(df, order, filters, page, page_size=50, descending=False):
+    positions = order[filter_mask(df, filters)[order]]
+    if descending:
+        positions = positions[::-1]
+    page_positions = positions[page * page_size:(page + 1) * page_size]
+    return df.take(page_positions)[DRILL_DOWN_COLUMNS], len(positions)
+
+# Headline metrics shown on the Overview and Attrition tabs
+def compute_kpis(filtered_df):
+    total_employees = len(filtered_df)
+    attrition_count = int((filtered_df['Attrition'] == 'Yes').sum())
+    return {
+        'total_employees': total_employees,
+        'active_employees': total_employees - attrition_count,
+        'attrition_count': attrition_count,
+        'attrition_rate': round((attrition_count / total_employees) * 100, 1) if total_employees > 0 else 0,
+        'avg_performance': round(filtered_df['PerformanceRating'].mean(), 1),
+        'avg_satisfaction': round(filtered_df['JobSatisfaction'].mean(), 1)
+    }
+
+# Salary metrics shown on the Compensation tab
+def compute_salary_summary(filtered_df):
+    return {
+        'avg_salary': int(filtered_df['Salary'].mean()),
+        'median_salary': int(filtered_df['Salary'].median()),
+        'min_salary': int(filtered_df['Salary'].min()),
+        'max_salary': int(filtered_df['Salary'].max())
+    }
+
+# Count of employees per value of a column, largest first
+def count_by(filtered_df, column, count_name='Count'):
+    counts = filtered_df[column].value_counts().reset_index()
+    counts.columns = [column, count_name]
+    return counts.sort_values(count_name, ascending=False)
+
+# Mean of a value column per group, highest first
+def mean_by(filtered_df, group_column, value_column):
+    means = filtered_df.groupby(group_column)[value_column].mean().reset_index()
+    return means.sort_values(value_column, ascending=False)
+
+# Attrition counts and rate per value of a column (None when nobody in the selection left)
+def attrition_by(filtered_df, column):
+    attrition = filtered_df.groupby([column, 'Attrition']).size().unstack().fillna(0)
+    if 'Yes' not in attrition.columns:
+        return None
+    attrition['Total'] = attrition.sum(axis=1)
+    attrition['AttritionRate'] = attrition['Yes'] / attrition['Total'] * 100
+    return attrition.reset_index()
+
+# Headcount per age group and gender in long format
+def age_gender_counts(filtered_df):
+    bins = [20, 30, 40, 50, 60, 70]
+    labels = ['20-29', '30-39', '40-49', '50-59', '60+']
+    age_group = pd.cut(filtered_df['Age'], bins=bins, labels=labels, right=False).rename('AgeGroup')
+
+    age_gender = filtered_df.groupby([age_group, filtered_df['Gender']], observed=False).size().unstack().fillna(0)
+    return age_gender.reset_index().melt(id_vars='AgeGroup', value_vars=age_gender.columns,
+                                         var_name='Gender', value_name='Count')
+
+# Headcount per tenure band, in band order
+def service_counts(filtered_df):
+    bins = [0, 2, 5, 10, 15, 30]
+    labels = ['0-2', '3-5', '6-10', '11-15', '16+']
+    service_group = pd.cut(filtered_df['YearsAtCompany'], bins=bins, labels=labels, right=False)
+
+    counts = service_group.value_counts().reset_index()
+    counts.columns = ['Years of Service', 'Count']
+    counts['Years of Service'] = pd.Categorical(counts['Years of Service'], categories=labels, ordered=True)
+    return counts.sort_values('Years of Service')
+
+# Headcount per department and job role in long format
+def role_department_counts(filtered_df):
+    role_dept = filtered_df.groupby(['Department', 'JobRole']).size().unstack().fillna(0)
+    return role_dept.reset_index().melt(id_vars='Department', value_vars=role_dept.columns,
+                                        var_name='JobRole', value_name='Count')
+
+# Headcount per performance rating with its label, in rating order
+def performance_counts(filtered_df):
+    perf_labels = {
+        1: "Poor",
+        2: "Below Average",
+        3: "Average",
+        4: "Good",
+        5: "Excellent"
+    }
+    counts = filtered_df['PerformanceRating'].value_counts().reset_index()
+    counts.columns = ['Rating', 'Count']
+    counts['Label'] = counts['Rating'].map(perf_labels)
+    return counts.sort_values('Rating')
+
+# Five-number summary (min, quartiles, max) of a value column per group, in group order
+def quantiles_by(filtered_df, group_column, value_column):
+    summary = filtered_df.groupby(group_column, observed=True)[value_column].describe()
+    summary = summary[['min', '25%', '50%', '75%', 'max']].rename(columns={'25%': 'q1', '50%': 'median', '75%': 'q3'})
+    return summary.rename_axis(group_column).reset_index()
+
+# Bars kept by the location and education charts before the "Other" bucket
+TOP_LOCATIONS = 15
+TOP_EDUCATION_LEVELS = 10
+
+# The scatter charts draw a fixed-size sample of the selection, so their size doesn't
+# grow with the number of employees
+SCATTER_POINTS = 2000
+SCATTER_COLUMNS = [
+    'Department', 'JobRole', 'Gender', 'Age', 'Salary',
+    'YearsAtCompany', 'PerformanceRating', 'JobSatisfaction'
+]
+
+def sample_rows(filtered_df, n=SCATTER_POINTS):
+    rows = filtered_df[SCATTER_COLUMNS]
+    return rows.sample(n, random_state=0) if len(rows) > n else rows
+
+# Top values of a high-cardinality column plus "Other" (None when the data has no such column)
+def top_counts(filtered_df, column, n):
+    return top_k_with_other(filtered_df[column], column, n) if column in filtered_df.columns else None
+
+# Every aggregate the tabs need, computed for one filter state
+def compute_all_aggregates(filtered_df):
+    return {
+        'kpis': compute_kpis(filtered_df),
+        'salary_summary': compute_salary_summary(filtered_df) if len(filtered_df) else None,
+        'dept_counts': count_by(filtered_df, 'Department'),
+        'gender_counts': count_by(filtered_df, 'Gender'),
+        'perf_by_dept': mean_by(filtered_df, 'Department', 'PerformanceRating'),
+        'age_gender': age_gender_counts(filtered_df),
+        'service_counts': service_counts(filtered_df),
+        'role_dept': role_department_counts(filtered_df),
+        'perf_counts': performance_counts(filtered_df),
+        'perf_by_role': mean_by(filtered_df, 'JobRole', 'PerformanceRating'),
+        'dept_attrition': attrition_by(filtered_df, 'Department'),
+        'role_attrition': attrition_by(filtered_df, 'JobRole'),
+        'att_by_sat': attrition_by(filtered_df, 'JobSatisfaction'),
+        'att_by_perf': attrition_by(filtered_df, 'PerformanceRating'),
+        'dept_salary': mean_by(filtered_df, 'Department', 'Salary'),
+        'role_salary': mean_by(filtered_df, 'JobRole', 'Salary'),
+        'gender_dept_salary': filtered_df.groupby(['Department', 'Gender'])['Salary'].mean().reset_index(),
+        'dept_salary_quantiles': quantiles_by(filtered_df, 'Department', 'Salary'),
+        'perf_salary_quantiles': quantiles_by(filtered_df, 'PerformanceRating', 'Salary'),
+        'top_locations': top_counts(filtered_df, 'Location', TOP_LOCATIONS),
+        'top_education': top_counts(filtered_df, 'Education', TOP_EDUCATION_LEVELS),
+        'scatter_sample': sample_rows(filtered_df)
+    }
+
+# Largest number of segments the comparison mode accepts
+MAX_SEGMENTS = 4
+
+# Stack the rows of every segment ({label: filters}) with a Segment column, so all
+# segments can be aggregated by one groupby. Segments may overlap.
+def stack_segments(df, segments, columns):
+    positions = []
+    codes = []
+    for code, filters in enumerate(segments.values()):
+        segment_positions = filter_mask(df, filters).nonzero()[0]
+        positions.append(segment_positions)
+        codes.append(np.full(len(segment_positions), code, dtype=np.int8))
+
+    stacked = df[columns].take(np.concatenate(positions) if positions else np.array([], dtype=np.int64))
+    stacked = stacked.reset_index(drop=True)
+    stacked['Segment'] = pd.Categorical.from_codes(
+        np.concatenate(codes) if codes else np.array([], dtype=np.int8),
+        categories=list(segments)
+    )
+    return stacked
+
+# KPIs and per-dimension aggregates for every segment, computed in one batched pass
+def compare_segments(df, segments, dimensions=('Department', 'JobRole', 'Gender', 'PerformanceRating')):
+    if len(segments) > MAX_SEGMENTS:
+        raise ValueError(f"At most {MAX_SEGMENTS} segments can be compared")
+
+    stacked = stack_segments(
+        df, segments,
+        list(dict.fromkeys([*dimensions, 'Attrition', 'PerformanceRating', 'JobSatisfaction', 'Salary']))
+    )
+    stacked['Left'] = (stacked['Attrition'] == 'Yes').astype(int)
+
+    aggregations = dict(
+        Employees=('Left', 'size'),
+        Leavers=('Left', 'sum'),
+        AvgPerformance=('PerformanceRating', 'mean'),
+        AvgSatisfaction=('JobSatisfaction', 'mean'),
+        AvgSalary=('Salary', 'mean')
+    )
+
+    kpis = stacked.groupby('Segment', observed=False).agg(**aggregations)
+    kpis['AttritionRate'] = np.where(kpis['Employees'] > 0, kpis['Leavers'] / kpis['Employees'].clip(lower=1) * 100, 0)
+
+    by_dimension = {}
+    for dimension in dimensions:
+        table = stacked.groupby(['Segment', dimension], observed=True).agg(**aggregations).reset_index()
+        table['AttritionRate'] = table['Leavers'] / table['Employees'] * 100
+        by_dimension[dimension] = table
+
+    return kpis.reset_index(), by_dimension
@@ -0,0 +1,190 @@
+import os
+import json
+import time
+import select
+import threading
+
+import psycopg2
+import psycopg2.extensions
+
+import hr_data
+from database import CHANGE_CHANNEL, get_connection, copy_employees, fetch_employees_by_id
+from pay_equity import update_pay_cells
+from tenant_cache import tenant_cache
+from tenants import TENANTS, tenant_settings, use_tenant
+
+# Live updates are on for the Postgres source unless HR_LIVE_UPDATES=0
+LIVE_UPDATES = os.getenv("HR_LIVE_UPDATES", "1") != "0"
+
+# How often each session checks whether it needs a rerun
+POLL_SECONDS = float(os.getenv("HR_LIVE_POLL_SECONDS", "2"))
+
+# Sessions that stop polling for this long are forgotten
+SESSION_TIMEOUT = 600
+
+# One per process: LISTENs for employees changes of every tenant, applies the changed
+# rows to the cached frame and pay-equity cells, and flags the sessions whose filters
+# cover a changed row (before or after the change). `cache_keys(tenant)` returns the
+# tenant-cache keys of that tenant's (frame, pay cells). Observers (e.g. the alert
+# engine) get every batch as changed(tenant, ids, rows) or reload(tenant, df).
+class ChangeListener(threading.Thread):
+    def __init__(self, cache_keys, wait_seconds=1.0, observers=()):
+        super().__init__(name="change-listener", daemon=True)
+        self.cache_keys = cache_keys
+        self.observers = list(observers)
+        self.wait_seconds = wait_seconds
+        self.batches_applied = 0
+        self.last_latency = None
+        self.errors = 0
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    # Register or refresh a session's tenant and applied filters
+    def watch(self, session_id, tenant, filters):
+        with self._lock:
+            session = self._sessions.setdefault(session_id, {'dirty': False})
+            session.update(tenant=tenant, filters=filters, seen=time.time())
+
+    # True once after a change covering the session's filters
+    def take_dirty(self, session_id):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return False
+            session['seen'] = time.time()
+            dirty, session['dirty'] = session['dirty'], False
+            return dirty
+
+    def stop(self):
+        self._done.set()
+
+    def _listen(self):
+        connections = {}
+        for tenant in TENANTS:
+            connection = get_connection(tenant)
+            connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            connection.cursor().execute(f"LISTEN {CHANGE_CHANNEL}")
+            connections[connection] = tenant
+        return connections
+
+    def run(self):
+        connections = {}
+        while not self._done.is_set():
+            try:
+                if not connections:
+                    connections = self._listen()
+                readable, _, _ = select.select(list(connections), [], [], self.wait_seconds)
+
+                # Collect everything that arrived, then apply once per tenant
+                changes = {}
+                for connection in readable:
+                    connection.poll()
+                    tenant = connections[connection]
+                    schema = tenant_settings(tenant).get('schema', 'public')
+                    while connection.notifies:
+                        payload = json.loads(connection.notifies.pop(0).payload)
+                        if payload['schema'] != schema:
+                            continue
+                        change = changes.setdefault(tenant, {'ids': set(), 'reload': False})
+                        change['ids'].update(payload.get('ids', []))
+                        change['reload'] |= bool(payload.get('reload'))
+
+                for tenant, change in changes.items():
+                    self.apply(tenant, change['ids'], change['reload'])
+                self._forget_idle_sessions()
+            except psycopg2.Error as error:
+                # Reconnect after a dropped connection; changes missed meanwhile force a reload
+                print(f"Change listener error: {error}")
+                self.errors += 1
+                for connection in connections:
+                    connection.close()
+                connections = {}
+                self._reset(TENANTS)
+                self._done.wait(self.wait_seconds)
+            except Exception as error:
+                # Anything else (a bad payload, a failed frame update) must not end the
+                # thread: cached data reloads from scratch and listening goes on
+                print(f"Change listener error: {error!r}")
+                self.errors += 1
+                self._reset(TENANTS)
+                self._done.wait(self.wait_seconds)
+
+        for connection in connections:
+            connection.close()
+
+    # Drop the tenants' cached data and observer state and flag all their sessions
+    def _reset(self, tenants):
+        for tenant in tenants:
+            self._mark_sessions(tenant, None)
+            tenant_cache.invalidate(tenant)
+            for observer in self.observers:
+                observer.invalidate(tenant)
+
+    # Apply one batch of changed ids (or a full reload) to a tenant's cached data
+    def apply(self, tenant, ids, reload=False):
+        start = time.perf_counter()
+        frame_key, pay_cells_key = self.cache_keys(tenant)
+        found, df = tenant_cache.peek(tenant, frame_key)
+        if not found and not self.observers:
+            # Nothing loaded for this tenant yet, so the next load reads fresh data anyway
+            self._mark_sessions(tenant, None)
+            return
+
+        with use_tenant(tenant):
+            if reload:
+                updated = hr_data.encode_dimensions(hr_data.add_org_index(hr_data.from_database_frame(copy_employees())))
+                ids = None
+            else:
+                ids = sorted(ids)
+                rows = hr_data.from_database_frame(fetch_employees_by_id(ids))
+
+        for observer in self.observers:
+            try:
+                if reload:
+                    observer.reload(tenant, updated)
+                else:
+                    observer.changed(tenant, ids, rows)
+            except Exception as error:
+                # An observer failing must not stop the dashboard's updates
+                print(f"Change observer error: {error}")
+
+        if not found:
+            self._mark_sessions(tenant, None)
+            return
+
+        with use_tenant(tenant):
+            if reload:
+                entries = {frame_key: updated}
+            else:
+                updated = hr_data.apply_changes(df, ids, rows)
+                entries = {frame_key: updated}
+                found, cells = tenant_cache.peek(tenant, pay_cells_key)
+                if found:
+                    entries[pay_cells_key] = update_pay_cells(cells, df[df['EmployeeID'].isin(ids)], rows)
+
+        # Everything else derived from the old frame is rebuilt on demand
+        tenant_cache.replace(tenant, entries)
+        self._mark_sessions(tenant, ids, df, updated)
+        self.batches_applied += 1
+        self.last_latency = time.perf_counter() - start
+
+    # Flag the tenant's sessions whose filters match a changed row before or after the
+    # change (all of them when ids is None). Filters are evaluated on the whole frames,
+    # since an org filter needs the manager's row to locate the subtree.
+    def _mark_sessions(self, tenant, ids, before=None, after=None):
+        with self._lock:
+            for session in self._sessions.values():
+                if session['tenant'] != tenant:
+                    continue
+                if ids is None or any(
+                    hr_data.filter_mask(frame, session['filters'])[frame['EmployeeID'].isin(ids).to_numpy()].any()
+                    for frame in (before, after)
+                ):
+                    session['dirty'] = True
+
+    def _forget_idle_sessions(self):
+        cutoff = time.time() - SESSION_TIMEOUT
+        with self._lock:
+            for session_id in [key for key, session in self._sessions.items() if session['seen'] < cutoff]:
+                del self._sessions[session_id]
@@ -0,0 +1,184 @@
+import os
+import time
+import random
+import argparse
+import threading
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+import hr_data
+from hr_data import FILTER_COLUMNS, load_employees, filter_options, apply_filters, compute_all_aggregates
+
+# Directory holding the dashboard, for the AppTest mode
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DASHBOARD = os.path.join(ROOT, "simple_hr_dashboard.py")
+
+# Percentiles of a list of latencies in milliseconds
+def percentiles(samples):
+    if not samples:
+        return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0}
+    values = np.percentile(samples, [50, 95, 99])
+    return {'p50': float(values[0]), 'p95': float(values[1]), 'p99': float(values[2])}
+
+# Deep size of everything a session keeps between reruns
+def state_bytes(filtered_df, aggregates):
+    total = int(filtered_df.memory_usage(deep=True).sum())
+    for value in aggregates.values():
+        if hasattr(value, 'memory_usage'):
+            total += int(value.memory_usage(deep=True).sum())
+    return total
+
+# Random filter edit: toggle one value of one filter, never leaving it empty
+def next_filters(filters, options, rng):
+    column = rng.choice(FILTER_COLUMNS)
+    value = rng.choice(options[column])
+    selected = list(filters[column])
+    if value in selected and len(selected) > 1:
+        selected.remove(value)
+    elif value not in selected:
+        selected.append(value)
+    return {**filters, column: selected}
+
+# One simulated viewer calling the aggregation functions directly
+def run_function_session(session_id, df, options, iterations, seed):
+    rng = random.Random(seed + session_id)
+    filters = {column: list(values) for column, values in options.items()}
+    latencies = []
+    retained = 0
+
+    for _ in range(iterations):
+        filters = next_filters(filters, options, rng)
+        start = time.perf_counter()
+        filtered_df = apply_filters(df, filters)
+        aggregates = compute_all_aggregates(filtered_df)
+        latencies.append((time.perf_counter() - start) * 1000)
+        retained = state_bytes(filtered_df, aggregates)
+
+    return latencies, retained
+
+# One simulated viewer driving the real script through Streamlit's AppTest harness
+def run_apptest_session(session_id, df, options, iterations, seed):
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed + session_id)
+    app = AppTest.from_file(DASHBOARD, default_timeout=120)
+    app.run()
+    latencies = []
+
+    for _ in range(iterations):
+        widget = rng.randrange(len(FILTER_COLUMNS))
+        multiselect = app.sidebar.multiselect[widget]
+        value = rng.choice(multiselect.options)
+        selected = list(multiselect.value)
+        if value in selected and len(selected) > 1:
+            selected.remove(value)
+        elif value not in selected:
+            selected.append(value)
+
+        # Filters sit in a form, so the change only takes effect on Apply
+        multiselect.set_value(selected)
+        apply_button = next(button for button in app.sidebar.button if button.label == "Apply")
+
+        start = time.perf_counter()
+        apply_button.click().run()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return latencies, 0
+
+# Sample active database connections while the sessions run
+class ConnectionMonitor(threading.Thread):
+    def __init__(self, interval=0.2):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = 0
+        self._done = threading.Event()
+
+    def run(self):
+        from database import get_connection, connection_stats
+
+        conn = get_connection()
+        connection_stats['opened'] -= 1  # the monitor's own connection doesn't count
+        cursor = conn.cursor()
+        while not self._done.is_set():
+            cursor.execute(
+                "SELECT COUNT(*) FROM pg_stat_activity WHERE datname = current_database() AND pid <> pg_backend_pid()"
+            )
+            self.peak = max(self.peak, cursor.fetchone()[0])
+            self._done.wait(self.interval)
+        cursor.close()
+        conn.close()
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+# Run N concurrent sessions against a dataset of the given size and print a report
+def run_load_test(n_employees, sessions, iterations, mode, source, seed):
+    tracemalloc.start()
+
+    # Like st.cache_data, the dataset is loaded once and shared across sessions
+    load_start = time.perf_counter()
+    df = load_employees(source, n_employees)
+    load_ms = (time.perf_counter() - load_start) * 1000
+    options = filter_options(df)
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+
+    monitor = None
+    if source == "postgres":
+        from database import connection_stats
+        connection_stats['opened'] = 0
+        monitor = ConnectionMonitor()
+        monitor.start()
+
+    # The dashboard script loads its own copy, sized from hr_data.SAMPLE_SIZE
+    if mode == "apptest":
+        hr_data.SAMPLE_SIZE = n_employees
+
+    session = run_apptest_session if mode == "apptest" else run_function_session
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        results = list(pool.map(
+            lambda session_id: session(session_id, df, options, iterations, seed),
+            range(sessions)
+        ))
+    wall_ms = (time.perf_counter() - wall_start) * 1000
+
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if monitor is not None:
+        monitor.stop()
+
+    latencies = [latency for session_latencies, _ in results for latency in session_latencies]
+    retained = [session_bytes for _, session_bytes in results]
+    stats = percentiles(latencies)
+
+    print(f"employees={len(df):,} sessions={sessions} iterations={iterations} mode={mode} source={source}")
+    print(f"  dataset load: {load_ms:.0f} ms")
+    print(f"  rerun latency: p50 {stats['p50']:.1f} ms, p95 {stats['p95']:.1f} ms, p99 {stats['p99']:.1f} ms")
+    print(f"  throughput: {len(latencies) / (wall_ms / 1000):.1f} reruns/s")
+    print(f"  memory per session: {(peak - baseline) / sessions / 1024:.0f} KiB peak, "
+          f"{np.mean(retained) / 1024:.0f} KiB retained state")
+    if monitor is not None:
+        from database import connection_stats
+        print(f"  db connections: {connection_stats['opened']} opened, {monitor.peak} peak concurrent")
+
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-session load test for the HR dashboard")
+    parser.add_argument("--employees", default="200,10000,100000",
+                        help="comma-separated dataset sizes (memory source only)")
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=20, help="filter changes per session")
+    parser.add_argument("--mode", choices=["functions", "apptest"], default="functions")
+    parser.add_argument("--source", choices=["memory", "postgres"], default="memory")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.employees.split(",")]
+    if args.source == "postgres":
+        sizes = sizes[:1]
+    for size in sizes:
+        run_load_test(size, args.sessions, args.iterations, args.mode, args.source, args.seed)
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+from hr_data import FILTER_COLUMNS
+
+# Cells are the sidebar filter dimensions, so any filter selects whole cells
+CELL_COLUMNS = FILTER_COLUMNS
+
+# Column of the female indicator in the design
+FEMALE = 1
+
+# Regressors: intercept, female, department and role dummies, performance rating and
+# tenure. Tenure is the only one that varies inside a cell. The dummy levels are the
+# departments and roles observed in the cells (the first, sorted, is the base), so a
+# value missing from the sample data's lists still gets its own coefficient.
+def design_features(cells):
+    departments = sorted(cells['Department'].unique())
+    job_roles = sorted(cells['JobRole'].unique())
+    features = (
+        ['Intercept', 'Female']
+        + [f"Department[{name}]" for name in departments[1:]]
+        + [f"JobRole[{name}]" for name in job_roles[1:]]
+        + ['PerformanceRating', 'YearsAtCompany']
+    )
+    return features, departments, job_roles
+
+# Per-cell sufficient statistics: counts plus sums of tenure, salary and their products
+def build_pay_cells(df):
+    tenure = df['YearsAtCompany'].astype(float)
+    salary = df['Salary'].astype(float)
+    moments = pd.DataFrame({
+        **{column: df[column] for column in CELL_COLUMNS},
+        'n': 1.0,
+        't': tenure,
+        'tt': tenure * tenure,
+        'y': salary,
+        'ty': tenure * salary,
+        'yy': salary * salary
+    })
+    return moments.groupby(CELL_COLUMNS, observed=True).sum().reset_index()
+
+# Update cell statistics in place of a rebuild: the sums are additive, so removed
+# rows are subtracted and added rows summed in. Cells left empty are dropped.
+def update_pay_cells(cells, removed, added):
+    removed_cells = build_pay_cells(removed)
+    removed_cells[removed_cells.columns.difference(CELL_COLUMNS)] *= -1
+    combined = pd.concat([cells, removed_cells, build_pay_cells(added)], ignore_index=True)
+    combined = combined.groupby(CELL_COLUMNS, observed=True).sum().reset_index()
+    return combined[combined['n'] > 0].reset_index(drop=True)
+
+# Constant part of each cell's regressor row (every feature except tenure)
+def _cell_design(cells):
+    features, departments, job_roles = design_features(cells)
+    design = np.zeros((len(cells), len(features) - 1))
+    design[:, 0] = 1.0
+    design[:, FEMALE] = (cells['Gender'] == 'Female').to_numpy()
+    for offset, name in enumerate(departments[1:]):
+        design[:, 2 + offset] = (cells['Department'] == name).to_numpy()
+    for offset, name in enumerate(job_roles[1:]):
+        design[:, 1 + len(departments) + offset] = (cells['JobRole'] == name).to_numpy()
+    design[:, -1] = cells['PerformanceRating'].to_numpy()
+    return design
+
+# Combine cell statistics into X'X, X'y, y'y and n without touching any employee rows
+def combine_cells(cells):
+    design = _cell_design(cells)
+    n = cells['n'].to_numpy()
+    t = cells['t'].to_numpy()
+    y = cells['y'].to_numpy()
+
+    size = design.shape[1] + 1
+    xtx = np.empty((size, size))
+    xtx[:-1, :-1] = design.T @ (design * n[:, None])
+    xtx[:-1, -1] = xtx[-1, :-1] = design.T @ t
+    xtx[-1, -1] = cells['tt'].sum()
+
+    xty = np.empty(size)
+    xty[:-1] = design.T @ y
+    xty[-1] = cells['ty'].sum()
+
+    return xtx, xty, cells['yy'].sum(), n.sum()
+
+# Adjusted gender gap (female minus male, salary units) for a set of cells.
+# Returns None when the cells don't contain both "Female" and "Male" employees.
+def fit_pay_gap(cells):
+    if cells.empty or not {'Female', 'Male'} <= set(cells['Gender']):
+        return None
+
+    xtx, xty, yy, n = combine_cells(cells)
+
+    # Regressors that never vary in this selection (e.g. departments filtered out) are dropped
+    keep = np.diag(xtx) > 0
+    xtx, xty = xtx[np.ix_(keep, keep)], xty[keep]
+    inverse = np.linalg.pinv(xtx)
+    beta = inverse @ xty
+    rank = np.linalg.matrix_rank(xtx)
+    residual_dof = n - rank
+    if residual_dof <= 0:
+        return None
+
+    sigma2 = max(yy - beta @ xty, 0.0) / residual_dof
+    female = int(keep[:FEMALE].sum())
+    gap = float(beta[female])
+    std_error = float(np.sqrt(sigma2 * inverse[female, female]))
+
+    # Unadjusted gap and male mean, straight from the per-gender sums
+    by_gender = cells.groupby('Gender')[['n', 'y']].sum()
+    male_mean = by_gender.loc['Male', 'y'] / by_gender.loc['Male', 'n']
+    female_mean = by_gender.loc['Female', 'y'] / by_gender.loc['Female', 'n']
+
+    return {
+        'employees': int(n),
+        'raw_gap': float(female_mean - male_mean),
+        'adjusted_gap': gap,
+        'std_error': std_error,
+        'ci_low': gap - 1.96 * std_error,
+        'ci_high': gap + 1.96 * std_error,
+        'adjusted_gap_pct': float(gap / male_mean * 100) if male_mean else 0.0
+    }
+
+# Keep only the cells selected by the sidebar filters
+def select_cells(cells, filters):
+    mask = np.ones(len(cells), dtype=bool)
+    for column, values in filters.items():
+        mask &= cells[column].isin(values).to_numpy()
+    return cells[mask]
+
+# Company-wide and per-department adjusted gaps for the current filters
+def pay_gap_table(cells, filters):
+    selected = select_cells(cells, filters)
+    rows = []
+    for name, group in [('All departments', selected)] + list(selected.groupby('Department')):
+        result = fit_pay_gap(group)
+        if result is not None:
+            rows.append({'Department': name, **result})
+    return pd.DataFrame(rows)
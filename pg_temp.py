@@ -0,0 +1,80 @@
+import os
+import glob
+import shutil
+import tempfile
+import subprocess
+
+# Throwaway local Postgres for checks and benchmarks. The server listens only on a
+# unix socket inside its temp dir (listen_addresses=''), so no network is used.
+
+# Locate a Postgres server binary: PATH, then pg_config's bindir, then distro layouts
+def find_binary(name):
+    path = shutil.which(name)
+    if path:
+        return path
+    candidates = []
+    if shutil.which("pg_config"):
+        bindir = subprocess.run(["pg_config", "--bindir"], capture_output=True, text=True).stdout.strip()
+        candidates.append(os.path.join(bindir, name))
+    candidates += sorted(glob.glob(f"/usr/lib/postgresql/*/bin/{name}"), reverse=True)
+    for candidate in candidates:
+        if os.path.exists(candidate):
+            return candidate
+    raise FileNotFoundError(f"{name} not found; install the Postgres server binaries")
+
+class TemporaryPostgres:
+    def __init__(self, port=5432, user="postgres", database="postgres"):
+        self.port = port
+        self.user = user
+        self.database = database
+        self.directory = None
+
+    # Connection settings in the PG* form database.py reads
+    @property
+    def environment(self):
+        return {
+            'PGHOST': self.directory,
+            'PGPORT': str(self.port),
+            'PGUSER': self.user,
+            'PGDATABASE': self.database,
+            'PGPASSWORD': ""
+        }
+
+    def start(self):
+        self.directory = tempfile.mkdtemp(prefix="hr_pg_")
+        data_dir = os.path.join(self.directory, "data")
+        try:
+            subprocess.run(
+                [find_binary("initdb"), "-D", data_dir, "-U", self.user, "-A", "trust", "--no-sync"],
+                check=True, capture_output=True
+            )
+            server_options = f"-c listen_addresses='' -k {self.directory} -p {self.port} -c fsync=off"
+            subprocess.run(
+                [find_binary("pg_ctl"), "-D", data_dir, "-o", server_options,
+                 "-l", os.path.join(self.directory, "server.log"), "-w", "start"],
+                check=True, capture_output=True
+            )
+        except Exception:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            raise
+        return self
+
+    def stop(self):
+        if self.directory is None:
+            return
+        subprocess.run(
+            [find_binary("pg_ctl"), "-D", os.path.join(self.directory, "data"), "-m", "immediate", "-w", "stop"],
+            capture_output=True
+        )
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.directory = None
+
+    # Point this process (and anything it imports later) at the server
+    def export_environment(self):
+        os.environ.update(self.environment)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
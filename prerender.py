@@ -0,0 +1,148 @@
+import os
+import time
+import tomllib
+import argparse
+import threading
+
+import hr_data
+from charts import build_all_figures
+from cache import QueryCache
+from backends import CONFIG_PATH
+from tenants import TENANTS, current_tenant, tenant_settings
+
+# Shared with the dashboard through the disk tier, so a CLI run warms every server
+# process. HR_PRERENDER_CACHE_PATH wins over `[hr] prerender_cache` in config.toml; the
+# default sits next to this file rather than in the working directory.
+def prerender_cache_path(config_path=CONFIG_PATH):
+    path = os.getenv("HR_PRERENDER_CACHE_PATH")
+    if not path and os.path.exists(config_path):
+        with open(config_path, "rb") as config_file:
+            path = tomllib.load(config_file).get("hr", {}).get("prerender_cache")
+    return path or os.path.join(os.path.dirname(os.path.abspath(__file__)), "prerender_cache.sqlite")
+
+# Pre-rendered views: KPIs plus figure JSON, keyed by data version and filter state.
+# Opened on first use, so importing this module creates no file.
+_view_cache = None
+_view_cache_lock = threading.Lock()
+
+def get_view_cache():
+    global _view_cache
+    with _view_cache_lock:
+        if _view_cache is None:
+            _view_cache = QueryCache(max_entries=32, disk_path=prerender_cache_path())
+        return _view_cache
+
+# Version of a tenant's dataset without reading the data: the employees and org_closure
+# table versions for Postgres (bumped by every write), the sample size for seeded sample data
+def data_version(source=None, tenant=None, n_employees=None):
+    source = source or hr_data.DATA_SOURCE
+    tenant = tenant or current_tenant()
+    if source == "postgres":
+        from database import get_connection, get_table_versions
+        conn = get_connection(tenant)
+        cursor = conn.cursor()
+        try:
+            versions = get_table_versions(cursor, ("employees", "org_closure"))
+        finally:
+            cursor.close()
+            conn.close()
+        return f"{tenant}:employees={versions['employees']}:org={versions['org_closure']}"
+    n_employees = n_employees or tenant_settings(tenant).get('sample_size', hr_data.SAMPLE_SIZE)
+    return f"{tenant}:{source}:{n_employees}"
+
+# The "everything selected" filter state a new session starts with
+def default_filters(df):
+    return {column: list(values) for column, values in hr_data.filter_options(df).items()}
+
+# True when every filter has all of its options selected and nothing else narrows the view
+def is_default_view(filters, options):
+    return set(filters) <= set(options) and all(
+        set(filters[column]) == set(values) for column, values in options.items()
+    )
+
+# Order-independent, hashable form of a filter state
+def filter_state(filters):
+    return tuple(sorted((column, tuple(sorted(map(str, values)))) for column, values in filters.items()))
+
+# Cache key for a filter state on a given data version
+def view_key(version, filters):
+    return get_view_cache().make_key("view", filter_state(filters), {'data': version})
+
+# Look up a pre-rendered view; returns None on a miss
+def get_view(version, filters):
+    found, view = get_view_cache().get(view_key(version, filters))
+    return view if found else None
+
+# Sidebar counts for a filter state, kept with its view
+def view_summary(aggregates):
+    return {
+        'employees': aggregates['kpis']['total_employees'],
+        'departments': len(aggregates['dept_counts']),
+        'job_roles': len(aggregates['role_salary'])
+    }
+
+# Compute a filter state's KPIs, sidebar counts and every figure, and store them in the cache
+def render_view(df, filters, version=None):
+    version = version or data_version()
+    aggregates = hr_data.compute_all_aggregates(hr_data.apply_filters(df, filters))
+
+    view = {
+        'kpis': aggregates['kpis'],
+        'salary_summary': aggregates['salary_summary'],
+        'summary': view_summary(aggregates),
+        'figures': {name: fig.to_json() for name, fig in build_all_figures(aggregates).items()},
+        'rendered_at': time.time()
+    }
+    get_view_cache().put(view_key(version, filters), view)
+    return view
+
+# The default "everything selected" view new sessions start with
+def prerender_default_view(df, version=None):
+    return render_view(df, default_filters(df), version)
+
+# Pre-render one tenant's default view for its current data version
+def prerender_tenant(tenant, load=hr_data.load_employees, version=None):
+    version = version or data_version(tenant=tenant)
+    return version, prerender_default_view(load(tenant=tenant), version)
+
+# Re-render every tenant whose data version changed, checking every `interval` seconds;
+# a tenant's data is only loaded when its version has moved
+def run_prerender_loop(interval, stop_event=None, load=hr_data.load_employees):
+    stop_event = stop_event or threading.Event()
+    last_versions = {}
+    while not stop_event.is_set():
+        for tenant in TENANTS:
+            version = data_version(tenant=tenant)
+            if version != last_versions.get(tenant):
+                start = time.perf_counter()
+                prerender_tenant(tenant, load, version)
+                print(f"Pre-rendered default view for data {version} in {time.perf_counter() - start:.2f}s")
+                last_versions[tenant] = version
+        stop_event.wait(interval)
+
+# Background timer thread for running the loop inside a server process
+def start_prerender_thread(interval=300, load=hr_data.load_employees):
+    stop_event = threading.Event()
+    thread = threading.Thread(
+        target=run_prerender_loop,
+        args=(interval, stop_event, load),
+        name="prerender",
+        daemon=True
+    )
+    thread.start()
+    return thread, stop_event
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-render every tenant's default dashboard view")
+    parser.add_argument("--watch", type=float, metavar="SECONDS",
+                        help="keep running and re-render after each data refresh")
+    args = parser.parse_args()
+
+    if args.watch:
+        run_prerender_loop(args.watch)
+    else:
+        for tenant in TENANTS:
+            start = time.perf_counter()
+            version, view = prerender_tenant(tenant)
+            print(f"Pre-rendered {len(view['figures'])} figures for data {version} "
+                  f"in {time.perf_counter() - start:.2f}s")
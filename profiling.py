@@ -0,0 +1,128 @@
+import os
+import io
+import time
+import pstats
+import threading
+import tracemalloc
+
+# Where captured profiles are written
+PROFILES_DIR = os.getenv("HR_PROFILES_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"))
+
+# Number of allocation sites listed in each report
+TOP_ALLOCATORS = 25
+
+# Longest a capture may run; one still open after this (its run ended early and the
+# session never came back) is abandoned, so tracing never outlives it for long
+CAPTURE_TIMEOUT = float(os.getenv("HR_PROFILE_TIMEOUT", "120"))
+
+# tracemalloc is process-wide, so only one capture runs at a time
+_capture_lock = threading.Lock()
+
+# Profile one script run on the calling thread: a sampling profiler (pyinstrument, or
+# cProfile when it isn't installed) plus tracemalloc for allocations. Both profilers
+# only hook the calling thread, so other sessions' reruns aren't sampled; tracemalloc
+# does see their allocations while a capture is running.
+class RunProfiler:
+    def __init__(self, label="rerun"):
+        self.label = label
+        self.profiler = None
+        self.started_tracemalloc = False
+        self.baseline = None
+        self.start_time = None
+        self.watchdog = None
+        self._finished = False
+        self._finish_lock = threading.Lock()
+
+    # Returns False when another capture is already running
+    def start(self):
+        if not _capture_lock.acquire(blocking=False):
+            return False
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+            self.started_tracemalloc = True
+        self.baseline = tracemalloc.take_snapshot()
+
+        try:
+            from pyinstrument import Profiler
+            self.profiler = Profiler(interval=0.001)
+        except ImportError:
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        else:
+            self.profiler.start()
+        self.start_time = time.perf_counter()
+
+        self.watchdog = threading.Timer(CAPTURE_TIMEOUT, self.abandon)
+        self.watchdog.daemon = True
+        self.watchdog.start()
+        return True
+
+    # Exactly one of stop() and abandon() finishes a capture; False if it is already done
+    def _claim(self):
+        with self._finish_lock:
+            if self._finished:
+                return False
+            self._finished = True
+        if self.watchdog is not None:
+            self.watchdog.cancel()
+        return True
+
+    def _release(self):
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+        _capture_lock.release()
+
+    # Stop, write the reports and return {kind: path} (empty when the capture had
+    # already been abandoned)
+    def stop(self):
+        if not self._claim():
+            return {}
+        elapsed = time.perf_counter() - self.start_time
+        try:
+            snapshot = tracemalloc.take_snapshot()
+            os.makedirs(PROFILES_DIR, exist_ok=True)
+            stem = os.path.join(PROFILES_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{self.label}")
+            paths = {}
+
+            if hasattr(self.profiler, "output_html"):
+                self.profiler.stop()
+                paths['flame_graph'] = f"{stem}.html"
+                with open(paths['flame_graph'], "w", encoding="utf-8") as output:
+                    output.write(self.profiler.output_html())
+            else:
+                self.profiler.disable()
+                paths['profile'] = f"{stem}.prof"
+                self.profiler.dump_stats(paths['profile'])
+                report = io.StringIO()
+                pstats.Stats(self.profiler, stream=report).sort_stats("cumulative").print_stats(50)
+                paths['profile_text'] = f"{stem}-profile.txt"
+                with open(paths['profile_text'], "w", encoding="utf-8") as output:
+                    output.write(report.getvalue())
+
+            # Net growth per allocation site over the run
+            paths['allocations'] = f"{stem}-allocations.txt"
+            with open(paths['allocations'], "w", encoding="utf-8") as output:
+                output.write(f"Run took {elapsed:.3f}s; top {TOP_ALLOCATORS} allocation sites by growth\n\n")
+                for stat in snapshot.compare_to(self.baseline, "lineno")[:TOP_ALLOCATORS]:
+                    output.write(f"{stat}\n")
+            return paths
+        finally:
+            self._release()
+
+    # Release a capture whose run ended early (an exception or st.stop) without writing
+    # reports; called from a later run of the session or by the timeout watchdog, so
+    # possibly on another thread
+    def abandon(self):
+        if not self._claim():
+            return
+        try:
+            if hasattr(self.profiler, "output_html"):
+                if self.profiler.is_running:
+                    self.profiler.stop()
+            else:
+                self.profiler.disable()
+        except Exception:
+            pass
+        finally:
+            self._release()
@@ -0,0 +1,212 @@
+import os
+import re
+import sys
+import json
+import random
+import time
+import hashlib
+import argparse
+import threading
+import psycopg2.extensions
+
+# Instrumentation settings: log file and the latency above which plans are captured
+QUERY_LOG_PATH = os.getenv("HR_QUERY_LOG", "query_log.jsonl")
+SLOW_QUERY_MS = float(os.getenv("HR_SLOW_QUERY_MS", "200"))
+
+# Fraction of slow reads re-run under EXPLAIN (ANALYZE, BUFFERS) to capture their plan.
+# The log itself is opt-in, so every slow read is explained by default; lower it when
+# the re-run's cost matters.
+EXPLAIN_SAMPLE_RATE = float(os.getenv("HR_EXPLAIN_SAMPLE_RATE", "1"))
+
+# Serialize appends from concurrent sessions writing to the same log
+_log_lock = threading.Lock()
+
+# Replace literals with placeholders so queries differing only in values group together
+def fingerprint(query):
+    if isinstance(query, bytes):
+        query = query.decode("utf-8", errors="replace")
+    text = re.sub(r"'(?:[^']|'')*'", "?", query)
+    text = re.sub(r"\b\d+(?:\.\d+)?\b", "?", text)
+    text = re.sub(r"\(\s*\?(?:\s*,\s*\?)+\s*\)", "(?...)", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return text, hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+
+# Approximate size of a row as it crossed the wire in text format
+def row_bytes(row):
+    return sum(len(str(value).encode("utf-8")) for value in row if value is not None)
+
+# Append one record to the JSON lines log
+def write_record(record, path=None):
+    with _log_lock:
+        with open(path or QUERY_LOG_PATH, "a", encoding="utf-8") as log_file:
+            log_file.write(json.dumps(record, default=str) + "\n")
+
+# Cursor that logs every execute and COPY as soon as it returns. Rows, bytes and time
+# spent fetching are logged as a separate 'fetch' record on the next execute or close.
+class InstrumentedCursor(psycopg2.extensions.cursor):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pending = None
+
+    def execute(self, query, vars=None):
+        self._flush()
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            self._record(query, vars, start)
+
+    def executemany(self, query, vars_list):
+        self._flush()
+        start = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            self._record(query, None, start)
+
+    # Bulk loads (COPY ... TO STDOUT) are logged like an execute, with the rows and bytes
+    # they streamed into `file`; they are never explained
+    def copy_expert(self, sql, file, size=8192):
+        self._flush()
+        start = time.perf_counter()
+        position = file.tell()
+        try:
+            return super().copy_expert(sql, file, size)
+        finally:
+            self._record(sql, None, start, copied={'rows': max(self.rowcount, 0), 'bytes': file.tell() - position})
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._count([row] if row is not None else [], start)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._count(rows, start)
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._count(rows, start)
+        return rows
+
+    def close(self):
+        self._flush()
+        super().close()
+
+    def _record(self, query, vars, start, copied=None):
+        latency_ms = (time.perf_counter() - start) * 1000
+        text, query_hash = fingerprint(query)
+        record = {
+            'ts': time.time(),
+            'kind': 'execute',
+            'fingerprint': query_hash,
+            'query': text[:2000],
+            'params': repr(vars)[:500] if vars is not None else None,
+            'latency_ms': round(latency_ms, 3),
+            'rowcount': self.rowcount
+        }
+
+        # Plans are only captured for a sample of slow reads, since ANALYZE executes the
+        # statement again
+        if latency_ms >= SLOW_QUERY_MS:
+            record['slow'] = True
+            if (copied is None and text.lower().startswith(("select", "with"))
+                    and random.random() < EXPLAIN_SAMPLE_RATE):
+                record['plan'] = self._explain(query, vars)
+        if copied is not None:
+            record.update(copied)
+        write_record(record)
+        if copied is None:
+            self._pending = {'kind': 'fetch', 'fingerprint': query_hash, 'rows': 0, 'bytes': 0, 'fetch_ms': 0.0}
+
+    def _explain(self, query, vars):
+        if isinstance(query, bytes):
+            query = query.decode("utf-8", errors="replace")
+        plan_cursor = self.connection.cursor(cursor_factory=psycopg2.extensions.cursor)
+        try:
+            plan_cursor.execute("EXPLAIN (ANALYZE, BUFFERS) " + query, vars)
+            return [line[0] for line in plan_cursor.fetchall()]
+        except psycopg2.Error as e:
+            return [f"EXPLAIN failed: {e}"]
+        finally:
+            plan_cursor.close()
+
+    def _count(self, rows, start):
+        if self._pending is not None:
+            self._pending['rows'] += len(rows)
+            self._pending['bytes'] += sum(row_bytes(row) for row in rows)
+            self._pending['fetch_ms'] += (time.perf_counter() - start) * 1000
+
+    def _flush(self):
+        if self._pending is not None and self._pending['rows']:
+            write_record({'ts': time.time(), **self._pending, 'fetch_ms': round(self._pending['fetch_ms'], 3)})
+        self._pending = None
+
+# Load records from a JSON lines log
+def read_records(path):
+    with open(path, encoding="utf-8") as log_file:
+        return [json.loads(line) for line in log_file if line.strip()]
+
+# Aggregate records per fingerprint, sorted by total time spent
+def summarize(records, top=10):
+    groups = {}
+    for record in records:
+        if record.get('kind') == 'fetch':
+            group = groups.get(record['fingerprint'])
+            if group is not None:
+                group['rows'] += record['rows']
+                group['bytes'] += record['bytes']
+                group['fetch_ms'] += record['fetch_ms']
+            continue
+        group = groups.setdefault(record['fingerprint'], {
+            'fingerprint': record['fingerprint'],
+            'query': record['query'],
+            'calls': 0,
+            'latencies': [],
+            'rows': 0,
+            'bytes': 0,
+            'fetch_ms': 0.0,
+            'slow': 0
+        })
+        group['calls'] += 1
+        group['latencies'].append(record['latency_ms'])
+        group['rows'] += record.get('rows', 0)
+        group['bytes'] += record.get('bytes', 0)
+        group['slow'] += record.get('slow', 'plan' in record)
+
+    summary = []
+    for group in groups.values():
+        latencies = sorted(group.pop('latencies'))
+        group['total_ms'] = round(sum(latencies), 3)
+        group['mean_ms'] = round(group['total_ms'] / len(latencies), 3)
+        group['p95_ms'] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        summary.append(group)
+
+    summary.sort(key=lambda group: group['total_ms'], reverse=True)
+    return summary[:top]
+
+# Print the top queries by total time
+def print_report(path, top=10):
+    summary = summarize(read_records(path), top)
+    print(f"{'total ms':>12} {'calls':>7} {'mean ms':>10} {'p95 ms':>10} {'fetch ms':>10} {'rows':>10} {'bytes':>12} {'slow':>5}  query")
+    for group in summary:
+        print(
+            f"{group['total_ms']:>12.1f} {group['calls']:>7} {group['mean_ms']:>10.2f} "
+            f"{group['p95_ms']:>10.2f} {group['fetch_ms']:>10.1f} {group['rows']:>10} {group['bytes']:>12} {group['slow']:>5}  "
+            f"{group['query'][:80]}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize the database query log")
+    parser.add_argument("command", choices=["report"])
+    parser.add_argument("path", nargs="?", default=QUERY_LOG_PATH)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        sys.exit(f"No query log at {args.path}")
+    print_report(args.path, args.top)
@@ -0,0 +1,135 @@
+import os
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import hr_data
+from charts import FIGURE_BUILDERS, build_figure
+from theme import BG_COLOR, TEXT_COLOR, MUTED_TEXT_COLOR
+
+# Rendered PNGs are kept by figure hash, so unchanged figures are never rendered twice,
+# within a run (across departments) or across weekly runs
+REPORTS_DIR = os.getenv("HR_REPORTS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "reports"))
+IMAGE_WIDTH = 1200
+IMAGE_HEIGHT = 700
+
+# Builder output as printable JSON: the dashboard's transparent background becomes the
+# theme background so the light text stays readable on paper
+def report_figures(filtered_df):
+    aggregates = hr_data.compute_all_aggregates(filtered_df)
+    figures = {}
+    for name in FIGURE_BUILDERS:
+        fig = build_figure(name, aggregates)
+        if fig is not None:
+            fig.update_layout(paper_bgcolor=BG_COLOR, plot_bgcolor=BG_COLOR)
+            figures[name] = fig.to_json()
+    return figures
+
+def figure_hash(figure_json):
+    return hashlib.sha1(figure_json.encode("utf-8")).hexdigest()
+
+# Pool initializer: import plotly and render one tiny figure so every worker starts its
+# kaleido renderer once and reuses it for all of its jobs
+def warm_renderer():
+    import plotly.graph_objects as go
+    go.Figure().to_image(format="png", width=10, height=10)
+
+# Worker: render one figure to `path`
+def render_png(job):
+    import plotly.io as pio
+    figure_json, path, scale = job
+    partial = f"{path}.{os.getpid()}.tmp"
+    pio.from_json(figure_json).write_image(partial, format="png", width=IMAGE_WIDTH, height=IMAGE_HEIGHT, scale=scale)
+    os.replace(partial, path)
+    return path
+
+# Pillow's default font; sized where the installed Pillow supports it
+def default_font(size):
+    from PIL import ImageFont
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        return ImageFont.load_default()
+
+# Cover page with the department's headline numbers
+def cover_page(department, kpis, size):
+    from PIL import Image, ImageDraw
+
+    page = Image.new("RGB", size, BG_COLOR)
+    draw = ImageDraw.Draw(page)
+    font = default_font(48)
+    small = default_font(28)
+    draw.text((80, 80), f"{department} - HR Report", fill=TEXT_COLOR, font=font)
+    draw.text((80, 160), time.strftime("%Y-%m-%d"), fill=MUTED_TEXT_COLOR, font=small)
+    lines = [
+        f"Employees: {kpis['total_employees']:,}",
+        f"Active: {kpis['active_employees']:,}",
+        f"Attrition rate: {kpis['attrition_rate']}%",
+        f"Average performance: {kpis['avg_performance']}",
+        f"Average satisfaction: {kpis['avg_satisfaction']}"
+    ]
+    for index, line in enumerate(lines):
+        draw.text((80, 260 + index * 50), line, fill=TEXT_COLOR, font=small)
+    return page
+
+# One PDF: the cover page followed by every chart, in tab order
+def write_pdf(path, cover, image_paths):
+    from PIL import Image
+
+    pages = [Image.open(image_path).convert("RGB") for image_path in image_paths]
+    cover.save(path, "PDF", save_all=True, append_images=pages, resolution=150)
+    for page in pages:
+        page.close()
+
+# Build a PDF pack per department; returns {department: pdf path}
+def build_reports(df, departments=None, output_dir=REPORTS_DIR, workers=None, scale=1.5):
+    departments = departments or hr_data.filter_options(df)['Department']
+    image_dir = os.path.join(output_dir, "images")
+    os.makedirs(image_dir, exist_ok=True)
+
+    # Build every department's figures first, then render each distinct figure once
+    reports = {}
+    pending = {}
+    for department in departments:
+        filtered_df = hr_data.apply_filters(df, {'Department': [department]})
+        figures = report_figures(filtered_df)
+        paths = []
+        for figure_json in figures.values():
+            path = os.path.join(image_dir, f"{figure_hash(figure_json)}.png")
+            if not os.path.exists(path):
+                pending[path] = figure_json
+            paths.append(path)
+        reports[department] = (hr_data.compute_kpis(filtered_df), paths)
+
+    total = sum(len(paths) for _, paths in reports.values())
+    print(f"{total} figures across {len(reports)} reports, {len(pending)} to render")
+
+    start = time.perf_counter()
+    if pending:
+        jobs = [(figure_json, path, scale) for path, figure_json in pending.items()]
+        with ProcessPoolExecutor(max_workers=workers, initializer=warm_renderer) as pool:
+            for _ in pool.map(render_png, jobs):
+                pass
+    print(f"Rendered in {time.perf_counter() - start:.1f}s")
+
+    page_size = (int(IMAGE_WIDTH * scale), int(IMAGE_HEIGHT * scale))
+    outputs = {}
+    for department, (kpis, paths) in reports.items():
+        file_name = "".join(character if character.isalnum() else "_" for character in department)
+        pdf_path = os.path.join(output_dir, f"{file_name}.pdf")
+        write_pdf(pdf_path, cover_page(department, kpis, page_size), paths)
+        outputs[department] = pdf_path
+    return outputs
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render one PDF chart pack per department")
+    parser.add_argument("--output-dir", default=REPORTS_DIR)
+    parser.add_argument("--department", action="append", help="only these departments (default: all)")
+    parser.add_argument("--workers", type=int, help="renderer processes (default: one per CPU)")
+    parser.add_argument("--scale", type=float, default=1.5, help="image scale factor")
+    args = parser.parse_args()
+
+    outputs = build_reports(hr_data.load_employees(), args.department, args.output_dir, args.workers, args.scale)
+    for department, path in outputs.items():
+        print(f"{department}: {path}")
@@ -1,9 +1,35 @@
+import os
+import hmac
+import uuid
+from functools import lru_cache
 import streamlit as st
-import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import hr_data
+import charts
+from charts import build_figure, lazy_import
+from theme import (
+    PRIMARY_COLOR, BG_COLOR, CARD_BG_COLOR, SIDEBAR_BG_COLOR, TEXT_COLOR, MUTED_TEXT_COLOR
+)
+from exports import EXPORT_FORMATS, export_template, iter_source_chunks, stream_export, spool_to_file, export_aggregates
+from attrition_model import what_if
+from pay_equity import CELL_COLUMNS, build_pay_cells, pay_gap_table
+from backends import BACKEND, make_backend
+from dimensions import PrefixIndex
+from profiling import PROFILES_DIR, RunProfiler
+from tenants import allowed_tenants, set_current_tenant, tenant_settings
+from tenant_cache import tenant_cache
+from prerender import (
+    data_version, filter_state, is_default_view, get_view, render_view, prerender_default_view,
+    start_prerender_thread, view_summary
+)
+from hr_data import (
+    load_employees, create_sample_history, build_monthly_rollups,
+    sort_order, get_page, SORT_COLUMNS,
+    compare_segments, MAX_SEGMENTS, org_managers, ORG_FILTER
+)
+
+# Plotly is only loaded once the first chart is shown
+pio = lazy_import("plotly.io")
 
 # Set page configuration
 st.set_page_config(
@@ -12,51 +38,10 @@ st.set_page_config(
     layout="wide"
 )
 
-# Custom color palettes
-# Primary color palette
-PRIMARY_COLOR = "#4361EE"  # Main theme color (blue)
-SECONDARY_COLOR = "#3A0CA3"  # Secondary color (darker blue/purple)
-ACCENT_COLOR = "#7209B7"  # Accent color (purple)
-HIGHLIGHT_COLOR = "#F72585"  # Highlight color (pink)
-
-# Background colors
-BG_COLOR = "#000000"  # Black background
-CARD_BG_COLOR = "#121212"  # Dark gray for cards
-SIDEBAR_BG_COLOR = "#000000"  # Sidebar background
-
-# Text colors
-TEXT_COLOR = "#F8FAFC"  # Light gray for text
-MUTED_TEXT_COLOR = "#94A3B8"  # Muted text
-
-# Department colors - assign a unique color to each department
-DEPARTMENT_COLORS = {
-    "Sales": "#4CC9F0",  # Light blue
-    "IT": "#4361EE",     # Blue
-    "R&D": "#3A0CA3",    # Purple
-    "HR": "#7209B7",     # Violet
-    "Finance": "#F72585", # Pink
-    "Marketing": "#4895EF", # Sky blue
-    "Operations": "#560BAD", # Dark purple
-    "Customer Service": "#F77F00" # Orange
-}
-
-# Performance colors
-PERFORMANCE_COLORS = {
-    1: "#F94144",  # Red (Poor)
-    2: "#F8961E",  # Orange (Below Average)
-    3: "#F9C74F",  # Yellow (Average)
-    4: "#90BE6D",  # Light green (Good)
-    5: "#43AA8B"   # Green (Excellent)
-}
-
-# Gender colors
-GENDER_COLORS = {
-    "Male": "#4361EE",  # Blue
-    "Female": "#F72585" # Pink
-}
-
-# Custom CSS to match the color scheme
-st.markdown(f"""
+# Custom CSS to match the color scheme, formatted once per process and emitted on every run
+@lru_cache(maxsize=1)
+def theme_css():
+    return f"""
 <style>
     /* Page background */
     .main {{
@@ -127,7 +112,9 @@ st.markdown(f"""
         background-color: {PRIMARY_COLOR};
     }}
 </style>
-""", unsafe_allow_html=True)
+"""
+
+st.markdown(theme_css(), unsafe_allow_html=True)
 
 # Function to create styled section headers
 def section_header(title):
@@ -148,59 +135,156 @@ def styled_card(title, content, icon=None):
     </div>
     """, unsafe_allow_html=True)
 
-# Function to generate sample HR data
-def create_sample_data(n_employees=200):
-    np.random.seed(42)
-    
-    # Define departments and job roles
-    departments = list(DEPARTMENT_COLORS.keys())
-    job_roles = ['Manager', 'Senior', 'Junior', 'Intern']
-    
-    # Create employee data
-    data = []
-    
-    for i in range(1, n_employees + 1):
-        # Basic employee information
-        employee = {
-            'EmployeeID': i,
-            'Age': np.random.randint(22, 60),
-            'Gender': np.random.choice(['Male', 'Female']),
-            'Department': np.random.choice(departments),
-            'JobRole': np.random.choice(job_roles),
-            'Salary': np.random.randint(30000, 120000),
-            'YearsAtCompany': np.random.randint(0, 20),
-            'JobSatisfaction': np.random.randint(1, 5),
-            'PerformanceRating': np.random.randint(1, 6),  # 1-5 scale
-            'WorkLifeBalance': np.random.randint(1, 5)
-        }
-        
-        # Calculate attrition probability based on various factors
-        attrition_prob = 0.15  # Base probability
-        
-        # Low satisfaction increases attrition
-        attrition_prob += (5 - employee['JobSatisfaction']) * 0.05
-        
-        # Low salary increases attrition
-        if employee['Salary'] < 50000:
-            attrition_prob += 0.1
-            
-        # New employees more likely to leave
-        if employee['YearsAtCompany'] < 2:
-            attrition_prob += 0.1
-            
-        # Cap probability between 0.05 and 0.8
-        attrition_prob = max(0.05, min(attrition_prob, 0.8))
-        
-        # Determine if employee left based on probability
-        employee['Attrition'] = 'Yes' if np.random.random() < attrition_prob else 'No'
-        
-        # Add to dataset
-        data.append(employee)
-    
-    return pd.DataFrame(data)
+# Each tenant's data and everything derived from it lives in the shared tenant cache,
+# so new sessions skip reloading and idle tenants are evicted under memory pressure
+def load_data(tenant, source, n_employees):
+    def build():
+        # Version read before the data, so a concurrent write can only leave it behind the frame
+        tenant_cache.put(tenant, ('data_version', source, n_employees), data_version(source, tenant, n_employees))
+        return load_employees(source, n_employees, tenant)
+    return tenant_cache.get_or_build(tenant, ('employees', source, n_employees), build)
+
+# Rollups are cached per tenant dataset
+def load_sample_rollups(tenant, source, n_employees, df):
+    return tenant_cache.get_or_build(
+        tenant, ('sample_rollups', source, n_employees), lambda: build_monthly_rollups(create_sample_history(df))
+    )
+
+# Function to load the trend rollups: the recorded monthly snapshots when the data comes
+# from Postgres (see `python database.py snapshot`), synthetic history until there are any
+def load_trend_rollups(tenant, source, n_employees, df):
+    if source == "postgres":
+        from database import get_trend_rollups
+        rollups = get_trend_rollups()
+        if not rollups.empty:
+            return rollups
+    return load_sample_rollups(tenant, source, n_employees, df)
+
+# Version of the loaded dataset (table versions, not a hash of the frame), keying the pre-rendered views
+def load_data_version(tenant, source, n_employees):
+    return tenant_cache.get_or_build(
+        tenant, ('data_version', source, n_employees), lambda: data_version(source, tenant, n_employees)
+    )
+
+# One pre-render timer thread per server process, enabled with HR_PRERENDER_INTERVAL (seconds)
+@st.cache_resource
+def start_prerender_timer(interval):
+    return start_prerender_thread(interval)
+
+# Analytics backend (pandas, postgres or duckdb) answering filters and aggregations
+def load_backend(tenant, source, n_employees, df):
+    return tenant_cache.get_or_build(tenant, ('backend', BACKEND, source, n_employees), lambda: make_backend(BACKEND, df))
+
+# Tenant-cache keys of a tenant's employee frame and pay cells, shared with the change listener
+def live_cache_keys(tenant):
+    n_employees = tenant_settings(tenant).get('sample_size', hr_data.SAMPLE_SIZE)
+    return ('employees', hr_data.DATA_SOURCE, n_employees), ('pay_cells', hr_data.DATA_SOURCE, n_employees)
+
+# One change listener per server process, applying Postgres changes to the cached data
+# and feeding the alert rules (alerts.toml) when there are any
+@st.cache_resource
+def start_change_listener():
+    from live_updates import ChangeListener
+    from alerts import AlertEngine, load_rules
+    rules = load_rules()
+    listener = ChangeListener(live_cache_keys, observers=[AlertEngine(rules)] if rules else [])
+    listener.start()
+    return listener
+
+# Prefix index over the tenant's distinct locations
+def load_location_index(tenant, source, n_employees, df):
+    return tenant_cache.get_or_build(
+        tenant, ('location_index', source, n_employees), lambda: PrefixIndex(df['Location'].dropna().unique())
+    )
+
+# Managers with reports, in tree order, for the org-tree filter
+def load_org_managers(tenant, source, n_employees, df):
+    return tenant_cache.get_or_build(tenant, ('org_managers', source, n_employees), lambda: org_managers(df))
+
+# Pay-equity sufficient statistics per filter cell, built once per dataset
+def load_pay_cells(tenant, source, n_employees, df):
+    return tenant_cache.get_or_build(tenant, ('pay_cells', source, n_employees), lambda: build_pay_cells(df))
+
+# Sort order of the full dataset per sort column, shared by every session of a tenant
+def load_sort_order(tenant, source, n_employees, column, df):
+    return tenant_cache.get_or_build(
+        tenant, ('sort_order', source, n_employees, column), lambda: sort_order(df, column)
+    )
+
+# Pre-rendered default view (KPIs and figure JSON), kept in memory per tenant
+def load_default_view(tenant, version, filters, df):
+    return tenant_cache.get_or_build(
+        tenant, ('default_view', version), lambda: get_view(version, filters) or prerender_default_view(df, version)
+    )
+
+# A saved preset's pre-rendered view, kept per tenant so switching presets is free
+def load_preset_view(tenant, version, filters, df):
+    return tenant_cache.get_or_build(
+        tenant,
+        ('preset', version, filter_state(filters)),
+        lambda: get_view(version, filters) or render_view(df, filters, version)
+    )
+
+# Admin pages are enabled by HR_ADMIN_TOKEN and opened with ?admin=<token>
+def is_admin():
+    token = os.getenv("HR_ADMIN_TOKEN")
+    return bool(token) and hmac.compare_digest(st.query_params.get("admin", ""), token)
+
+# Move the drill-down table one page forward or back
+def change_drill_page(step):
+    st.session_state['drill_page'] = max(0, st.session_state['drill_page'] + step)
+
+# Admins can profile exactly one rerun of this session, via ?profile=1 or the sidebar
+# button; the capture covers everything from here to the end of the script. A capture
+# whose run ended early is released on the session's next run, or by its timeout
+# watchdog if the session never comes back
+stale_profiler = st.session_state.pop('active_profiler', None)
+if stale_profiler:
+    stale_profiler.abandon()
+
+run_profiler = None
+if is_admin() and (st.query_params.get("profile") == "1" or st.session_state.pop('profile_next_run', False)):
+    if "profile" in st.query_params:
+        del st.query_params["profile"]
+    run_profiler = RunProfiler()
+    if run_profiler.start():
+        st.session_state['active_profiler'] = run_profiler
+    else:
+        st.toast("Another profile capture is running; try again shortly.")
+        run_profiler = None
+
+# Signed-in viewer's email, when the deployment has authentication configured
+def viewer_email():
+    user = getattr(st, "user", None) or getattr(st, "experimental_user", None)
+    return user.get("email") if user is not None else None
+
+# Tenant comes from ?tenant=<name>, limited to the tenants this viewer may open; the
+# sidebar offers a switch when there are several
+tenant_names = allowed_tenants(viewer_email(), st.query_params.get("token"), is_admin())
+if not tenant_names:
+    st.error("You don't have access to any business unit.")
+    st.stop()
+requested_tenant = st.query_params.get("tenant", tenant_names[0])
+if requested_tenant not in tenant_names:
+    st.error(f"You don't have access to business unit '{requested_tenant}'.")
+    st.stop()
+if len(tenant_names) > 1:
+    tenant = st.sidebar.selectbox(
+        "Business unit",
+        tenant_names,
+        index=tenant_names.index(requested_tenant)
+    )
+    st.query_params["tenant"] = tenant
+else:
+    tenant = tenant_names[0]
+set_current_tenant(tenant)
+sample_size = tenant_settings(tenant).get('sample_size', hr_data.SAMPLE_SIZE)
 
 # Load data
-df = create_sample_data()
+df = load_data(tenant, hr_data.DATA_SOURCE, sample_size)
+
+if os.getenv("HR_PRERENDER_INTERVAL"):
+    start_prerender_timer(float(os.getenv("HR_PRERENDER_INTERVAL")))
 
 # Dashboard title and header
 st.markdown(f"""
@@ -219,55 +303,205 @@ st.markdown(f"""
 # Sidebar for filtering
 st.sidebar.title("Filters")
 
-# Department filter
-departments = sorted(df['Department'].unique())
-department_filter = st.sidebar.multiselect(
-    "Department",
-    options=departments,
-    default=departments
-)
+# Filter options come from the full dataset
+backend = load_backend(tenant, hr_data.DATA_SOURCE, sample_size, df)
+options = backend.filter_options()
 
-# Job Role filter
-job_roles = sorted(df['JobRole'].unique())
-job_role_filter = st.sidebar.multiselect(
-    "Job Role",
-    options=job_roles,
-    default=job_roles
-)
+# Sidebar label of each filter column
+filter_labels = {
+    'Department': "Department",
+    'JobRole': "Job Role",
+    'Gender': "Gender",
+    'PerformanceRating': "Performance Rating"
+}
 
-# Gender filter
-genders = sorted(df['Gender'].unique())
-gender_filter = st.sidebar.multiselect(
-    "Gender",
-    options=genders,
-    default=genders
-)
+# Filters start fully selected, and again whenever the tenant (and so the options) changes
+if st.session_state.get('filter_tenant') != tenant:
+    st.session_state['filter_tenant'] = tenant
+    for column in filter_labels:
+        st.session_state[f"filter_{column}"] = list(options[column])
+    st.session_state['filter_org'] = 0
+    st.session_state['filter_Education'] = []
+    st.session_state['filter_Location'] = []
 
-# Performance filter
-performance_options = sorted(df['PerformanceRating'].unique())
-performance_filter = st.sidebar.multiselect(
-    "Performance Rating",
-    options=performance_options,
-    default=performance_options
+# Location has thousands of values, so its filter only lists prefix-search matches
+# (plus whatever is already selected); an empty selection means every location
+location_index = load_location_index(tenant, hr_data.DATA_SOURCE, sample_size, df)
+location_search = st.sidebar.text_input(
+    "Search locations", placeholder=f"{len(location_index):,} locations, type a prefix"
 )
+location_options = list(dict.fromkeys(
+    st.session_state.get('filter_Location', []) + location_index.search(location_search)
+))
+education_options = sorted(df['Education'].dropna().unique())
+
+# Org-tree filter: everyone under one manager (0 is the whole company), indented by level
+org_tree = load_org_managers(tenant, hr_data.DATA_SOURCE, sample_size, df)
+org_labels = {0: "Whole company"}
+org_labels.update({
+    int(row.EmployeeID): f"{'— ' * row.OrgDepth}#{row.EmployeeID} {row.JobRole}, {row.OrgUnit} "
+                         f"({row.OrgRight - row.OrgLeft - 1} reports)"
+    for row in org_tree.itertuples()
+})
+if st.session_state.get('filter_org') not in org_labels:
+    st.session_state['filter_org'] = 0
+
+# Saved presets live in the session; "All employees" is always available
+presets = st.session_state.setdefault('filter_presets', {})
+preset_choices = ["All employees"] + list(presets)
+
+def apply_preset():
+    name = st.session_state['preset_choice']
+    values = presets.get(name, options)
+    for column in filter_labels:
+        st.session_state[f"filter_{column}"] = [value for value in values[column] if value in options[column]]
+    for column in ('Education', 'Location'):
+        st.session_state[f"filter_{column}"] = list(values.get(column, []))
+    org_root = values.get(ORG_FILTER, [0])[0]
+    st.session_state['filter_org'] = org_root if org_root in org_labels else 0
+
+st.sidebar.selectbox("Preset", preset_choices, key='preset_choice', on_change=apply_preset)
+
+# The filters sit in a form, so picking several values costs one rerun on Apply
+with st.sidebar.form("filters"):
+    for column, label in filter_labels.items():
+        st.multiselect(label, options=options[column], key=f"filter_{column}")
+    st.multiselect("Education", options=education_options, key='filter_Education', placeholder="All levels")
+    st.multiselect("Location", options=location_options, key='filter_Location', placeholder="All locations")
+    st.selectbox("Reporting to", list(org_labels), format_func=org_labels.get, key='filter_org')
+    st.form_submit_button("Apply", use_container_width=True)
+
+# Filter values stay plain lists so they work for every data source
+current_filters = {column: list(st.session_state[f"filter_{column}"]) for column in filter_labels}
+for column in ('Education', 'Location'):
+    if st.session_state[f"filter_{column}"]:
+        current_filters[column] = list(st.session_state[f"filter_{column}"])
+if st.session_state['filter_org']:
+    current_filters[ORG_FILTER] = [st.session_state['filter_org']]
+department_filter = current_filters['Department']
 
-# Apply filters
-filtered_df = df[
-    df['Department'].isin(department_filter) & 
-    df['JobRole'].isin(job_role_filter) &
-    df['Gender'].isin(gender_filter) &
-    df['PerformanceRating'].isin(performance_filter)
-]
+# With live updates, a fragment polls the listener and reruns the page only when a
+# change touched rows this session's filters cover
+if hr_data.DATA_SOURCE == "postgres":
+    from live_updates import LIVE_UPDATES, POLL_SECONDS
+    if LIVE_UPDATES:
+        listener = start_change_listener()
+        session_id = st.session_state.setdefault('session_id', uuid.uuid4().hex)
+        listener.watch(session_id, tenant, current_filters)
+        
+        @st.fragment(run_every=POLL_SECONDS)
+        def poll_changes():
+            if listener.take_dirty(session_id):
+                st.rerun()
+        
+        poll_changes()
 
-# Display data summary
+# Save the applied filters under a name
+preset_col1, preset_col2 = st.sidebar.columns([3, 1])
+preset_name = preset_col1.text_input("Preset name", label_visibility="collapsed", placeholder="Preset name")
+if preset_col2.button("Save") and preset_name:
+    presets[preset_name] = current_filters
+
+# Saved presets reuse their cached pre-rendered view
+preset_view = None
+if filter_state(current_filters) in {filter_state(values) for values in presets.values()}:
+    version = load_data_version(tenant, hr_data.DATA_SOURCE, sample_size)
+    preset_view = load_preset_view(tenant, version, current_filters, df)
+
+# Pre-rendered KPIs and figures cover saved presets and the default "everything selected" view
+prerendered = preset_view
+if prerendered is None and is_default_view(current_filters, options):
+    version = load_data_version(tenant, hr_data.DATA_SOURCE, sample_size)
+    prerendered = load_default_view(tenant, version, current_filters, df)
+
+# Charts and KPIs are drawn from the backend's small grouped tables, computed at most once
+# per run and only when there is no pre-rendered view (or the chart-data export asks for
+# them); matching rows are only fetched for the drill-down, the what-if simulation and exports
+@lru_cache(maxsize=None)
+def current_aggregates():
+    return backend.aggregates(current_filters)
+
+# Display data summary (views rendered before counts were stored fall back to the aggregates)
+summary = prerendered.get('summary') if prerendered else None
+summary = summary or view_summary(current_aggregates())
 st.sidebar.markdown("---")
 st.sidebar.subheader("Data Summary")
-st.sidebar.write(f"Total Employees: {len(filtered_df)}")
-st.sidebar.write(f"Departments: {len(filtered_df['Department'].unique())}")
-st.sidebar.write(f"Job Roles: {len(filtered_df['JobRole'].unique())}")
+st.sidebar.write(f"Total Employees: {summary['employees']}")
+st.sidebar.write(f"Departments: {summary['departments']}")
+st.sidebar.write(f"Job Roles: {summary['job_roles']}")
+
+# Export the current selection; files are only built when asked for
+st.sidebar.markdown("---")
+st.sidebar.subheader("Export")
+export_format = st.sidebar.selectbox("Format", list(EXPORT_FORMATS))
+
+if st.sidebar.button("Prepare employee export"):
+    extension, _ = EXPORT_FORMATS[export_format]
+    previous_export = st.session_state.pop('export_path', None)
+    if previous_export and os.path.exists(previous_export):
+        os.remove(previous_export)
+    st.session_state['export_path'] = spool_to_file(
+        stream_export(iter_source_chunks(df, current_filters), export_format, export_template(df)), extension
+    )
+    st.session_state['export_format'] = export_format
+
+export_path = st.session_state.get('export_path')
+if export_path and os.path.exists(export_path):
+    extension, mime = EXPORT_FORMATS[st.session_state['export_format']]
+    with open(export_path, "rb") as export_file:
+        st.sidebar.download_button(
+            "Download employees",
+            data=export_file,
+            file_name=f"employees.{extension}",
+            mime=mime
+        )
+
+# Chart tables are small, so the zip is kept in the session once built
+if st.sidebar.button("Prepare chart data"):
+    st.session_state['chart_data_zip'] = export_aggregates(current_aggregates())
+
+if 'chart_data_zip' in st.session_state:
+    st.sidebar.download_button(
+        "Download chart data (zip)",
+        data=st.session_state['chart_data_zip'],
+        file_name="chart_data.zip",
+        mime="application/zip"
+    )
+
+# Cache usage per tenant, for admins only
+if is_admin():
+    st.sidebar.markdown("---")
+    st.sidebar.subheader("Cache Usage")
+    st.sidebar.caption(
+        f"{tenant_cache.total_bytes() / (1024 * 1024):,.1f} MB of "
+        f"{tenant_cache.budget_bytes / (1024 * 1024):,.0f} MB budget"
+    )
+    st.sidebar.dataframe(tenant_cache.stats().round(3), hide_index=True)
+    if hr_data.DATA_SOURCE == "postgres":
+        from database import query_cache
+        st.sidebar.write("Query cache", query_cache.stats())
+    
+    if st.sidebar.button("Profile next rerun"):
+        st.session_state['profile_next_run'] = True
+        st.rerun()
+    if 'last_profile' in st.session_state:
+        st.sidebar.caption("Last profile: " + ", ".join(st.session_state['last_profile'].values()))
+
+# Render a chart, from the pre-rendered copy when there is one (charts missing from a
+# view had no data when it was rendered)
+def show_chart(name):
+    if prerendered:
+        fig = pio.from_json(prerendered['figures'][name]) if name in prerendered['figures'] else None
+    else:
+        fig = build_figure(name, current_aggregates())
+    if fig is not None:
+        st.plotly_chart(fig, use_container_width=True)
+
+# Calculate key metrics
+kpis = prerendered['kpis'] if prerendered else current_aggregates()['kpis']
 
 # Create tabs for navigation
-tab_names = ["Overview", "Demographics", "Performance", "Attrition", "Compensation"]
+tab_names = ["Overview", "Demographics", "Performance", "Attrition", "Compensation", "Trends", "Compare"]
 tabs = st.tabs(tab_names)
 
 # Overview tab
@@ -276,26 +510,18 @@ with tabs[0]:
     st.subheader("Key Metrics")
     kpi_col1, kpi_col2, kpi_col3, kpi_col4 = st.columns(4)
     
-    # Calculate key metrics
-    total_employees = len(filtered_df)
-    active_employees = filtered_df[filtered_df['Attrition'] == 'No'].shape[0]
-    attrition_count = filtered_df[filtered_df['Attrition'] == 'Yes'].shape[0]
-    attrition_rate = round((attrition_count / total_employees) * 100, 1) if total_employees > 0 else 0
-    avg_performance = round(filtered_df['PerformanceRating'].mean(), 1)
-    avg_satisfaction = round(filtered_df['JobSatisfaction'].mean(), 1)
-    
     # Display KPIs
     with kpi_col1:
-        styled_card("Total Employees", f"{total_employees:,}", "👥")
+        styled_card("Total Employees", f"{kpis['total_employees']:,}", "👥")
     
     with kpi_col2:
-        styled_card("Active Employees", f"{active_employees:,}", "👤")
+        styled_card("Active Employees", f"{kpis['active_employees']:,}", "👤")
     
     with kpi_col3:
-        styled_card("Attrition Rate", f"{attrition_rate}%", "🔄")
+        styled_card("Attrition Rate", f"{kpis['attrition_rate']}%", "🔄")
     
     with kpi_col4:
-        styled_card("Avg Performance", f"{avg_performance}/5", "⭐")
+        styled_card("Avg Performance", f"{kpis['avg_performance']}/5", "⭐")
     
     # Department distribution and demographics
     st.markdown("---")
@@ -303,161 +529,26 @@ with tabs[0]:
     
     with col1:
         section_header("Department Distribution")
-        
-        # Department horizontal bar chart
-        dept_counts = filtered_df['Department'].value_counts().reset_index()
-        dept_counts.columns = ['Department', 'Count']
-        
-        # Sort by count descending
-        dept_counts = dept_counts.sort_values('Count', ascending=False)
-        
-        # Create colors list based on department
-        colors = [DEPARTMENT_COLORS.get(dept, PRIMARY_COLOR) for dept in dept_counts['Department']]
-        
-        fig = px.bar(
-            dept_counts,
-            x='Count',
-            y='Department',
-            orientation='h',
-            title='Employees by Department',
-            text='Count',
-            color='Department',
-            color_discrete_map=DEPARTMENT_COLORS
-        )
-        
-        fig.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color=TEXT_COLOR),
-            yaxis_title='',
-            xaxis_title='Number of Employees',
-            showlegend=False,
-            height=400
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart('department_distribution')
     
     with col2:
         section_header("Gender Distribution")
-        
-        # Gender donut chart
-        gender_counts = filtered_df['Gender'].value_counts().reset_index()
-        gender_counts.columns = ['Gender', 'Count']
-        
-        fig = px.pie(
-            gender_counts,
-            values='Count',
-            names='Gender',
-            title='Gender Breakdown',
-            hole=0.6,
-            color='Gender',
-            color_discrete_map=GENDER_COLORS
-        )
-        
-        fig.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color=TEXT_COLOR),
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=-0.1,
-                xanchor="center",
-                x=0.5
-            ),
-            height=400
-        )
-        
-        fig.update_traces(textinfo='percent+label')
-        
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart('gender_distribution')
     
     # Performance by department
     st.markdown("---")
     section_header("Performance by Department")
-    
-    # Calculate average performance by department
-    perf_by_dept = filtered_df.groupby('Department')['PerformanceRating'].mean().reset_index()
-    perf_by_dept = perf_by_dept.sort_values('PerformanceRating', ascending=False)
-    
-    # Create a color scale based on performance
-    fig = px.bar(
-        perf_by_dept,
-        x='Department',
-        y='PerformanceRating',
-        title='Average Performance Rating by Department',
-        color='PerformanceRating',
-        text=perf_by_dept['PerformanceRating'].round(1)
-    )
-    
-    fig.update_layout(
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(color=TEXT_COLOR),
-        xaxis_title='',
-        yaxis_title='Average Performance Rating (1-5)',
-        coloraxis_showscale=False
-    )
-    
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart('performance_by_department')
     
     # Salary distribution
     st.markdown("---")
     section_header("Salary Distribution")
-    
-    # Salary boxplot by department
-    fig = px.box(
-        filtered_df,
-        x='Department',
-        y='Salary',
-        color='Department',
-        title='Salary Distribution by Department',
-        color_discrete_map=DEPARTMENT_COLORS
-    )
-    
-    fig.update_layout(
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(color=TEXT_COLOR),
-        xaxis_title='',
-        yaxis_title='Salary ($)',
-        showlegend=False
-    )
-    
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart('salary_distribution')
     
     # Job satisfaction vs performance
     st.markdown("---")
     section_header("Job Satisfaction vs Performance")
-    
-    # Create scatter plot with performance colors
-    fig = px.scatter(
-        filtered_df,
-        x='JobSatisfaction',
-        y='PerformanceRating',
-        color='Department',
-        size='YearsAtCompany',
-        hover_data=['JobRole', 'Gender', 'Salary'],
-        color_discrete_map=DEPARTMENT_COLORS,
-        title='Relationship Between Job Satisfaction and Performance'
-    )
-    
-    fig.update_layout(
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(color=TEXT_COLOR),
-        xaxis_title='Job Satisfaction (1-4)',
-        yaxis_title='Performance Rating (1-5)',
-        legend=dict(
-            title='Department',
-            yanchor="top",
-            y=0.99,
-            xanchor="left",
-            x=0.01
-        )
-    )
-    
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart('satisfaction_vs_performance')
 
 # Demographics tab
 with tabs[1]:
@@ -468,104 +559,28 @@ with tabs[1]:
     
     with col1:
         section_header("Age Distribution")
-        
-        # Create age bins
-        bins = [20, 30, 40, 50, 60, 70]
-        labels = ['20-29', '30-39', '40-49', '50-59', '60+']
-        filtered_df['AgeGroup'] = pd.cut(filtered_df['Age'], bins=bins, labels=labels, right=False)
-        
-        # Count by age group and gender
-        age_gender = filtered_df.groupby(['AgeGroup', 'Gender']).size().unstack().fillna(0)
-        
-        # Create grouped bar chart
-        age_gender_melted = age_gender.reset_index().melt(id_vars='AgeGroup', value_vars=age_gender.columns, 
-                                                          var_name='Gender', value_name='Count')
-        
-        fig = px.bar(
-            age_gender_melted,
-            x='AgeGroup',
-            y='Count',
-            color='Gender',
-            title='Age Distribution by Gender',
-            barmode='group',
-            color_discrete_map=GENDER_COLORS
-        )
-        
-        fig.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color=TEXT_COLOR),
-            xaxis_title='Age Group',
-            yaxis_title='Number of Employees'
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart('age_distribution')
     
     with col2:
         section_header("Years of Service")
-        
-        # Create service bins
-        bins = [0, 2, 5, 10, 15, 30]
-        labels = ['0-2', '3-5', '6-10', '11-15', '16+']
-        filtered_df['ServiceGroup'] = pd.cut(filtered_df['YearsAtCompany'], bins=bins, labels=labels, right=False)
-        
-        # Count by service group
-        service_counts = filtered_df['ServiceGroup'].value_counts().reset_index()
-        service_counts.columns = ['Years of Service', 'Count']
-        
-        # Sort by years
-        service_counts['Years of Service'] = pd.Categorical(service_counts['Years of Service'], 
-                                                            categories=labels, ordered=True)
-        service_counts = service_counts.sort_values('Years of Service')
-        
-        fig = px.bar(
-            service_counts,
-            x='Years of Service',
-            y='Count',
-            title='Employee Tenure Distribution',
-            text='Count',
-            color_discrete_sequence=[PRIMARY_COLOR]
-        )
-        
-        fig.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color=TEXT_COLOR),
-            xaxis_title='',
-            yaxis_title='Number of Employees'
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart('tenure_distribution')
     
     # Job roles distribution
     st.markdown("---")
     section_header("Job Roles by Department")
+    show_chart('roles_by_department')
     
-    # Count by job role and department
-    role_dept = filtered_df.groupby(['Department', 'JobRole']).size().unstack().fillna(0)
-    role_dept_melted = role_dept.reset_index().melt(id_vars='Department', value_vars=role_dept.columns, 
-                                                   var_name='JobRole', value_name='Count')
-    
-    # Create stacked bar chart
-    fig = px.bar(
-        role_dept_melted,
-        x='Department',
-        y='Count',
-        color='JobRole',
-        title='Job Roles Distribution by Department',
-        color_discrete_sequence=px.colors.qualitative.Bold
-    )
+    # High-cardinality dimensions, shown as top values plus "Other"
+    st.markdown("---")
+    col1, col2 = st.columns(2)
     
-    fig.update_layout(
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(color=TEXT_COLOR),
-        xaxis_title='',
-        yaxis_title='Number of Employees',
-        legend=dict(title='Job Role')
-    )
+    with col1:
+        section_header("Locations")
+        show_chart('location_distribution')
     
-    st.plotly_chart(fig, use_container_width=True)
+    with col2:
+        section_header("Education")
+        show_chart('education_distribution')
 
 # Performance tab
 with tabs[2]:
@@ -576,115 +591,16 @@ with tabs[2]:
     
     with col1:
         section_header("Performance Rating Distribution")
-        
-        # Count by performance rating
-        perf_counts = filtered_df['PerformanceRating'].value_counts().reset_index()
-        perf_counts.columns = ['Rating', 'Count']
-        
-        # Add labels
-        perf_labels = {
-            1: "Poor", 
-            2: "Below Average", 
-            3: "Average", 
-            4: "Good", 
-            5: "Excellent"
-        }
-        perf_counts['Label'] = perf_counts['Rating'].map(perf_labels)
-        
-        # Sort by rating
-        perf_counts = perf_counts.sort_values('Rating')
-        
-        # Create bar chart with performance colors
-        colors = [PERFORMANCE_COLORS[rating] for rating in perf_counts['Rating']]
-        
-        fig = px.bar(
-            perf_counts,
-            x='Rating',
-            y='Count',
-            title='Performance Rating Distribution',
-            text='Count',
-            labels={'Rating': 'Performance Rating', 'Count': 'Number of Employees'}
-        )
-        
-        # Update bar colors
-        fig.update_traces(marker_color=colors)
-        
-        # Add annotations for labels
-        for i, row in perf_counts.iterrows():
-            fig.add_annotation(
-                x=row['Rating'],
-                y=row['Count'],
-                text=row['Label'],
-                showarrow=False,
-                yshift=10,
-                font=dict(color='white', size=10)
-            )
-        
-        fig.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color=TEXT_COLOR),
-            xaxis_title='Performance Rating',
-            yaxis_title='Number of Employees'
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart('performance_distribution')
     
     with col2:
         section_header("Performance by Job Role")
-        
-        # Calculate average performance by job role
-        perf_by_role = filtered_df.groupby('JobRole')['PerformanceRating'].mean().reset_index()
-        perf_by_role = perf_by_role.sort_values('PerformanceRating', ascending=False)
-        
-        # Create horizontal bar chart
-        fig = px.bar(
-            perf_by_role,
-            y='JobRole',
-            x='PerformanceRating',
-            orientation='h',
-            title='Average Performance Rating by Job Role',
-            text=perf_by_role['PerformanceRating'].round(1),
-            color='PerformanceRating'
-        )
-        
-        fig.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color=TEXT_COLOR),
-            xaxis_title='Average Performance Rating (1-5)',
-            yaxis_title='',
-            coloraxis_showscale=False
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart('performance_by_role')
     
     # Satisfaction vs Years at Company
     st.markdown("---")
     section_header("Job Satisfaction & Tenure")
-    
-    # Create scatter plot
-    fig = px.scatter(
-        filtered_df,
-        x='YearsAtCompany',
-        y='JobSatisfaction',
-        color='PerformanceRating',
-        size='Salary',
-        hover_data=['Department', 'JobRole', 'Gender'],
-        title='Job Satisfaction vs Years at Company'
-    )
-    
-    # Add trendline
-    fig.update_layout(
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(color=TEXT_COLOR),
-        xaxis_title='Years at Company',
-        yaxis_title='Job Satisfaction (1-4)',
-        coloraxis=dict(colorbar=dict(title='Performance Rating'))
-    )
-    
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart('satisfaction_vs_tenure')
 
 # Attrition tab
 with tabs[3]:
@@ -693,19 +609,14 @@ with tabs[3]:
     # Overview KPIs
     col1, col2, col3 = st.columns(3)
     
-    # Calculate attrition metrics
-    total_employees = len(filtered_df)
-    attrition_count = filtered_df[filtered_df['Attrition'] == 'Yes'].shape[0]
-    attrition_rate = round((attrition_count / total_employees) * 100, 1) if total_employees > 0 else 0
-    
     with col1:
-        styled_card("Attrition Rate", f"{attrition_rate}%", "🔄")
+        styled_card("Attrition Rate", f"{kpis['attrition_rate']}%", "🔄")
     
     with col2:
-        styled_card("Employees Left", f"{attrition_count:,}", "👋")
+        styled_card("Employees Left", f"{kpis['attrition_count']:,}", "👋")
     
     with col3:
-        styled_card("Retained", f"{total_employees - attrition_count:,}", "🏆")
+        styled_card("Retained", f"{kpis['total_employees'] - kpis['attrition_count']:,}", "🏆")
     
     # Attrition charts
     st.markdown("---")
@@ -713,77 +624,11 @@ with tabs[3]:
     
     with col1:
         section_header("Attrition by Department")
-        
-        # Calculate attrition by department
-        dept_attrition = filtered_df.groupby(['Department', 'Attrition']).size().unstack().fillna(0)
-        
-        if 'Yes' in dept_attrition.columns:
-            dept_attrition['Total'] = dept_attrition.sum(axis=1)
-            dept_attrition['AttritionRate'] = dept_attrition['Yes'] / dept_attrition['Total'] * 100
-            
-            # Sort by attrition rate
-            dept_attrition = dept_attrition.sort_values('AttritionRate', ascending=False)
-            
-            # Create bar chart
-            dept_attrition_df = dept_attrition.reset_index()
-            
-            colors = [DEPARTMENT_COLORS.get(dept, PRIMARY_COLOR) for dept in dept_attrition_df['Department']]
-            
-            fig = px.bar(
-                dept_attrition_df,
-                x='Department',
-                y='AttritionRate',
-                title='Attrition Rate by Department (%)',
-                text=dept_attrition_df['AttritionRate'].round(1).astype(str) + '%',
-                color='Department',
-                color_discrete_map=DEPARTMENT_COLORS
-            )
-            
-            fig.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color=TEXT_COLOR),
-                xaxis_title='',
-                yaxis_title='Attrition Rate (%)',
-                showlegend=False
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+        show_chart('attrition_by_department')
     
     with col2:
         section_header("Attrition by Job Role")
-        
-        # Calculate attrition by job role
-        role_attrition = filtered_df.groupby(['JobRole', 'Attrition']).size().unstack().fillna(0)
-        
-        if 'Yes' in role_attrition.columns:
-            role_attrition['Total'] = role_attrition.sum(axis=1)
-            role_attrition['AttritionRate'] = role_attrition['Yes'] / role_attrition['Total'] * 100
-            
-            # Sort by attrition rate
-            role_attrition = role_attrition.sort_values('AttritionRate', ascending=False)
-            
-            # Create bar chart
-            role_attrition_df = role_attrition.reset_index()
-            
-            fig = px.bar(
-                role_attrition_df,
-                x='JobRole',
-                y='AttritionRate',
-                title='Attrition Rate by Job Role (%)',
-                text=role_attrition_df['AttritionRate'].round(1).astype(str) + '%',
-                color_discrete_sequence=[PRIMARY_COLOR]
-            )
-            
-            fig.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color=TEXT_COLOR),
-                xaxis_title='',
-                yaxis_title='Attrition Rate (%)'
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+        show_chart('attrition_by_role')
     
     # Attrition by satisfaction and performance
     st.markdown("---")
@@ -792,107 +637,78 @@ with tabs[3]:
     col1, col2 = st.columns(2)
     
     with col1:
-        # Attrition by job satisfaction
-        att_by_sat = filtered_df.groupby(['JobSatisfaction', 'Attrition']).size().unstack().fillna(0)
-        
-        if 'Yes' in att_by_sat.columns:
-            att_by_sat['Total'] = att_by_sat.sum(axis=1)
-            att_by_sat['AttritionRate'] = att_by_sat['Yes'] / att_by_sat['Total'] * 100
-            
-            # Create line chart
-            att_by_sat_df = att_by_sat.reset_index()
-            
-            fig = px.line(
-                att_by_sat_df,
-                x='JobSatisfaction',
-                y='AttritionRate',
-                title='Attrition Rate by Job Satisfaction',
-                markers=True,
-                color_discrete_sequence=[HIGHLIGHT_COLOR]
-            )
-            
-            # Add annotations
-            for i, row in att_by_sat_df.iterrows():
-                fig.add_annotation(
-                    x=row['JobSatisfaction'],
-                    y=row['AttritionRate'],
-                    text=f"{row['AttritionRate']:.1f}%",
-                    showarrow=False,
-                    yshift=10,
-                    font=dict(color=TEXT_COLOR)
-                )
-            
-            fig.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color=TEXT_COLOR),
-                xaxis_title='Job Satisfaction (1-4)',
-                yaxis_title='Attrition Rate (%)'
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+        show_chart('attrition_by_satisfaction')
     
     with col2:
-        # Attrition by performance
-        att_by_perf = filtered_df.groupby(['PerformanceRating', 'Attrition']).size().unstack().fillna(0)
+        show_chart('attrition_by_performance')
+    
+    # What-if simulation over the current selection
+    st.markdown("---")
+    section_header("What-if Simulation")
+    
+    with st.form("what_if"):
+        sim_col1, sim_col2, sim_col3 = st.columns(3)
+        
+        with sim_col1:
+            salary_below = st.number_input("Raise salaries below ($)", value=50000, step=5000)
+            salary_raise = st.number_input("Raise amount ($)", value=0, step=1000)
+        
+        with sim_col2:
+            satisfaction_delta = st.slider("Satisfaction change (points)", -3, 3, 0)
+            sim_departments = st.multiselect("Only in departments", options=department_filter)
         
-        if 'Yes' in att_by_perf.columns:
-            att_by_perf['Total'] = att_by_perf.sum(axis=1)
-            att_by_perf['AttritionRate'] = att_by_perf['Yes'] / att_by_perf['Total'] * 100
-            
-            # Create line chart
-            att_by_perf_df = att_by_perf.reset_index()
-            
-            fig = px.line(
-                att_by_perf_df,
-                x='PerformanceRating',
-                y='AttritionRate',
-                title='Attrition Rate by Performance Rating',
-                markers=True,
-                color_discrete_sequence=[HIGHLIGHT_COLOR]
-            )
-            
-            # Add annotations
-            for i, row in att_by_perf_df.iterrows():
-                fig.add_annotation(
-                    x=row['PerformanceRating'],
-                    y=row['AttritionRate'],
-                    text=f"{row['AttritionRate']:.1f}%",
-                    showarrow=False,
-                    yshift=10,
-                    font=dict(color=TEXT_COLOR)
-                )
-            
-            fig.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color=TEXT_COLOR),
-                xaxis_title='Performance Rating (1-5)',
-                yaxis_title='Attrition Rate (%)'
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+        with sim_col3:
+            n_draws = st.select_slider("Monte Carlo draws", options=[500, 1000, 2000, 5000], value=2000)
+            run_simulation = st.form_submit_button("Run simulation")
+    
+    if run_simulation:
+        st.session_state['what_if'] = what_if(backend.filtered(current_filters), {
+            'departments': sim_departments,
+            'salary_below': salary_below,
+            'salary_raise': salary_raise,
+            'satisfaction_delta': satisfaction_delta
+        }, n_draws=n_draws)
+    
+    result = st.session_state.get('what_if')
+    if result:
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            styled_card("Expected Attrition", f"{result['baseline_rate']:.1f}%", "📉")
+        
+        with col2:
+            styled_card("With Scenario", f"{result['scenario_rate']:.1f}%", "🧪")
+        
+        with col3:
+            low, high = result['prevented_interval']
+            styled_card("Leavers Prevented", f"{result['prevented_mean']:.1f}", "🛡️")
+        
+        st.caption(
+            f"{result['affected']:,} of {result['employees']:,} employees affected. "
+            f"90% of simulations prevent between {low:.0f} and {high:.0f} departures."
+        )
 
 # Compensation tab
 with tabs[4]:
     st.subheader("Compensation Analysis")
     
-    # Overview KPIs
-    col1, col2, col3 = st.columns(3)
-    
-    # Calculate salary metrics
-    avg_salary = int(filtered_df['Salary'].mean())
-    median_salary = int(filtered_df['Salary'].median())
-    salary_range = f"${int(filtered_df['Salary'].min()):,} - ${int(filtered_df['Salary'].max()):,}"
-    
-    with col1:
-        styled_card("Average Salary", f"${avg_salary:,}", "💰")
-    
-    with col2:
-        styled_card("Median Salary", f"${median_salary:,}", "📊")
+    # Calculate salary metrics (None when the selection is empty)
+    salary_summary = prerendered['salary_summary'] if prerendered else current_aggregates()['salary_summary']
     
-    with col3:
-        styled_card("Salary Range", salary_range, "📈")
+    if salary_summary is None:
+        st.info("No employees match the current filters, so there are no salaries to summarize.")
+    else:
+        # Overview KPIs
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            styled_card("Average Salary", f"${salary_summary['avg_salary']:,}", "💰")
+        
+        with col2:
+            styled_card("Median Salary", f"${salary_summary['median_salary']:,}", "📊")
+        
+        with col3:
+            styled_card("Salary Range", f"${salary_summary['min_salary']:,} - ${salary_summary['max_salary']:,}", "📈")
     
     # Salary by department and job role
     st.markdown("---")
@@ -900,57 +716,11 @@ with tabs[4]:
     
     with col1:
         section_header("Salary by Department")
-        
-        # Calculate average salary by department
-        dept_salary = filtered_df.groupby('Department')['Salary'].mean().reset_index()
-        dept_salary = dept_salary.sort_values('Salary', ascending=False)
-        
-        fig = px.bar(
-            dept_salary,
-            x='Department',
-            y='Salary',
-            title='Average Salary by Department',
-            text=dept_salary['Salary'].apply(lambda x: f"${int(x):,}"),
-            color='Department',
-            color_discrete_map=DEPARTMENT_COLORS
-        )
-        
-        fig.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color=TEXT_COLOR),
-            xaxis_title='',
-            yaxis_title='Average Salary ($)',
-            showlegend=False
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart('salary_by_department')
     
     with col2:
         section_header("Salary by Job Role")
-        
-        # Calculate average salary by job role
-        role_salary = filtered_df.groupby('JobRole')['Salary'].mean().reset_index()
-        role_salary = role_salary.sort_values('Salary', ascending=False)
-        
-        fig = px.bar(
-            role_salary,
-            x='JobRole',
-            y='Salary',
-            title='Average Salary by Job Role',
-            text=role_salary['Salary'].apply(lambda x: f"${int(x):,}"),
-            color_discrete_sequence=[PRIMARY_COLOR]
-        )
-        
-        fig.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color=TEXT_COLOR),
-            xaxis_title='',
-            yaxis_title='Average Salary ($)'
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart('salary_by_role')
     
     # Salary correlation
     st.markdown("---")
@@ -959,75 +729,218 @@ with tabs[4]:
     col1, col2 = st.columns(2)
     
     with col1:
-        # Salary vs Years at Company
-        fig = px.scatter(
-            filtered_df,
-            x='YearsAtCompany',
-            y='Salary',
-            color='Department',
-            size='PerformanceRating',
-            hover_data=['JobRole', 'Gender', 'Age'],
-            title='Salary vs Years at Company',
-            color_discrete_map=DEPARTMENT_COLORS
-        )
-        
-        fig.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color=TEXT_COLOR),
-            xaxis_title='Years at Company',
-            yaxis_title='Salary ($)'
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart('salary_vs_tenure')
     
     with col2:
-        # Salary vs Performance
-        fig = px.box(
-            filtered_df,
-            x='PerformanceRating',
-            y='Salary',
-            color='PerformanceRating',
-            title='Salary Distribution by Performance Rating'
-        )
-        
-        fig.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color=TEXT_COLOR),
-            xaxis_title='Performance Rating',
-            yaxis_title='Salary ($)',
-            showlegend=False
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart('salary_by_performance')
     
     # Gender pay gap
     st.markdown("---")
     section_header("Gender Pay Analysis")
-    
-    # Calculate average salary by department and gender
-    gender_dept_salary = filtered_df.groupby(['Department', 'Gender'])['Salary'].mean().reset_index()
-    
-    fig = px.bar(
-        gender_dept_salary,
-        x='Department',
-        y='Salary',
-        color='Gender',
-        barmode='group',
-        title='Average Salary by Department and Gender',
-        color_discrete_map=GENDER_COLORS
+    show_chart('gender_pay')
+    
+    # Regression-adjusted gap, combined from per-cell statistics for the current filters
+    # Cells only cover the core filters, so other selections are summarized from their own rows
+    if set(current_filters) - set(CELL_COLUMNS):
+        gap_table = pay_gap_table(build_pay_cells(backend.filtered(current_filters)), {})
+    else:
+        gap_table = pay_gap_table(load_pay_cells(tenant, hr_data.DATA_SOURCE, sample_size, df), current_filters)
+    
+    if gap_table.empty:
+        st.info("The current selection needs both genders to estimate a pay gap.")
+    else:
+        st.plotly_chart(charts.adjusted_pay_gap(gap_table), use_container_width=True)
+        st.caption("Salary regressed on gender, controlling for department, job role, tenure and performance.")
+        st.dataframe(
+            gap_table[['Department', 'employees', 'raw_gap', 'adjusted_gap', 'ci_low', 'ci_high', 'adjusted_gap_pct']].rename(columns={
+                'employees': 'Employees',
+                'raw_gap': 'Raw Gap ($)',
+                'adjusted_gap': 'Adjusted Gap ($)',
+                'ci_low': '95% CI Low',
+                'ci_high': '95% CI High',
+                'adjusted_gap_pct': 'Adjusted Gap (%)'
+            }).round(1),
+            use_container_width=True,
+            hide_index=True
+        )
+
+# Trends tab
+with tabs[5]:
+    st.subheader("Headcount & Attrition Trends")
+    
+    # Trends read only from the monthly rollups, never from row-level history
+    rollups = load_trend_rollups(tenant, hr_data.DATA_SOURCE, sample_size, df)
+    rollups = rollups[rollups['Department'].isin(department_filter)]
+    st.caption("Trends are rolled up by month and department, so only the Department filter applies here.")
+    
+    # Company-wide totals per month
+    monthly = rollups.groupby('Month')[['Headcount', 'Hires', 'Leavers']].sum().reset_index()
+    monthly['AttritionRate'] = np.where(
+        monthly['Headcount'] > 0, monthly['Leavers'] / monthly['Headcount'] * 100, 0
     )
     
-    fig.update_layout(
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(color=TEXT_COLOR),
-        xaxis_title='',
-        yaxis_title='Average Salary ($)'
+    # Last full quarter of leavers against average headcount
+    last_quarter = monthly.tail(3)
+    quarter_headcount = last_quarter['Headcount'].mean() if len(last_quarter) else 0
+    quarter_leavers = int(last_quarter['Leavers'].sum())
+    quarter_rate = round(quarter_leavers / quarter_headcount * 100, 1) if quarter_headcount > 0 else 0
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        styled_card("Current Headcount", f"{int(monthly['Headcount'].iloc[-1]) if len(monthly) else 0:,}", "👥")
+    
+    with col2:
+        styled_card("Leavers Last Quarter", f"{quarter_leavers:,}", "👋")
+    
+    with col3:
+        styled_card("Attrition Last Quarter", f"{quarter_rate}%", "🔄")
+    
+    st.markdown("---")
+    section_header("Headcount by Department")
+    st.plotly_chart(charts.headcount_trend(rollups), use_container_width=True)
+    
+    st.markdown("---")
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        section_header("Monthly Attrition Rate")
+        st.plotly_chart(charts.attrition_trend(monthly), use_container_width=True)
+    
+    with col2:
+        section_header("Hires vs Leavers")
+        st.plotly_chart(charts.hires_vs_leavers(monthly), use_container_width=True)
+
+# Compare tab
+with tabs[6]:
+    st.subheader("Segment Comparison")
+    st.caption("Each segment has its own filters; the sidebar filters don't apply here.")
+    
+    n_segments = st.number_input("Segments", min_value=2, max_value=MAX_SEGMENTS, value=2)
+    segment_columns = st.columns(int(n_segments))
+    # One department per segment by default; segments beyond the tenant's departments start empty
+    default_departments = [[name] for name in options['Department'][:MAX_SEGMENTS]]
+    
+    # Collect each segment's name and filters
+    segments = {}
+    for index, column in enumerate(segment_columns):
+        with column:
+            name = st.text_input("Name", value=f"Segment {index + 1}", key=f"segment_name_{index}")
+            segment_filters = {
+                'Department': st.multiselect("Department", options['Department'],
+                                             default=default_departments[index] if index < len(default_departments) else [],
+                                             key=f"segment_department_{index}"),
+                'JobRole': st.multiselect("Job Role", options['JobRole'],
+                                          default=options['JobRole'], key=f"segment_role_{index}"),
+                'Gender': st.multiselect("Gender", options['Gender'],
+                                         default=options['Gender'], key=f"segment_gender_{index}")
+            }
+            # Segment names must be unique, so repeats get their position appended
+            segments[name if name not in segments else f"{name} ({index + 1})"] = segment_filters
+    
+    # One stacked pass computes every segment's KPIs and breakdowns
+    segment_kpis, segment_tables = compare_segments(df, segments)
+    
+    st.markdown("---")
+    section_header("Key Metrics by Segment")
+    st.dataframe(
+        segment_kpis.round(1).rename(columns={
+            'AttritionRate': 'Attrition Rate (%)',
+            'AvgPerformance': 'Avg Performance',
+            'AvgSatisfaction': 'Avg Satisfaction',
+            'AvgSalary': 'Avg Salary ($)'
+        }),
+        use_container_width=True,
+        hide_index=True
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    st.markdown("---")
+    section_header("Breakdown")
+    
+    compare_col1, compare_col2 = st.columns(2)
+    with compare_col1:
+        compare_dimension = st.selectbox("Dimension", list(segment_tables), index=1)
+    with compare_col2:
+        metric_labels = {
+            'Employees': 'Employees',
+            'AttritionRate': 'Attrition Rate (%)',
+            'AvgSalary': 'Average Salary ($)',
+            'AvgPerformance': 'Average Performance'
+        }
+        compare_metric = st.selectbox("Metric", list(metric_labels), format_func=metric_labels.get, index=1)
+    
+    st.plotly_chart(
+        charts.segment_comparison(segment_tables[compare_dimension], compare_dimension,
+                                  compare_metric, metric_labels[compare_metric]),
+        use_container_width=True
+    )
+
+# Drill-down table, fetched one page at a time
+st.markdown("---")
+section_header("Employee Drill-down")
+
+drill_col1, drill_col2, drill_col3, drill_col4 = st.columns(4)
+
+with drill_col1:
+    drill_dimension = st.selectbox(
+        "Chart category",
+        ["Current filters", "Department", "JobRole", "Gender", "PerformanceRating", "JobSatisfaction", "Attrition"]
+    )
+
+# Drill values come from the selected filter values, so no rows are fetched to list them
+drill_filters = dict(current_filters)
+drill_values = {**current_filters, 'JobSatisfaction': [1, 2, 3, 4], 'Attrition': ['No', 'Yes']}
+with drill_col2:
+    if drill_dimension != "Current filters":
+        drill_value = st.selectbox("Value", sorted(drill_values[drill_dimension]))
+        drill_filters[drill_dimension] = [drill_value]
+
+with drill_col3:
+    drill_sort = st.selectbox("Sort by", SORT_COLUMNS, index=SORT_COLUMNS.index('Salary'))
+
+with drill_col4:
+    drill_descending = st.checkbox("Descending", value=True)
+
+# Start from the first page whenever the selection or sort changes
+drill_state = repr((tenant, sorted(drill_filters.items()), drill_sort, drill_descending))
+if st.session_state.get('drill_state') != drill_state:
+    st.session_state['drill_state'] = drill_state
+    st.session_state['drill_page'] = 0
+    st.session_state['drill_keys'] = [None]
+
+page_size = 50
+drill_page = st.session_state['drill_page']
+
+if hr_data.DATA_SOURCE == "postgres":
+    # Keyset pagination: remember the key that starts each visited page
+    from database import get_employee_page, count_employees
+    drill_keys = st.session_state['drill_keys']
+    page_df, next_key = get_employee_page(
+        drill_filters, drill_sort, drill_descending, drill_keys[drill_page], page_size
+    )
+    page_df = hr_data.from_database_frame(page_df)[hr_data.DRILL_DOWN_COLUMNS]
+    if next_key is not None and len(drill_keys) == drill_page + 1:
+        drill_keys.append(next_key)
+    drill_total = count_employees(drill_filters)
+    has_next_page = next_key is not None
+else:
+    order = load_sort_order(tenant, hr_data.DATA_SOURCE, sample_size, drill_sort, df)
+    page_df, drill_total = get_page(df, order, drill_filters, drill_page, page_size, drill_descending)
+    has_next_page = (drill_page + 1) * page_size < drill_total
+
+st.dataframe(page_df, use_container_width=True, hide_index=True)
+
+nav_col1, nav_col2, nav_col3 = st.columns([1, 4, 1])
+
+with nav_col1:
+    st.button("Previous", on_click=change_drill_page, args=(-1,), disabled=drill_page == 0)
+
+with nav_col2:
+    first_row = drill_page * page_size + 1 if drill_total else 0
+    st.caption(f"Rows {first_row:,}-{drill_page * page_size + len(page_df):,} of {drill_total:,}")
+
+with nav_col3:
+    st.button("Next", on_click=change_drill_page, args=(1,), disabled=not has_next_page)
 
 # Footer
 st.markdown("---")
@@ -1038,4 +951,10 @@ st.markdown(
     </div>
     """, 
     unsafe_allow_html=True
-)
\ No newline at end of file
+)
+
+# Finish a profile capture started at the top of this run
+if run_profiler:
+    del st.session_state['active_profiler']
+    st.session_state['last_profile'] = run_profiler.stop()
+    st.toast(f"Profile saved to {PROFILES_DIR}/")
@@ -0,0 +1,146 @@
+import os
+import sys
+import time
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Memory shared by every tenant's frames, cubes and figures in this process
+MEMORY_BUDGET_MB = float(os.getenv("HR_TENANT_CACHE_MB", "512"))
+
+# Approximate in-memory size of a cached value
+def estimate_size(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(value, pd.DataFrame) else usage)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (str, bytes)):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if hasattr(value, "to_json"):
+        return len(value.to_json())
+    return sys.getsizeof(value)
+
+# Per-tenant LRU caches under one memory budget. When the budget is exceeded the
+# least recently used tenants are evicted whole; the tenant being served only
+# loses its own oldest entries.
+class TenantCache:
+    def __init__(self, budget_bytes=int(MEMORY_BUDGET_MB * 1024 * 1024)):
+        self.budget_bytes = budget_bytes
+        self._tenants = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _tenant(self, tenant):
+        state = self._tenants.get(tenant)
+        if state is None:
+            state = self._tenants[tenant] = {
+                'entries': OrderedDict(), 'bytes': 0, 'hits': 0, 'misses': 0, 'evictions': 0, 'last_used': 0.0
+            }
+        self._tenants.move_to_end(tenant)
+        state['last_used'] = time.time()
+        return state
+
+    def total_bytes(self):
+        with self._lock:
+            return sum(state['bytes'] for state in self._tenants.values())
+
+    # Return the cached value for (tenant, key), building and storing it on a miss
+    def get_or_build(self, tenant, key, build):
+        with self._lock:
+            state = self._tenant(tenant)
+            if key in state['entries']:
+                state['entries'].move_to_end(key)
+                state['hits'] += 1
+                return state['entries'][key][0]
+            state['misses'] += 1
+
+        # Build outside the lock so one slow tenant doesn't block the others
+        value = build()
+        self.put(tenant, key, value)
+        return value
+
+    # Cached value without building it; returns (found, value)
+    def peek(self, tenant, key):
+        with self._lock:
+            state = self._tenants.get(tenant)
+            if state is None or key not in state['entries']:
+                return False, None
+            return True, state['entries'][key][0]
+
+    def put(self, tenant, key, value):
+        size = estimate_size(value)
+        with self._lock:
+            state = self._tenant(tenant)
+            previous = state['entries'].pop(key, None)
+            if previous is not None:
+                state['bytes'] -= previous[1]
+            state['entries'][key] = (value, size)
+            state['bytes'] += size
+            self._enforce_budget(tenant)
+
+    def _enforce_budget(self, active_tenant):
+        total = sum(state['bytes'] for state in self._tenants.values())
+
+        # Whole idle tenants go first, least recently used first
+        for tenant in list(self._tenants):
+            if total <= self.budget_bytes:
+                return
+            if tenant == active_tenant:
+                continue
+            state = self._tenants.pop(tenant)
+            total -= state['bytes']
+
+        # Then the active tenant's oldest entries, always keeping the newest one
+        state = self._tenants[active_tenant]
+        while total > self.budget_bytes and len(state['entries']) > 1:
+            _, (_, size) = state['entries'].popitem(last=False)
+            state['bytes'] -= size
+            state['evictions'] += 1
+            total -= size
+
+    # Drop everything cached for one tenant (or every tenant)
+    def invalidate(self, tenant=None):
+        with self._lock:
+            if tenant is None:
+                self._tenants.clear()
+            else:
+                self._tenants.pop(tenant, None)
+
+    # Replace everything cached for a tenant with `entries`, keeping its statistics
+    def replace(self, tenant, entries):
+        with self._lock:
+            state = self._tenant(tenant)
+            state['entries'].clear()
+            state['bytes'] = 0
+            for key, value in entries.items():
+                size = estimate_size(value)
+                state['entries'][key] = (value, size)
+                state['bytes'] += size
+            self._enforce_budget(tenant)
+
+    # Per-tenant cache sizes and hit rates for the admin view
+    def stats(self):
+        with self._lock:
+            rows = []
+            for tenant, state in self._tenants.items():
+                lookups = state['hits'] + state['misses']
+                rows.append({
+                    'tenant': tenant,
+                    'entries': len(state['entries']),
+                    'size_mb': state['bytes'] / (1024 * 1024),
+                    'hits': state['hits'],
+                    'misses': state['misses'],
+                    'hit_rate': state['hits'] / lookups if lookups else 0.0,
+                    'evicted_entries': state['evictions'],
+                    'last_used': pd.Timestamp(state['last_used'], unit='s')
+                })
+            return pd.DataFrame(rows)
+
+# Shared by every session in the server process
+tenant_cache = TenantCache()
@@ -0,0 +1,63 @@
+import os
+import hmac
+import tomllib
+import contextvars
+from contextlib import contextmanager
+
+# Tenant definitions live next to config.toml; without the file there is one default tenant
+TENANTS_PATH = os.getenv("HR_TENANTS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "tenants.toml"))
+DEFAULT_TENANT = "default"
+
+# Read [tenants.<name>] tables: schema, database, sample_size, viewers and token_env are all optional
+def load_tenants(path=TENANTS_PATH):
+    if not os.path.exists(path):
+        return {DEFAULT_TENANT: {}}
+    with open(path, "rb") as tenants_file:
+        tenants = tomllib.load(tenants_file).get("tenants", {})
+    return tenants or {DEFAULT_TENANT: {}}
+
+TENANTS = load_tenants()
+
+# Tenant of the session running on this thread
+_current_tenant = contextvars.ContextVar("tenant", default=next(iter(TENANTS)))
+
+def current_tenant():
+    return _current_tenant.get()
+
+def set_current_tenant(name):
+    if name not in TENANTS:
+        raise ValueError(f"Unknown tenant: {name}")
+    _current_tenant.set(name)
+
+# Settings of a tenant (the current one by default)
+def tenant_settings(name=None):
+    return TENANTS[name or current_tenant()]
+
+# Run a block on behalf of another tenant
+@contextmanager
+def use_tenant(name):
+    if name not in TENANTS:
+        raise ValueError(f"Unknown tenant: {name}")
+    token = _current_tenant.set(name)
+    try:
+        yield
+    finally:
+        _current_tenant.reset(token)
+
+# Tenants a viewer may open. A tenant lists the signed-in emails allowed to see it in
+# `viewers` ("*" for everyone) and/or names an environment variable in `token_env`
+# whose value unlocks it through ?token=. Admins see every tenant; a deployment without
+# tenants.toml keeps its single default tenant open.
+def allowed_tenants(email=None, token=None, admin=False):
+    if admin or list(TENANTS) == [DEFAULT_TENANT] and not TENANTS[DEFAULT_TENANT]:
+        return list(TENANTS)
+    email = (email or "").casefold()
+    allowed = []
+    for name, settings in TENANTS.items():
+        viewers = [viewer.casefold() for viewer in settings.get('viewers', [])]
+        secret = os.getenv(settings['token_env']) if settings.get('token_env') else None
+        if "*" in viewers or (email and email in viewers) or (
+            secret and token and hmac.compare_digest(token, secret)
+        ):
+            allowed.append(name)
+    return allowed
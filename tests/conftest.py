@@ -0,0 +1,56 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Port of the throwaway server (it listens on a unix socket only)
+TEST_PG_PORT = int(os.getenv("HR_TEST_PG_PORT", "54329"))
+
+# One temporary Postgres per test session; tests needing it are skipped when the server
+# binaries or the database driver aren't installed
+@pytest.fixture(scope="session")
+def postgres():
+    pytest.importorskip("psycopg2")
+    pytest.importorskip("pandas")
+    from pg_temp import TemporaryPostgres, find_binary
+    try:
+        find_binary("initdb")
+    except FileNotFoundError as error:
+        pytest.skip(str(error))
+
+    with TemporaryPostgres(port=TEST_PG_PORT) as server:
+        server.export_environment()
+        yield server
+
+# database.py pointed at the temporary server, with the schema created and the
+# employees table emptied before each test
+@pytest.fixture
+def database(postgres):
+    import database
+
+    # Connection settings are read at import time, which may predate the fixture
+    for attribute, variable in [
+        ('DB_HOST', 'PGHOST'), ('DB_PORT', 'PGPORT'), ('DB_USER', 'PGUSER'),
+        ('DB_NAME', 'PGDATABASE'), ('DB_PASSWORD', 'PGPASSWORD')
+    ]:
+        setattr(database, attribute, postgres.environment[variable])
+
+    database.init_database()
+    conn = database.get_connection()
+    cursor = conn.cursor()
+    cursor.execute("TRUNCATE employees, org_closure RESTART IDENTITY")
+    conn.commit()
+    cursor.close()
+    conn.close()
+    database.query_cache.invalidate()
+    return database
+
+# Seeded sample employees, small enough to load in every test
+@pytest.fixture
+def sample():
+    pytest.importorskip("pandas")
+    import hr_data
+    return hr_data.create_sample_data(200)
@@ -0,0 +1,36 @@
+import json
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from alerts import AlertEngine
+
+RULE = {'name': 'low_performance', 'dimension': 'Department', 'metric': 'avg_performance',
+        'below': 3.0, 'min_employees': 2}
+
+def _employees(ratings):
+    return pd.DataFrame({
+        'EmployeeID': range(1, len(ratings) + 1),
+        'Department': ['Sales'] * len(ratings),
+        'Attrition': ['No'] * len(ratings),
+        'PerformanceRating': pd.array(ratings, dtype='Int64')
+    })
+
+# Unrated employees are left out of the average instead of breaking the counters
+def test_unrated_employees_are_left_out_of_the_average(tmp_path):
+    log_path = str(tmp_path / "alerts.jsonl")
+    engine = AlertEngine([RULE], log_path)
+    assert engine.reload('default', _employees([2, 2, None])) != []
+
+    # Rating the third employee 5 brings the average to 3 and resolves the alert
+    records = engine.changed('default', [3], _employees([2, 2, 5]).iloc[[2]])
+    assert [record['status'] for record in records] == ['resolved']
+    assert records[0]['value'] == 3.0
+
+    # Clearing the rating again goes back to the two rated employees
+    records = engine.changed('default', [3], _employees([2, 2, None]).iloc[[2]])
+    assert [(record['status'], record['value']) for record in records] == [('fired', 2.0)]
+
+    with open(log_path, encoding="utf-8") as log_file:
+        assert [json.loads(line)['status'] for line in log_file] == ['fired', 'resolved', 'fired']
@@ -0,0 +1,42 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("duckdb")
+pytest.importorskip("pyarrow")
+
+import hr_data
+from backends import DuckDBBackend, PandasBackend
+
+# Row order, index and dtypes differ by engine (integer against float columns, bands as
+# categoricals against text, object columns for an empty selection); values must not
+def _normalized(frame):
+    frame = frame.copy()
+    for column in frame.columns:
+        try:
+            frame[column] = frame[column].astype(float)
+        except (TypeError, ValueError):
+            frame[column] = frame[column].astype(str)
+    frame.columns = [str(column) for column in frame.columns]
+    return frame.sort_values(sorted(frame.columns)).reset_index(drop=True)
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {'Department': ['Sales', 'IT'], 'Gender': ['Female']},
+    {'Department': []}
+], ids=["everyone", "subset", "empty"])
+def test_duckdb_aggregates_match_pandas(sample, filters):
+    df = hr_data.encode_dimensions(sample)
+    expected = PandasBackend(df).aggregates(filters)
+    actual = DuckDBBackend(df).aggregates(filters)
+
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        if key == 'scatter_sample':
+            # Each engine draws its own sample; only the size is shared
+            assert len(actual[key]) == len(value)
+        elif isinstance(value, pd.DataFrame):
+            pd.testing.assert_frame_equal(_normalized(actual[key]), _normalized(value), check_like=True)
+        elif key == 'kpis':
+            assert actual[key] == pytest.approx(value, nan_ok=True), key
+        else:
+            assert actual[key] == value, key
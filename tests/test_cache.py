@@ -0,0 +1,35 @@
+from cache import QueryCache, normalize_sql
+
+def test_normalize_sql_ignores_whitespace_and_semicolons():
+    assert normalize_sql("SELECT *\n  FROM employees ;") == "SELECT * FROM employees"
+
+def test_key_changes_with_table_versions():
+    cache = QueryCache()
+    assert cache.make_key("SELECT 1", None, {'employees': 1}) != cache.make_key("SELECT 1", None, {'employees': 2})
+
+def test_memory_tier_is_lru_bounded():
+    cache = QueryCache(max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+    assert cache.get('b') == (False, None)
+    assert cache.get('a') == (True, 1)
+
+def test_disk_tier_survives_restarts_and_evicts_least_recently_used(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = QueryCache(max_entries=1, disk_path=path, max_disk_entries=3)
+    for key in 'abcd':
+        cache.put(key, key.upper())
+    assert cache.stats()['disk_entries'] == 3
+
+    restarted = QueryCache(max_entries=1, disk_path=path, max_disk_entries=3)
+    assert restarted.get('a') == (False, None)
+    assert restarted.get('d') == (True, 'D')
+    assert restarted.stats()['disk_hits'] == 1
+
+def test_invalidate_clears_both_tiers(tmp_path):
+    cache = QueryCache(disk_path=str(tmp_path / "cache.sqlite"))
+    cache.put('a', 1)
+    cache.invalidate()
+    assert cache.get('a') == (False, None)
@@ -0,0 +1,122 @@
+import pytest
+
+def test_init_database_runs_every_step_and_round_trips(database, sample):
+    timings = database.init_database(sample)
+    assert list(timings) == [
+        'create_tables', 'create_org_closure_triggers', 'create_change_notifications',
+        'create_history_tables', 'populate_sample_data'
+    ]
+
+    employees = database.get_all_employees()
+    assert len(employees) == len(sample)
+    assert employees['Salary'].sum() == sample['Salary'].sum()
+    assert employees['Department'].value_counts().sort_index().equals(sample['Department'].value_counts().sort_index())
+
+def test_init_database_is_idempotent(database, sample):
+    database.init_database(sample)
+    database.init_database(sample)
+    assert len(database.get_all_employees()) == len(sample)
+
+def test_init_database_reports_the_failing_step(database, monkeypatch):
+    monkeypatch.setattr(database, 'DB_PORT', str(int(database.DB_PORT) + 1))
+    with pytest.raises(database.DatabaseInitError) as error:
+        database.init_database()
+    assert error.value.step == 'create_tables'
+    assert error.value.completed == {}
+
+@pytest.mark.parametrize("sort_by, descending", [('id', False), ('salary', False), ('salary', True), ('age', True)])
+def test_keyset_paging_returns_every_row_once_in_order(database, sample, sort_by, descending):
+    database.init_database(sample)
+
+    pages, after = [], None
+    while True:
+        page, after = database.get_employee_page(sort_by=sort_by, descending=descending, after=after, page_size=37)
+        pages.append(page)
+        if after is None:
+            break
+
+    ids = [employee_id for page in pages for employee_id in page['ID']]
+    assert sorted(ids) == list(range(1, len(sample) + 1))
+
+    column = database.COLUMN_MAPPING[sort_by]
+    keys = [key for page in pages for key in zip(page[column], page['ID'])]
+    assert keys == sorted(keys, reverse=descending)
+
+def test_keyset_paging_applies_filters(database, sample):
+    database.init_database(sample)
+    page, after = database.get_employee_page({'Department': ['Sales']}, page_size=1000)
+    assert after is None
+    assert len(page) == (sample['Department'] == 'Sales').sum()
+    assert set(page['Department']) == {'Sales'}
+
+def test_copy_employees_matches_the_row_reader(database, sample):
+    import pandas as pd
+
+    database.init_database(sample)
+    columns = ['ID', 'Age', 'Gender', 'Department', 'Salary', 'Performance', 'YearsService', 'JobRole', 'Attrition']
+    copied = database.copy_employees().sort_values('ID', ignore_index=True)
+    fetched = database.get_all_employees().sort_values('ID', ignore_index=True)
+    pd.testing.assert_frame_equal(copied[columns], fetched[columns], check_dtype=False)
+
+    filtered = database.copy_employees({'Department': ['HR']})
+    assert len(filtered) == (sample['Department'] == 'HR').sum()
+
+    pytest.importorskip("pyarrow")
+    assert database.copy_employees(as_arrow=True).num_rows == len(sample)
+
+def test_query_cache_serves_repeats_and_sees_writes(database, sample):
+    database.init_database(sample)
+    database.get_all_employees()
+    hits = database.query_cache.stats()['memory_hits']
+    database.get_all_employees()
+    assert database.query_cache.stats()['memory_hits'] == hits + 1
+
+    # A write from another connection bumps the table version, so the cached result stops matching
+    conn = database.get_connection()
+    cursor = conn.cursor()
+    cursor.execute("UPDATE employees SET salary = salary + 1 WHERE id = 1")
+    conn.commit()
+    cursor.close()
+    conn.close()
+    assert database.get_all_employees()['Salary'].sum() == sample['Salary'].sum() + 1
+
+def _closure(cursor):
+    cursor.execute("SELECT ancestor_id, employee_id, depth FROM org_closure ORDER BY 1, 2")
+    return cursor.fetchall()
+
+@pytest.mark.parametrize("statement", [
+    "UPDATE employees SET manager_id = {boss} WHERE id = {moved}",
+    "DELETE FROM employees WHERE id = {moved}",
+    "INSERT INTO employees (manager_id, department) VALUES ({moved}, 'Sales')"
+])
+def test_employee_changes_keep_the_closure_table_current(database, sample, statement):
+    database.init_database(sample)
+    conn = database.get_connection()
+    cursor = conn.cursor()
+
+    # A manager with reports, and someone outside their subtree to move them under
+    cursor.execute("SELECT manager_id FROM employees WHERE manager_id IS NOT NULL "
+                   "GROUP BY manager_id ORDER BY COUNT(*) DESC, manager_id LIMIT 1")
+    moved = cursor.fetchone()[0]
+    cursor.execute("SELECT MAX(id) FROM employees WHERE id NOT IN "
+                   "(SELECT employee_id FROM org_closure WHERE ancestor_id = %s)", (moved,))
+    boss = cursor.fetchone()[0]
+    cursor.execute("SELECT employee_id FROM org_closure WHERE ancestor_id = %s AND depth > 0", (moved,))
+    reports = {row[0] for row in cursor.fetchall()}
+    versions = database.get_table_versions(cursor, ['org_closure'])
+
+    cursor.execute(statement.format(boss=boss, moved=moved))
+    conn.commit()
+    incremental = _closure(cursor)
+    assert database.get_table_versions(cursor, ['org_closure'])['org_closure'] > versions['org_closure']
+
+    if statement.startswith("UPDATE"):
+        cursor.execute("SELECT employee_id FROM org_closure WHERE ancestor_id = %s", (boss,))
+        assert reports | {moved} <= {row[0] for row in cursor.fetchall()}
+
+    # The incrementally patched closure matches a full rebuild
+    database.rebuild_org_closure(cursor)
+    conn.commit()
+    assert incremental == _closure(cursor)
+    cursor.close()
+    conn.close()
@@ -0,0 +1,16 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from dimensions import OTHER_LABEL, top_k_with_other
+
+# Many values just below the leaders wear the sketch counters down, so the counts
+# must come from the exact recount rather than the decremented counters
+@pytest.mark.parametrize("categorical", [True, False])
+def test_top_k_counts_are_exact(categorical):
+    values = ['a'] * 50 + ['b'] * 40 + [f"tail{i}" for i in range(300)] + [None] * 5
+    series = pd.Series(values, dtype='category' if categorical else object)
+
+    table = top_k_with_other(series, 'Location', 2)
+    assert table['Location'].tolist() == ['a', 'b', OTHER_LABEL]
+    assert table['Count'].tolist() == [50, 40, 300]
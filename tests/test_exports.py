@@ -0,0 +1,61 @@
+import io
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+import exports
+
+# Writer output read back with the matching pandas reader
+def _read_back(export_format, data):
+    if export_format == 'CSV':
+        return pd.read_csv(io.BytesIO(data))
+    if export_format == 'CSV (gzip)':
+        return pd.read_csv(io.BytesIO(data), compression='gzip')
+    if export_format == 'Parquet':
+        return pd.read_parquet(io.BytesIO(data))
+    return pd.read_excel(io.BytesIO(data))
+
+# Optional writer and reader packages each format needs
+FORMAT_PACKAGES = {
+    'CSV': [],
+    'CSV (gzip)': [],
+    'Parquet': ['pyarrow'],
+    'Excel': ['xlsxwriter', 'openpyxl']
+}
+
+def _export(export_format, chunks, template):
+    for package in FORMAT_PACKAGES[export_format]:
+        pytest.importorskip(package)
+    return _read_back(export_format, b"".join(exports.stream_export(chunks, export_format, template)))
+
+@pytest.mark.parametrize("export_format", list(exports.EXPORT_FORMATS))
+@pytest.mark.parametrize("departments", [['Sales', 'IT'], []])
+def test_memory_exports_round_trip(sample, export_format, departments):
+    import hr_data
+
+    df = hr_data.encode_dimensions(sample)
+    filters = {'Department': departments}
+    expected = hr_data.apply_filters(df, filters)
+
+    exported = _export(export_format, exports.iter_frame_chunks(df, filters, chunk_rows=30),
+                       exports.export_template(df))
+    assert list(exported.columns) == list(df.columns)
+    assert len(exported) == len(expected)
+    assert exported['Salary'].sum() == expected['Salary'].sum()
+    assert sorted(exported['Department'].unique()) == sorted(expected['Department'].unique())
+
+@pytest.mark.parametrize("export_format", list(exports.EXPORT_FORMATS))
+@pytest.mark.parametrize("departments", [['Sales'], []])
+def test_postgres_exports_round_trip(database, sample, monkeypatch, export_format, departments):
+    import hr_data
+
+    monkeypatch.setattr(hr_data, 'DATA_SOURCE', 'postgres')
+    database.init_database(sample)
+    filters = {'Department': departments}
+
+    exported = _export(export_format, exports.iter_source_chunks(None, filters, chunk_rows=30),
+                       exports.export_template(None))
+    assert len(exported) == sample['Department'].isin(departments).sum()
+    assert set(exported.columns) >= {'EmployeeID', 'Department', 'Salary', 'Attrition'}
+    assert set(exported['Attrition']) <= {'Yes', 'No'}
@@ -0,0 +1,41 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+import hr_data
+
+@pytest.fixture
+def frame(sample):
+    return hr_data.encode_dimensions(sample)
+
+def _changed(frame, ids, **values):
+    rows = frame[frame['EmployeeID'].isin(ids)].copy()
+    for column, value in values.items():
+        rows[column] = value
+    return rows
+
+# Rebuild path, for comparison with the in-place patch
+def _rebuilt(frame, ids, rows):
+    columns = [column for column in frame.columns if column not in hr_data.ORG_INDEX_COLUMNS]
+    kept = frame[~frame['EmployeeID'].isin(ids)]
+    updated = pd.concat([kept[columns], rows[columns]], ignore_index=True)
+    return hr_data.encode_dimensions(hr_data.add_org_index(updated.sort_values('EmployeeID', ignore_index=True)))
+
+def test_field_updates_are_patched_without_a_rebuild(frame):
+    ids = [3, 10, 42]
+    rows = _changed(frame, ids, Salary=12345, Location=frame['Location'].iloc[0])
+    patched = hr_data.patch_rows(frame, ids, rows)
+
+    assert patched is not None
+    pd.testing.assert_frame_equal(patched, _rebuilt(frame, ids, rows), check_categorical=False)
+    assert frame.loc[frame['EmployeeID'] == 3, 'Salary'].iloc[0] != 12345
+
+@pytest.mark.parametrize("change", [
+    lambda frame: ([5], _changed(frame, [5], ManagerID=-1)),
+    lambda frame: ([5], _changed(frame, [5], Location="Nowhere New")),
+    lambda frame: ([5], frame.iloc[:0]),
+])
+def test_structural_changes_fall_back_to_a_rebuild(frame, change):
+    ids, rows = change(frame)
+    assert hr_data.patch_rows(frame, ids, rows) is None
+    assert len(hr_data.apply_changes(frame, ids, rows)) == len(frame) - len(ids) + len(rows)
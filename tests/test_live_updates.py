@@ -0,0 +1,99 @@
+import time
+
+import pytest
+
+@pytest.fixture
+def live(database, sample):
+    import hr_data
+    from pay_equity import build_pay_cells
+    from tenant_cache import tenant_cache
+    from tenants import current_tenant
+    from live_updates import ChangeListener
+
+    database.init_database(sample)
+    tenant = current_tenant()
+    keys = (('employees', 'postgres', len(sample)), ('pay_cells', 'postgres', len(sample)))
+    tenant_cache.invalidate()
+    df = hr_data.load_employees('postgres', len(sample), tenant)
+    tenant_cache.put(tenant, keys[0], df)
+    tenant_cache.put(tenant, keys[1], build_pay_cells(df))
+
+    listener = ChangeListener(lambda name: keys, wait_seconds=0.05)
+    listener.start()
+    listener.watch('sales', tenant, {'Department': ['Sales']})
+    listener.watch('hr', tenant, {'Department': ['HR']})
+    yield listener, tenant, keys, df
+    listener.stop()
+    listener.join(5)
+
+def _execute(database, statement):
+    conn = database.get_connection()
+    cursor = conn.cursor()
+    cursor.execute(statement)
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+def _wait_for(condition, timeout=10):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        assert time.perf_counter() < deadline, "listener didn't react in time"
+        time.sleep(0.01)
+
+@pytest.mark.parametrize("statement", [
+    "UPDATE employees SET salary = salary + 1000 WHERE id = {target}",
+    "DELETE FROM employees WHERE id = {target}"
+])
+def test_changes_patch_the_cache_and_flag_covering_sessions(database, live, statement):
+    import hr_data
+    from pay_equity import build_pay_cells
+    from tenant_cache import tenant_cache
+
+    listener, tenant, keys, df = live
+    target = int(df.loc[df['Department'] == 'Sales', 'EmployeeID'].iloc[0])
+    _execute(database, statement.format(target=target))
+    _wait_for(lambda: listener.batches_applied == 1)
+
+    _, frame = tenant_cache.peek(tenant, keys[0])
+    _, cells = tenant_cache.peek(tenant, keys[1])
+    expected = hr_data.from_database_frame(database.copy_employees())
+    assert len(frame) == len(expected)
+    assert frame['Salary'].sum() == expected['Salary'].sum()
+    assert cells['y'].sum() == build_pay_cells(expected)['y'].sum()
+    assert listener.take_dirty('sales')
+    assert not listener.take_dirty('hr')
+
+def test_truncate_forces_a_reload(database, live):
+    from tenant_cache import tenant_cache
+
+    listener, tenant, keys, _ = live
+    _execute(database, "TRUNCATE employees")
+    _wait_for(lambda: listener.batches_applied == 1)
+    _, frame = tenant_cache.peek(tenant, keys[0])
+    assert frame.empty
+    assert listener.take_dirty('sales') and listener.take_dirty('hr')
+
+def test_listener_survives_a_failing_apply(database, live, monkeypatch):
+    from tenant_cache import tenant_cache
+
+    listener, tenant, keys, df = live
+    original = listener.apply
+    calls = []
+
+    def failing_apply(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            raise KeyError('Salary')
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(listener, 'apply', failing_apply)
+    _execute(database, "UPDATE employees SET salary = salary + 1 WHERE id = 1")
+    _wait_for(lambda: listener.errors == 1)
+
+    # The tenant's cache is dropped and its sessions rerun, and later changes still apply
+    assert listener.is_alive()
+    assert tenant_cache.peek(tenant, keys[0]) == (False, None)
+    assert listener.take_dirty('sales') and listener.take_dirty('hr')
+    _execute(database, "UPDATE employees SET salary = salary + 1 WHERE id = 2")
+    _wait_for(lambda: len(calls) == 2)
+    assert listener.is_alive()
@@ -0,0 +1,38 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from pay_equity import build_pay_cells, fit_pay_gap, pay_gap_table
+
+# The same regression fitted directly on the employee rows
+def _least_squares(df):
+    departments = sorted(df['Department'].unique())
+    job_roles = sorted(df['JobRole'].unique())
+    columns = [np.ones(len(df)), (df['Gender'] == 'Female').to_numpy(float)]
+    columns += [(df['Department'] == name).to_numpy(float) for name in departments[1:]]
+    columns += [(df['JobRole'] == name).to_numpy(float) for name in job_roles[1:]]
+    columns += [df['PerformanceRating'].to_numpy(float), df['YearsAtCompany'].to_numpy(float)]
+    design = np.column_stack(columns)
+    salary = df['Salary'].to_numpy(float)
+
+    beta, _, rank, _ = np.linalg.lstsq(design, salary, rcond=None)
+    residuals = salary - design @ beta
+    sigma2 = residuals @ residuals / (len(df) - rank)
+    std_error = np.sqrt(sigma2 * np.linalg.pinv(design.T @ design)[1, 1])
+    return beta[1], std_error
+
+def test_cell_statistics_match_a_direct_fit(sample):
+    result = fit_pay_gap(build_pay_cells(sample))
+    gap, std_error = _least_squares(sample)
+    assert result['adjusted_gap'] == pytest.approx(gap, rel=1e-6)
+    assert result['std_error'] == pytest.approx(std_error, rel=1e-6)
+
+    means = sample.groupby('Gender')['Salary'].mean()
+    assert result['raw_gap'] == pytest.approx(means['Female'] - means['Male'])
+
+@pytest.mark.parametrize("labels", [{'Male': 'M', 'Female': 'F'}, {'Male': 'Non-binary'}])
+def test_gender_labels_other_than_female_and_male_give_no_estimate(sample, labels):
+    relabelled = sample.assign(Gender=sample['Gender'].replace(labels))
+    assert fit_pay_gap(build_pay_cells(relabelled)) is None
+    assert pay_gap_table(build_pay_cells(relabelled), {}).empty
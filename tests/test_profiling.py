@@ -0,0 +1,33 @@
+import time
+import tracemalloc
+
+import profiling
+
+def test_stop_writes_reports_and_releases_the_capture(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, 'PROFILES_DIR', str(tmp_path))
+    profiler = profiling.RunProfiler()
+    assert profiler.start()
+    assert not profiling.RunProfiler().start()
+
+    paths = profiler.stop()
+    assert 'allocations' in paths
+    assert not tracemalloc.is_tracing()
+    assert profiler.stop() == {}
+
+# A run that never reaches stop() (tab closed mid-run) is abandoned by the watchdog, so
+# tracing stops and other captures can start without that session coming back
+def test_abandoned_capture_is_released_after_the_timeout(monkeypatch):
+    monkeypatch.setattr(profiling, 'CAPTURE_TIMEOUT', 0.05)
+    profiler = profiling.RunProfiler()
+    assert profiler.start()
+
+    deadline = time.perf_counter() + 5
+    while profiling._capture_lock.locked():
+        assert time.perf_counter() < deadline, "capture wasn't abandoned"
+        time.sleep(0.01)
+    assert not tracemalloc.is_tracing()
+
+    replacement = profiling.RunProfiler()
+    assert replacement.start()
+    replacement.abandon()
+    assert profiler.stop() == {}
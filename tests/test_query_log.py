@@ -0,0 +1,85 @@
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+
+import query_log
+
+@pytest.fixture
+def log_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "query_log.jsonl")
+    monkeypatch.setattr(query_log, 'QUERY_LOG_PATH', path)
+    return path
+
+def test_fingerprint_groups_queries_differing_only_in_values():
+    first, first_hash = query_log.fingerprint("SELECT * FROM employees WHERE id IN (1, 2, 3) AND department = 'HR'")
+    second, second_hash = query_log.fingerprint("SELECT *  FROM employees WHERE id IN (7, 8) AND department = 'Sales'")
+    assert first == second == "SELECT * FROM employees WHERE id IN (?...) AND department = ?"
+    assert first_hash == second_hash
+
+def test_summarize_merges_fetch_records_into_their_query():
+    records = [
+        {'kind': 'execute', 'fingerprint': 'a', 'query': 'SELECT ?', 'latency_ms': 10.0},
+        {'kind': 'fetch', 'fingerprint': 'a', 'rows': 5, 'bytes': 50, 'fetch_ms': 1.5},
+        {'kind': 'execute', 'fingerprint': 'a', 'query': 'SELECT ?', 'latency_ms': 30.0, 'slow': True},
+        {'fingerprint': 'b', 'query': 'UPDATE', 'latency_ms': 1.0, 'rows': 0, 'bytes': 0}
+    ]
+    first, second = query_log.summarize(records)
+    assert (first['fingerprint'], first['calls'], first['total_ms'], first['rows'], first['fetch_ms'], first['slow']) == (
+        'a', 2, 40.0, 5, 1.5, 1
+    )
+    assert second['fingerprint'] == 'b'
+
+def _instrumented_cursor(database):
+    return database.get_connection().cursor(cursor_factory=query_log.InstrumentedCursor)
+
+def test_execute_is_logged_without_close(database, log_path):
+    cursor = _instrumented_cursor(database)
+    cursor.execute("SELECT %s", (1,))
+    records = query_log.read_records(log_path)
+    assert [record['kind'] for record in records] == ['execute']
+    assert records[0]['query'] == "SELECT %s"
+    cursor.connection.close()
+
+def test_fetches_are_logged_on_the_next_execute(database, sample, log_path):
+    database.init_database(sample)
+    cursor = _instrumented_cursor(database)
+    cursor.execute("SELECT id FROM employees")
+    cursor.fetchmany(10)
+    cursor.fetchall()
+    cursor.execute("SELECT 1")
+    cursor.close()
+    cursor.connection.close()
+
+    # The second query fetched nothing, so it has no fetch record
+    records = query_log.read_records(log_path)
+    assert [record['kind'] for record in records] == ['execute', 'fetch', 'execute']
+    assert records[1]['rows'] == len(sample)
+    assert records[1]['fingerprint'] == records[0]['fingerprint']
+
+@pytest.mark.parametrize("rate, plans", [(0.0, 0), (1.0, 1)])
+def test_slow_reads_are_explained_only_when_sampled(database, log_path, monkeypatch, rate, plans):
+    monkeypatch.setattr(query_log, 'SLOW_QUERY_MS', 0.0)
+    monkeypatch.setattr(query_log, 'EXPLAIN_SAMPLE_RATE', rate)
+    cursor = _instrumented_cursor(database)
+    cursor.execute("SELECT 1")
+    cursor.connection.close()
+
+    record, = query_log.read_records(log_path)
+    assert record['slow'] is True
+    assert ('plan' in record) == bool(plans)
+
+def test_copy_is_logged_with_rows_and_bytes(database, sample, log_path):
+    import io
+
+    database.init_database(sample)
+    cursor = _instrumented_cursor(database)
+    buffer = io.BytesIO()
+    cursor.copy_expert("COPY (SELECT id FROM employees) TO STDOUT", buffer)
+    cursor.close()
+    cursor.connection.close()
+
+    record, = query_log.read_records(log_path)
+    assert record['kind'] == 'execute'
+    assert record['rows'] == len(sample)
+    assert record['bytes'] == len(buffer.getvalue())
+    assert 'plan' not in record
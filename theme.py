@@ -0,0 +1,43 @@
+# Custom color palettes
+# Primary color palette
+PRIMARY_COLOR = "#4361EE"  # Main theme color (blue)
+SECONDARY_COLOR = "#3A0CA3"  # Secondary color (darker blue/purple)
+ACCENT_COLOR = "#7209B7"  # Accent color (purple)
+HIGHLIGHT_COLOR = "#F72585"  # Highlight color (pink)
+
+# Background colors
+BG_COLOR = "#000000"  # Black background
+CARD_BG_COLOR = "#121212"  # Dark gray for cards
+SIDEBAR_BG_COLOR = "#000000"  # Sidebar background
+
+# Text colors
+TEXT_COLOR = "#F8FAFC"  # Light gray for text
+MUTED_TEXT_COLOR = "#94A3B8"  # Muted text
+
+# Department colors - assign a unique color to each department
+DEPARTMENT_COLORS = {
+    "Sales": "#4CC9F0",  # Light blue
+    "IT": "#4361EE",     # Blue
+    "R&D": "#3A0CA3",    # Purple
+    "HR": "#7209B7",     # Violet
+    "Finance": "#F72585", # Pink
+    "Marketing": "#4895EF", # Sky blue
+    "Operations": "#560BAD", # Dark purple
+    "Customer Service": "#F77F00" # Orange
+}
+
+# Performance colors
+PERFORMANCE_COLORS = {
+    1: "#F94144",  # Red (Poor)
+    2: "#F8961E",  # Orange (Below Average)
+    3: "#F9C74F",  # Yellow (Average)
+    4: "#90BE6D",  # Light green (Good)
+    5: "#43AA8B"   # Green (Excellent)
+}
+
+# Gender colors
+GENDER_COLORS = {
+    "Male": "#4361EE",  # Blue
+    "Female": "#F72585" # Pink
+}
+